@@ -5,12 +5,30 @@
 #   performance statistics about each sorting run.
 ########################################################################################################################
 
-# numpy is imported to allow for the casting of an array to an easier mutable np.array
-# numpy is used to form the np.arrays but not to compute the actual regression and correlations metrics.
+# numpy is imported to digest the data arrays and to compute the power regression: the log-log least-squares sums and
+#   the correlation are evaluated as vectorized np.array operations (see fit_power_law).
+import hashlib
 import numpy as np
 np.seterr(all='ignore')
 
+
+def digest_data(data_arr):
+    """
+    Computes a short digest of an array's values, so a run can identify its data without keeping the data alive.
+    The values are hashed in their own dtype, together with it, so float data is never truncated to integers; equal
+        int64 values give equal digests whatever the container (list, array.array('q') or numpy array).
+    :param data_arr: the array to digest.
+    ;return: the BLAKE2b digest as a 32-character hex string.
+    """
+    values = np.ascontiguousarray(data_arr)
+    return hashlib.blake2b(values.dtype.str.encode() + values.tobytes(), digest_size=16).hexdigest()
+
+
 class Metric:
+    __slots__ = ('n', 'sort', 'algo', 'comps', 'exs', 'predata', 'postdata', 'comp_eq', 'ex_eq', 'time', 'time_min',
+                 'time_iqr', 'time_repeats', 'context_switches', 'predata_digest', 'postdata_digest', 'comp_fit',
+                 'ex_fit')
+
     def __init__(self,
                  n,
                  sort,
@@ -21,30 +39,66 @@ class Metric:
                  postdata,
                  comp_eq,
                  ex_eq,
-                 time):
+                 time,
+                 time_min=None,
+                 time_iqr=None,
+                 time_repeats=1,
+                 context_switches=None,
+                 predata_digest=None,
+                 postdata_digest=None):
         """
         The Metric class consolidates all information needed about an algorithm's run in order to determine performance statistics.
+        The counts and times are stored as plain ints and floats. The data arrays are only attached while the run is
+            archived; release_data then replaces them by their digests, so results do not keep every array alive.
         :param n: The length of the array that the metric relates to.
         ;param sort: The distribution of data (sorted, reverse-sorted, random).
         ;param algo: The sorting algorithm used.
         ;param comps: The number of comparisons made by the algorithm during sort.
         ;param exs: The number of exchanges made by the algorithm during sort.
-        ;param predata: The data as it arrives before being passed through the sorting algorithm.
-        ;param postdata: The data as it arrives after being passed through the sorting algorithm.
-        ;param comp_eq: The exponential regression equation that predicts the trajectory of the # of comparisons.
-        ;param ex_eq: The exponential regression equation that predicts the trajectory of the # of exchanges.
-        ;param time: The time it takes for the algorithm to sort the file.
+        ;param predata: The data as it arrives before being passed through the sorting algorithm, or None.
+        ;param postdata: The data as it arrives after being passed through the sorting algorithm, or None.
+        ;param comp_eq: The exponential regression equation that predicts the trajectory of the # of comparisons; the
+            numeric fit behind it is kept in comp_fit (see fitPowerRegressionCurve).
+        ;param ex_eq: The exponential regression equation that predicts the trajectory of the # of exchanges; the
+            numeric fit behind it is kept in ex_fit.
+        ;param time: The (median) time in seconds it takes for the algorithm to sort the file.
+        ;param time_min: The fastest of the timed repeats in seconds, if the run was timed repeatedly.
+        ;param time_iqr: The interquartile range of the timed repeats in seconds, if the run was timed repeatedly.
+        ;param time_repeats: The number of timed repeats the time statistics were computed from.
+        ;param context_switches: The context switches taken during the timed repeats, if they were recorded.
+        ;param predata_digest: The digest of the presorted data (see digest_data), if known.
+        ;param postdata_digest: The digest of the postsorted data (see digest_data), if known.
         """
-        self.n = n
+        self.n = int(n)
         self.sort = sort
         self.algo = algo
-        self.comps = comps
-        self.exs = exs
+        self.comps = int(comps)
+        self.exs = int(exs)
         self.predata = predata
         self.postdata = postdata
         self.comp_eq = comp_eq
         self.ex_eq = ex_eq
-        self.time = time
+        self.time = float(time)
+        self.time_min = None if time_min is None else float(time_min)
+        self.time_iqr = None if time_iqr is None else float(time_iqr)
+        self.time_repeats = int(time_repeats)
+        self.context_switches = None if context_switches is None else int(context_switches)
+        self.predata_digest = predata_digest
+        self.postdata_digest = postdata_digest
+        self.comp_fit = None
+        self.ex_fit = None
+
+
+    def release_data(self):
+        """
+        Replaces the attached data arrays by their digests and drops the metric's references to them.
+        """
+        if self.predata is not None:
+            self.predata_digest = digest_data(self.predata)
+            self.predata = None
+        if self.postdata is not None:
+            self.postdata_digest = digest_data(self.postdata)
+            self.postdata = None
 
 
     def print_metric(self):
@@ -62,145 +116,125 @@ class Metric:
         print(f'postsorted data: {self.postdata}')
 
 
-    def fitPowerRegressionCurveComparisons(self, xVals0, yVals0):
+    def fitPowerRegressionCurve(self, xVals, yVals, quantity):
         """
-        Fits a power regression curve to plot a trajectory for the number of comparisons a specific sorting
-            algorithm will perform as it scales with larger n.
-        Notice the regression curve is computed from scratch with no "packages;" numpy is only used to
-            cast an array of calculated type to an array of type easier to manipulate through math.
-        ;param xVals0: The explanatory variable to use for regression.
-        ;param yVals0: The response variable to use for regression.
-        :returns: The computed exponential regression equation in the form Ax^B + C as a string.
+        Fits a power regression curve to plot a trajectory for the number of comparisons or exchanges a specific
+            sorting algorithm will perform as it scales with larger n, and stores it in this metric.
+        The fit of a series is computed once and shared by every metric of the same algorithm and data type (see
+            cached_power_fit).
+        ;param xVals: The explanatory variable to use for regression (n of every run in the series).
+        ;param yVals: The response variable to use for regression.
+        ;param quantity: 'comps' to fit the comparisons (comp_eq / comp_fit), 'exs' to fit the exchanges.
+        :returns: The PowerFit object with the numeric coefficients, or None if no curve could be fitted.
         """
-        xValCount = 0
-        yValCount = 0
-        if len(xVals0) > 2:
-            xValCount += int(len(xVals0) / 2) - 1
-            yValCount += int(len(xVals0) / 2) - 1
-        else:
-            return "regression error", 0.0
-        xVals = []
-        yVals = []
-        xValIndex = xValCount + 1
-        yValIndex = yValCount + 1
-        for i in range(xValIndex, len(xVals0)):
-            xVals.append(xVals0[i])
-        for i in range(yValIndex, len(xVals0)):
-            yVals.append(yVals0[i])
-        n = len(xVals)
-        sumLnxLny = 0.0
-        sumLnx = 0.0
-        sumLny = 0.0
-        sumLnx2 = 0.0
-        sumLny2 = 0.0
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            lny = np.log(yVals[i])
-            sumLnxLny += (lnx * lny)
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            sumLnx += lnx
-        for i in range(0, n - 1):
-            lny = np.log(yVals[i])
-            sumLny += lny
-        for i in range(0, n - 1):
-            lny = np.log(yVals[i])
-            sumLny2 += (lny * lny)
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            sumLnx2 += (lnx * lnx)
-        lnxBar = sumLnx / n
-        lnyBar = sumLny / n
-        sxx = sumLnx2 - (n * (lnxBar ** 2))
-        syy = sumLny2 - (n * (lnyBar ** 2))
-        sxy = sumLnxLny - (n * lnxBar * lnyBar)
-        b = sxy / sxx
-        a = pow(np.e, lnyBar - (b * lnxBar))
-        r = sxy / (np.sqrt(sxx) * np.sqrt(syy))
-        xx = np.array(xVals)
-        yy = np.array(yVals)
-        def power_law(xx, a, b):
-            return a * np.power(xx, b)
-        yHats = []
-        for xPrime in xx:
-            yHats.append(power_law(xPrime, a, b))
-        eq = str(f' y = {str(round(a, 4))} (x) ^ {str(round(b, 4))} with correlation {str(round(100.0000 * r, 4))} %')
-        if 'nan' in eq:
-            eq_nan = 'could not calculate regression\t\t\t'
-            self.eq = eq_nan
-            return eq_nan
+        fit = cached_power_fit(self.algo, self.sort, quantity, xVals, yVals)
+        eq = fit.equation() if fit is not None else 'could not calculate regression\t\t\t'
+        if quantity == 'comps':
+            self.comp_fit = fit
+            self.comp_eq = eq
         else:
+            self.ex_fit = fit
             self.ex_eq = eq
-            return eq
+        return fit
 
 
-    def fitPowerRegressionCurveExchanges(self, xVals0, yVals0):
+class PowerFit:
+    __slots__ = ('a', 'b', 'r', 'points')
+
+    def __init__(self, a, b, r, points):
         """
-        Fits a power regression curve to plot a trajectory for the number of comparisons a specific sorting
-            algorithm will perform as it scales with larger n.
-        Notice the regression curve is computed from scratch with no "packages;" numpy is only used to
-            cast an array of calculated type to an array of type easier to manipulate through math.
-        ;param xVals0: The explanatory variable to use for regression.
-        ;param yVals0: The response variable to use for regression.
-        :returns: The computed exponential regression equation in the form Ax^B + C as a string.
+        The PowerFit class holds the coefficients of a fitted power regression curve y = a * x ^ b.
+        :param a: the coefficient.
+        ;param b: the exponent.
+        ;param r: the correlation coefficient of ln(x) and ln(y) over the fitted points.
+        ;param points: the number of points the curve was fitted to.
         """
-        xValCount = 0
-        yValCount = 0
-        if len(xVals0) > 2:
-            xValCount += int(len(xVals0) / 2) - 1
-            yValCount += int(len(xVals0) / 2) - 1
-        else:
-            return "regression error", 0.0
-        xVals = []
-        yVals = []
-        xValIndex = xValCount + 1
-        yValIndex = yValCount + 1
-        for i in range(xValIndex, len(xVals0)):
-            xVals.append(xVals0[i])
-        for i in range(yValIndex, len(xVals0)):
-            yVals.append(yVals0[i])
-        n = len(xVals)
-        sumLnxLny = 0.0
-        sumLnx = 0.0
-        sumLny = 0.0
-        sumLnx2 = 0.0
-        sumLny2 = 0.0
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            lny = np.log(yVals[i])
-            sumLnxLny += (lnx * lny)
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            sumLnx += lnx
-        for i in range(0, n - 1):
-            lny = np.log(yVals[i])
-            sumLny += lny
-        for i in range(0, n - 1):
-            lny = np.log(yVals[i])
-            sumLny2 += (lny * lny)
-        for i in range(0, n - 1):
-            lnx = np.log(xVals[i])
-            sumLnx2 += (lnx * lnx)
-        lnxBar = sumLnx / n
-        lnyBar = sumLny / n
-        sxx = sumLnx2 - (n * (lnxBar ** 2))
-        syy = sumLny2 - (n * (lnyBar ** 2))
-        sxy = sumLnxLny - (n * lnxBar * lnyBar)
-        b = sxy / sxx
-        a = pow(np.e, lnyBar - (b * lnxBar))
-        r = sxy / (np.sqrt(sxx) * np.sqrt(syy))
-        xx = np.array(xVals)
-        yy = np.array(yVals)
-        def power_law(xx, a, b):
-            return a * np.power(xx, b)
-        yHats = []
-        for xPrime in xx:
-            yHats.append(power_law(xPrime, a, b))
-        eq = str(f' y = {str(round(a, 4))} (x) ^ {str(round(b, 4))} with correlation {str(round(100.0000 * r, 4))} %')
-        if 'nan' in eq:
-            eq_nan = 'could not calculate regression\t\t\t'
-            self.eq = eq_nan
-            return eq_nan
-        else:
-            self.ex_eq = eq
-            return eq
+        self.a = a
+        self.b = b
+        self.r = r
+        self.points = points
+
+
+    def predict(self, x):
+        """
+        Evaluates the fitted curve.
+        :param x: the explanatory value (n), or an array of them.
+        :returns: a * x ^ b.
+        """
+        return self.a * np.power(x, self.b)
+
+
+    def equation(self):
+        """
+        Formats the fitted curve as the regression equation shown in the output.
+        :returns: the equation and its correlation as a string.
+        """
+        return f' y = {round(self.a, 4)} (x) ^ {round(self.b, 4)} with correlation {round(100.0000 * self.r, 4)} %'
+
+
+def fit_power_law(xVals0, yVals0):
+    """
+    Fits a power regression curve y = a * x ^ b by least squares on ln(x) and ln(y).
+    As the curve describes the trajectory as n scales, only the upper half of the series (the largest n) is used, but
+        always at least two points. Every sum is computed over all of those points in one vectorized pass.
+    Notice the regression itself is computed from scratch with no "packages;" numpy is only used for the array math.
+    ;param xVals0: The explanatory variable to use for regression, in ascending order.
+    ;param yVals0: The response variable to use for regression.
+    :returns: a PowerFit object, or None if the series has fewer than two points, a value that is not positive (its
+        logarithm is undefined), or a single distinct x.
+    """
+    xVals = np.asarray(xVals0, dtype=np.float64)
+    yVals = np.asarray(yVals0, dtype=np.float64)
+    if len(xVals) < 2:
+        return None
+    start = min(len(xVals) // 2, len(xVals) - 2)
+    xVals = xVals[start:]
+    yVals = yVals[start:]
+    if (xVals <= 0).any() or (yVals <= 0).any():
+        return None
+
+    n = len(xVals)
+    lnx = np.log(xVals)
+    lny = np.log(yVals)
+    lnxBar = lnx.sum() / n
+    lnyBar = lny.sum() / n
+    sxx = (lnx * lnx).sum() - (n * (lnxBar ** 2))
+    syy = (lny * lny).sum() - (n * (lnyBar ** 2))
+    sxy = (lnx * lny).sum() - (n * lnxBar * lnyBar)
+    if sxx <= 0:
+        return None
+    b = sxy / sxx
+    a = pow(np.e, lnyBar - (b * lnxBar))
+    # a constant series is fitted exactly by b = 0
+    r = sxy / (np.sqrt(sxx) * np.sqrt(syy)) if syy > 0 else 1.0
+    return PowerFit(float(a), float(b), float(r), n)
+
+
+# fitted curves by (algorithm, data type, quantity), each stored with the series it was fitted to
+POWER_FIT_CACHE = {}
+
+
+def cached_power_fit(algo, sort, quantity, xVals, yVals):
+    """
+    Returns the power regression curve of one (algorithm, data type, quantity) series, fitting it only if the series
+        was not fitted before or has changed since.
+    Passing the very same x and y sequences again (as the graphs do for every metric of a series) skips even the
+        comparison with the cached series, so they must not be modified in place between calls.
+    ;param algo: the algorithm code of the series.
+    ;param sort: the data type of the series.
+    ;param quantity: the counted quantity of the series - 'comps' or 'exs'.
+    ;param xVals: The explanatory variable to use for regression.
+    ;param yVals: The response variable to use for regression.
+    :returns: a PowerFit object, or None (see fit_power_law).
+    """
+    key = (algo, sort, quantity)
+    cached = POWER_FIT_CACHE.get(key)
+    if cached is not None:
+        if cached[0] is xVals and cached[1] is yVals:
+            return cached[3]
+        if cached[2] == (tuple(xVals), tuple(yVals)):
+            POWER_FIT_CACHE[key] = (xVals, yVals, cached[2], cached[3])
+            return cached[3]
+    fit = fit_power_law(xVals, yVals)
+    POWER_FIT_CACHE[key] = (xVals, yVals, (tuple(xVals), tuple(yVals)), fit)
+    return fit
@@ -0,0 +1,47 @@
+# SortStats.py
+# Kordel France
+########################################################################################################################
+# This file provides the protocol for the SortStats class. A SortStats object collects the operation counts of the
+#   sorting calls it is passed to. Every sort creates a fresh one when none is given, so counts never leak from one call
+#   into the next and sorts can run concurrently in threads without mixing their numbers.
+# The in-memory sorts do not time themselves: one run is mostly noise, so every time of them goes through the
+#   repeated-trial harness in timing.py. Only the external sort, whose single run is the measurement, records a time.
+########################################################################################################################
+
+
+class SortStats:
+    __slots__ = ('comps', 'exs', 'moves', 'time')
+
+    def __init__(self):
+        """
+        The SortStats class accumulates the counts of the sorting calls it is passed to.
+        ;param comps: The number of comparisons made.
+        ;param exs: The number of exchanges made.
+        ;param moves: The number of element writes made (heap sort only; a swap writes two elements).
+        ;param time: The time in seconds spent in the calls of an external sort (see external_sort.py).
+        """
+        self.comps = 0
+        self.exs = 0
+        self.moves = 0
+        self.time = 0.0
+
+
+    def add(self, other):
+        """
+        Adds the counts of another SortStats object, e.g. one collected by a sub-sort in a worker process.
+        The time is not added: sub-sorts run inside (or alongside) the call that owns this object.
+        :param other: the SortStats object to add.
+        """
+        self.comps += other.comps
+        self.exs += other.exs
+        self.moves += other.moves
+
+
+    def print_stats(self):
+        """
+        Prints each count in the stats.
+        """
+        print(f'number of comparisons: {self.comps}')
+        print(f'number of exchanges: {self.exs}')
+        print(f'number of element writes: {self.moves}')
+        print(f'time (s): {self.time:.6f}')
@@ -3,21 +3,87 @@
 ########################################################################################################################
 # This file contains the driver code for the sorting complexity analysis program.
 # All other files may be viewed as helpers that are pooled together here for use.
+# The sizes, types, algorithms, timed repeats, workers and output folder default to constants.py and may be overridden
+#   on the command line (python -m Lab4 -h). With --batch every pause and prompt is skipped and the graphs are saved
+#   instead of shown, so the program can run unattended and takes only as long as its work.
 ########################################################################################################################
 
-from Lab4.heap_sort import heap_sort, reset_counts_heap_sort
-from Lab4.merge_sort_natural import merge_sort_natural, reset_counts_merge_sort_natural
-from Lab4.merge_sort_2way import merge_sort_two_way, reset_counts_merge_sort_two_way
-from Lab4.merge_sort_3way import merge_sort_three_way, reset_counts_merge_sort_three_way
-from Lab4.constants import file_sizes, file_types, sort_algos
-from Lab4.file_manager import generate_sorted_file, generate_reverse_sorted_file, generate_random_sorted_file
+from Lab4.constants import file_sizes, file_types, sort_algos, worker_count, count_mode, isolation_mode, \
+    isolation_cpu, dataset_caching, results_path, results_include_data, csv_export, complexity_target_n, \
+    complexity_criterion, time_prediction, calibration_path
+from Lab4.battle import run_battle, ALGO_CODES, FILE_GENERATORS
 from Lab4 import graph_data as graph
-from Lab4.Metric import Metric as m
+from Lab4.results import BackgroundResultsWriter, clear_results, export_csv
+from Lab4.complexity import complexity_report
+from Lab4.calibration import calibrate, save_calibrations, load_calibrations, prediction_report
+import argparse
+import os
 import time
 
 
-data_metrics = []
-status = len(file_sizes) * len(file_types)
+def parse_arguments(argv=None):
+    """
+    Parses the command line.
+    :param argv: the arguments to parse; defaults to sys.argv[1:].
+    ;return: the parsed arguments; algos holds algorithm codes (keys of battle.SORT_FUNCTIONS).
+    """
+    algo_choices = list(ALGO_CODES) + list(ALGO_CODES.values())
+    parser = argparse.ArgumentParser(prog='python -m Lab4',
+                                     description='Runs every (size, data type, algorithm) sorting run, then graphs, '
+                                                 'summarizes and archives the results.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=file_sizes, metavar='N',
+                        help=f'file sizes (n) to sort (default: {" ".join(str(size) for size in file_sizes)})')
+    parser.add_argument('--types', nargs='+', default=file_types, choices=list(FILE_GENERATORS), metavar='TYPE',
+                        help=f'data types to sort, from: {", ".join(FILE_GENERATORS)} (default: all in constants.py)')
+    parser.add_argument('--algos', nargs='+', default=sort_algos, choices=algo_choices, metavar='ALGO',
+                        help=f'sorting algorithms, by code ({", ".join(ALGO_CODES.values())}) or quoted name '
+                             f'(default: all in constants.py)')
+    parser.add_argument('--repeats', type=int, default=None, metavar='R',
+                        help='timed repeats of every run (default: until the median is precise, see constants.py)')
+    parser.add_argument('--workers', type=int, default=worker_count, metavar='W',
+                        help=f'worker processes running the sorts (default: {worker_count})')
+    parser.add_argument('--output-dir', default='output_files', metavar='DIR',
+                        help='folder the results, summaries and graphs are written to (default: output_files)')
+    parser.add_argument('--batch', action='store_true',
+                        help='run unattended: no pauses, no prompts, and graphs are saved instead of shown')
+    parser.add_argument('--predict-time', action=argparse.BooleanOptionalAction, default=time_prediction,
+                        help='predict the time of every run from its counts; calibrates this machine first unless '
+                             f'the output folder holds a calibration file (default: {"on" if time_prediction else "off"}'
+                             ', see constants.py)')
+    arguments = parser.parse_args(argv)
+    if arguments.repeats is not None and arguments.repeats < 1:
+        parser.error('--repeats must be at least 1')
+    if arguments.workers < 1:
+        parser.error('--workers must be at least 1')
+    if min(arguments.sizes) < 1:
+        parser.error('--sizes must be positive')
+    arguments.algos = [ALGO_CODES.get(algo, algo) for algo in arguments.algos]
+    return arguments
+
+
+def pause(seconds):
+    """
+    Briefly pauses processing so the user can read the feedback given to them in the command prompt; skipped in batch
+        mode.
+    :param seconds: the length of the pause.
+    """
+    if not arguments.batch:
+        time.sleep(seconds)
+
+
+arguments = parse_arguments()
+sizes = arguments.sizes
+types = arguments.types
+algos = arguments.algos
+output_dir = arguments.output_dir
+os.makedirs(output_dir, exist_ok=True)
+run_count = len(sizes) * len(types) * len(algos)
+
+# predicted times are only valid for the proxy counts of the timed kernels (see calibration.prediction_report), so the
+#   runs are counted in proxy mode whenever the time is predicted
+battle_count_mode = 'proxy' if arguments.predict_time else count_mode
+
+status = len(sizes) * len(types)
 status_count = 0
 # print a header for UI aesthetics
 print('_________________________________________________________________________________________')
@@ -29,278 +95,107 @@ print('*************************************************************************
 
 
 # briefly pause processing so the user can read the feedback given to them in the command prompt
-time.sleep(2.0)
+pause(2.0)
 print('*****************************************************************************************')
 print('\t\t\tStarting Complexity Analysis Program\n')
 print('_________________________________________________________________________________________')
-time.sleep(2.0)
+pause(2.0)
 
 # inform the user of what will be accomplished by and presented in this program
-print(f'A total of {len(file_types) * len(file_sizes) * len(sort_algos)} different analyses will be performed on '
-      f'different sorting scenarios.')
-print(f'\t{len(sort_algos)} different sorts will be compared: {[algo for algo in sort_algos]}.')
-print(f'\t{len(file_sizes)} different file sizes will be compared for each sort: {[size for size in file_sizes]}.')
-print(f'\t{len(file_types)} different data distributions will be evaluated for each sort at each quantity: '
-      f'{[type for type in file_types]}.')
+print(f'A total of {run_count} different analyses will be performed on different sorting scenarios.')
+algo_names = {code: name for name, code in ALGO_CODES.items()}
+print(f'\t{len(algos)} different sorts will be compared: {[algo_names[algo] for algo in algos]}.')
+print(f'\t{len(sizes)} different file sizes will be compared for each sort: {[size for size in sizes]}.')
+print(f'\t{len(types)} different data distributions will be evaluated for each sort at each quantity: '
+      f'{[type for type in types]}.')
 
 # briefly pause processing so the user can read the feedback given to them in the command prompt
-time.sleep(7.0)
+pause(7.0)
 print(f'\n\nBeginning sorting procedures now.')
-time.sleep(2.0)
+pause(2.0)
 print('_________________________________________________________________________________________')
 
-# begin automatically generating and distributing the data to its respective algorithm
-for size in file_sizes:                                                             # iterate through file sizes (n)
-    for file_type in file_types:                                                    # iterate through file types
-        if file_type == 'sorted':                                                   # check for sorted file type
-            predata = generate_sorted_file(size)
-
-            algo = 'm1x'                                                            # perform natural merge sort
-            predata_m1x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m1x[i] = predata[i]
-            postdata_m1x, comps, exs, dt = merge_sort_natural(predata_m1x)
-            metric_m1x = m(n=int(size),                                             # a Metric object is created for every run
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m1x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m1x)
-            reset_counts_merge_sort_natural()
-
-            algo = 'm2x'                                                            # perform 2-way merge sort
-            predata_m2x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m2x[i] = predata[i]
-            postdata_m2x, comps, exs, dt = merge_sort_two_way(predata_m2x)
-            metric_m2x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m2x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m2x)
-            reset_counts_merge_sort_two_way()
-
-            algo = 'm3x'                                                            # perform 3-way merge sort
-            predata_m3x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m3x[i] = predata[i]
-            postdata_m3x, comps, exs, dt = merge_sort_three_way(predata_m3x)
-            metric_m3x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m3x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m3x)
-            reset_counts_merge_sort_three_way()
-
-            algo = 'heap'                                                           # perform heap sort
-            predata_h = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_h[i] = predata[i]
-            postdata_h, comps, exs, dt = heap_sort(predata_h)
-            metric_heap = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_h,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_heap)
-            reset_counts_heap_sort()
-
-        elif file_type == 'reverse_sorted':                                         # check for reverse-sorted file type
-            predata = generate_reverse_sorted_file(size)
-
-            algo = 'm1x'                                                            # perform natural merge sort
-            predata_m1x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m1x[i] = predata[i]
-            postdata_m1x, comps, exs, dt = merge_sort_natural(predata_m1x)
-            metric_m1x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m1x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m1x)
-            reset_counts_merge_sort_natural()
 
-            algo = 'm2x'                                                                # perform 2-way merge sort
-            predata_m2x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m2x[i] = predata[i]
-            postdata_m2x, comps, exs, dt = merge_sort_two_way(predata_m2x)
-            metric_m2x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m2x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m2x)
-            reset_counts_merge_sort_two_way()
+# report progress as a % completion after every (size, file type) pair
+def print_status(size, file_type):
+    global status_count
+    status_count += 1                                                               # print status as % completion
+    print(f'{str(round(100.00 * float(status_count / status), 2))} % complete.\t\t\t'
+          f'Finished analysis of {file_type} data for size {size}.')
+    pause(0.1)                                                                      # briefly pause for visual effect
 
-            algo = 'm3x'                                                                # perform 3-way merge sort
-            predata_m3x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m3x[i] = predata[i]
-            postdata_m3x, comps, exs, dt = merge_sort_three_way(predata_m3x)
-            metric_m3x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m3x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m3x)
-            reset_counts_merge_sort_three_way()
 
-            algo = 'heap'                                                            # perform heap sort
-            predata_h = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_h[i] = predata[i]
-            postdata_h, comps, exs, dt = heap_sort(predata_h)
-            metric_heap = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_h,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_heap)
-            reset_counts_heap_sort()
+# every finished run is archived in the results container by a background thread while the next runs are sorting
+run_results_path = os.path.join(output_dir, os.path.basename(results_path))
+clear_results(run_results_path)
+results_writer = BackgroundResultsWriter(run_results_path, include_data=results_include_data)
 
-        elif file_type == 'random':                                                 # check for random sorted file type
-            predata = generate_random_sorted_file(size)
-
-            algo = 'm1x'                                                            # perform natural merge sort
-            predata_m1x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m1x[i] = predata[i]
-            postdata_m1x, comps, exs, dt = merge_sort_natural(predata_m1x)
-            metric_m1x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m1x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m1x)
-            reset_counts_merge_sort_natural()
-
-            algo = 'm2x'                                                             # perform 2-way merge sort
-            predata_m2x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m2x[i] = predata[i]
-            postdata_m2x, comps, exs, dt = merge_sort_two_way(predata_m2x)
-            metric_m2x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m2x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m2x)
-            reset_counts_merge_sort_two_way()
-
-            algo = 'm3x'                                                             # perform 3-way merge sort
-            predata_m3x = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_m3x[i] = predata[i]
-            postdata_m3x, comps, exs, dt = merge_sort_three_way(predata_m3x)
-            metric_m3x = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_m3x,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_m3x)
-            reset_counts_merge_sort_three_way()
-
-            algo = 'heap'                                                             # perform heap sort
-            predata_h = [int] * len(predata)
-            for i in range(0, len(predata)):
-                predata_h[i] = predata[i]
-            postdata_h, comps, exs, dt = heap_sort(predata_h)
-            metric_heap = m(n=int(size),
-                              sort=str(file_type),
-                              algo=str(algo),
-                              comps=comps,
-                              exs=exs,
-                              predata=predata,
-                              postdata=postdata_h,
-                              comp_eq='',
-                              ex_eq='',
-                              time=str(dt))
-            data_metrics.append(metric_heap)
-            reset_counts_heap_sort()
-        status_count += 1                                                             # print status as % completion
-        print(f'{str(round(100.00 * float(status_count / status), 2))} % complete.\t\t\t'
-              f'Finished analysis of {file_type} data for size {size}.')
-        time.sleep(0.1)                                                               # briefly pause for visual effect
+# begin automatically generating and distributing the data to its respective algorithm
+# each (size, file type, algorithm) cell produces one Metric object; with more than one worker the cells run in
+#   parallel, and with isolation_mode each cell runs in its own fresh, CPU-pinned subprocess
+data_metrics = run_battle(sizes,
+                          types,
+                          algos,
+                          workers=arguments.workers,
+                          status_callback=print_status,
+                          count_mode=battle_count_mode,
+                          isolate=isolation_mode,
+                          cpu=isolation_cpu,
+                          cache_datasets=dataset_caching,
+                          result_callback=results_writer.submit,
+                          keep_data=False,
+                          repeats=arguments.repeats)
 print('_________________________________________________________________________________________')
 
+# wait for the last runs to be archived (a failed write is raised here); the per-run .csv files are only exported
+#   from the results container on request
+results_writer.close()
+if csv_export:
+    export_csv(run_results_path, output_dir)
+
 # all sorting runs are complete
 # now present the results and performance metrics to the user
 # inform them of what is to come
 print(f'\n\nPresenting results of analysis now.\nA final summary will follow a series of performance graphs.')
-time.sleep(5.0)
+pause(5.0)
 
 # process data for graphing, saving, and printing
-graph.stratify_data_sorts(data_metrics)
+graph.stratify_data_sorts(data_metrics, interactive=not arguments.batch, output_dir=output_dir)
 print('*****************************************************************************************')
 print('*****************************************************************************************')
 
 # graphing complete, now build and write the performance summary
-print(f'\nSummary of all {len(file_types) * len(file_sizes) * len(sort_algos)} analyzed sorting runs:')
+print(f'\nSummary of all {run_count} analyzed sorting runs:')
 print('_________________________________________________________________________________________')
-graph.present_and_save_summary()
+graph.present_and_save_summary(output_dir)
 
-# inform user to check 'output_files' folder for a thorough archive of the analysis
-print(f'\nA copy of the graph above along with individual .csv files for each of the '
-      f'{len(file_types) * len(file_sizes) * len(sort_algos)} sorting runs may be found in the `output_files` folder.')
+# select the complexity class of every measured cost curve and extrapolate it to the target input size
+print(f'\nComplexity class of every cost curve, extrapolated to n = {complexity_target_n}:')
+print('_________________________________________________________________________________________')
+complexity_report(data_metrics, complexity_target_n, complexity_criterion,
+                  path=os.path.join(output_dir, 'COMPLEXITY_ANALYSIS.csv'))
+
+# on request, predict the time of every run from its counts with the per-machine cost of a comparison and an exchange;
+#   the runs sort lists, so the costs of the boxed backend apply
+if arguments.predict_time:
+    run_calibration_path = os.path.join(output_dir, os.path.basename(calibration_path))
+    if os.path.exists(run_calibration_path):
+        calibrations = load_calibrations(run_calibration_path)
+    else:
+        calibrations = {backend: calibrate(backend) for backend in ['boxed', 'typed']}
+        save_calibrations(calibrations.values(), run_calibration_path)
+    print(f'\nTime of every run predicted from its counts (costs measured on {calibrations["boxed"].machine}):')
+    print('_________________________________________________________________________________________')
+    prediction_report(data_metrics, calibrations['boxed'], battle_count_mode,
+                      path=os.path.join(output_dir, 'TIME_PREDICTION.csv'))
+
+# inform user to check the output folder for a thorough archive of the analysis
+print(f'\nA copy of the summary above along with a results archive of all {run_count} sorting runs may be found in the '
+      f'`{output_dir}` folder.')
+if arguments.batch:
+    print('The graphs were saved there as well.')
+if csv_export:
+    print('Each sorting run was also exported to its own .csv file there.')
 print('____________________________________________________________________________________________'
       '____________________________________________________________________________________________\n\n')
 
@@ -0,0 +1,227 @@
+# battle.py
+# Kordel France
+########################################################################################################################
+# This file provides functions to run the sizes x types x algorithms grid of sorting runs ("the battle").
+# Every (size, file_type, algorithm) cell sorts its own copy of the generated data and returns a Metric. The cells can
+#   be run one after another in this process, or spread over a pool of worker processes.
+########################################################################################################################
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from Lab4.constants import top_k_size
+from Lab4.heap_sort import heap_sort, heap_sort_fast, top_k
+from Lab4.merge_sort_natural import merge_sort_natural, merge_sort_natural_fast
+from Lab4.merge_sort_2way import merge_sort_two_way, merge_sort_two_way_fast
+from Lab4.merge_sort_3way import merge_sort_three_way, merge_sort_three_way_fast
+from Lab4.file_manager import generate_sorted_file, generate_reverse_sorted_file, generate_random_sorted_file, \
+    generate_nearly_sorted_file, generate_sawtooth_file, generate_organ_pipe_file, generate_few_unique_file, \
+    generate_zipf_file, generate_sorted_random_appends_file, cell_seed
+from Lab4.buffers import clone_data
+from Lab4.dataset_cache import load_dataset
+from Lab4.counting import count_operations
+from Lab4.timing import time_sort, pin_to_cpu
+from Lab4.Metric import Metric as m
+
+# sorting function for every algorithm code
+SORT_FUNCTIONS = {'m1x': merge_sort_natural,
+                  'm2x': merge_sort_two_way,
+                  'm3x': merge_sort_three_way,
+                  'heap': heap_sort,
+                  'heap_top_k': partial(top_k, k=top_k_size)}
+
+# uninstrumented kernel (no counts, no timing) for every algorithm code that has one
+FAST_SORT_FUNCTIONS = {'m1x': merge_sort_natural_fast,
+                       'm2x': merge_sort_two_way_fast,
+                       'm3x': merge_sort_three_way_fast,
+                       'heap': heap_sort_fast}
+
+# algorithm code for every algorithm name listed in constants.sort_algos
+ALGO_CODES = {'natural merge sort': 'm1x',
+              '2-way merge sort': 'm2x',
+              '3-way merge sort': 'm3x',
+              'heap sort': 'heap',
+              'heap top-k': 'heap_top_k'}
+
+# data generator for every file type listed in constants.file_types
+FILE_GENERATORS = {'sorted': generate_sorted_file,
+                   'reverse_sorted': generate_reverse_sorted_file,
+                   'random': generate_random_sorted_file,
+                   'nearly_sorted': generate_nearly_sorted_file,
+                   'sawtooth': generate_sawtooth_file,
+                   'organ_pipe': generate_organ_pipe_file,
+                   'few_unique': generate_few_unique_file,
+                   'zipf': generate_zipf_file,
+                   'sorted_random_appends': generate_sorted_random_appends_file}
+
+
+def run_battle_cell(size, file_type, algo, predata, count_mode='manual', disable_gc=False, repeats=None):
+    """
+    Sorts a copy of predata with one algorithm and records the run.
+    Every sort call collects its counts in its own SortStats object, so cells never carry counts into one another.
+    The counts come from one instrumented run. The time comes from the timing harness (see timing.time_sort), which
+        times repeated runs of the algorithm's uninstrumented kernel, or of the instrumented sort when it has none.
+    :param size: the length of the data (n).
+    :param file_type: the distribution of the data (sorted, reverse-sorted, random).
+    :param algo: the algorithm code - a key of SORT_FUNCTIONS.
+    :param predata: the generated data; it is copied before sorting and never modified.
+    :param count_mode: 'manual' for the algorithm's own counters, or 'proxy' to run its uninstrumented kernel in
+        counting mode, where exchanges are element writes. Algorithms without a kernel are always counted manually.
+    :param disable_gc: if True, the garbage collector is off during the timed runs (see timing.time_sort).
+    :param repeats: the exact number of timed repeats; None lets the timing harness stop once the median is precise
+        enough (see constants.timing_min_repeats / timing_max_repeats).
+    ;return: a Metric object describing the run.
+    """
+    if count_mode == 'proxy' and algo in FAST_SORT_FUNCTIONS:
+        postdata, stats = count_operations(FAST_SORT_FUNCTIONS[algo], clone_data(predata))
+        comps = stats.comps
+        exs = stats.moves
+    else:
+        postdata, comps, exs = SORT_FUNCTIONS[algo](clone_data(predata))
+    sort_function = FAST_SORT_FUNCTIONS.get(algo, SORT_FUNCTIONS[algo])
+    if repeats is None:
+        timing = time_sort(sort_function, predata, disable_gc=disable_gc)
+    else:
+        timing = time_sort(sort_function, predata, min_repeats=repeats, max_repeats=repeats, disable_gc=disable_gc)
+    return m(n=int(size),
+             sort=str(file_type),
+             algo=str(algo),
+             comps=comps,
+             exs=exs,
+             predata=predata,
+             postdata=postdata,
+             comp_eq='',
+             ex_eq='',
+             time=timing.median,
+             time_min=timing.minimum,
+             time_iqr=timing.iqr,
+             time_repeats=timing.repeats,
+             context_switches=timing.context_switches)
+
+
+def run_isolated_cell(size, file_type, algo, predata, count_mode='manual', cpu=None, repeats=None):
+    """
+    Runs one cell in a fresh subprocess so its timing does not depend on the heap, caches or garbage collector state
+        left behind by earlier cells.
+    The subprocess is started with the 'spawn' method (a new interpreter, not a fork of this one), pinned to one CPU
+        core before the cell runs, and times the sort with the garbage collector off.
+    :param size: the length of the data (n).
+    :param file_type: the distribution of the data (sorted, reverse-sorted, random).
+    :param algo: the algorithm code - a key of SORT_FUNCTIONS.
+    :param predata: the generated data; it is copied before sorting and never modified.
+    :param count_mode: 'manual' or 'proxy' - how operations are counted (see run_battle_cell).
+    :param cpu: the CPU core to pin the subprocess to; None leaves it unpinned.
+    :param repeats: the exact number of timed repeats, or None (see run_battle_cell).
+    ;return: a Metric object describing the run.
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context, initializer=pin_to_cpu, initargs=(cpu,)) as executor:
+        metric = executor.submit(run_battle_cell, size, file_type, algo, predata, count_mode, True, repeats).result()
+    # share the parent's copy of the input instead of keeping the one sent back by the subprocess
+    metric.predata = predata
+    return metric
+
+
+def run_battle(sizes, file_types, algos, workers=1, status_callback=None, count_mode='manual', isolate=False,
+               cpu=None, cache_datasets=False, result_callback=None, keep_data=True, repeats=None):
+    """
+    Runs every (size, file_type, algorithm) cell of the battle.
+    Data is generated once per (size, file_type) from that cell's own seed (see file_manager.cell_seed) and shared by
+        all algorithms, so the same cell always sorts the same data. With more than one worker every cell is submitted
+        to a process pool as its own task (see run_pool_cell); results are still collected in grid order, so the
+        output does not depend on which cell finishes first.
+    :param sizes: the data lengths (n) to run.
+    :param file_types: the data distributions to run - keys of FILE_GENERATORS.
+    :param algos: the algorithm codes to run - keys of SORT_FUNCTIONS.
+    :param workers: the number of worker processes; 1 runs every cell in this process.
+    :param status_callback: called as status_callback(size, file_type) once all algorithms finish on that data.
+    :param count_mode: 'manual' or 'proxy' - how operations are counted (see run_battle_cell).
+    :param isolate: if True, every cell runs in its own fresh subprocess (see run_isolated_cell). Isolated cells run
+        one at a time so they do not compete for the CPU; workers is ignored.
+    :param cpu: the CPU core isolated cells are pinned to; None leaves them unpinned.
+    :param cache_datasets: if True, the data is loaded from the on-disk dataset cache (see dataset_cache.py) and only
+        generated on the first run. It is still sorted as a list, as generated data is.
+    :param result_callback: called as result_callback(metric) with every finished cell, in grid order, while the
+        remaining cells are still running (e.g. BackgroundResultsWriter.submit).
+    :param keep_data: if False, every Metric releases its presorted and postsorted arrays once the result callback
+        has taken them, keeping only their digests, so the results do not hold every array until the program ends.
+    :param repeats: the exact number of timed repeats of every cell, or None (see run_battle_cell).
+    ;return: the list of Metric objects in (size, file_type, algorithm) order.
+    """
+    groups = []
+    for size in sizes:                                                              # iterate through file sizes (n)
+        for file_type in file_types:                                                # iterate through file types
+            groups.append((size, file_type))
+
+    data_metrics = []
+    if isolate or workers <= 1:
+        # the data of a (size, file_type) group is generated when the group starts and dropped when it ends
+        for size, file_type in groups:
+            predata = generate_cell_data(size, file_type, cache_datasets)
+            for algo in algos:
+                if isolate:
+                    metric = run_isolated_cell(size, file_type, algo, predata, count_mode, cpu, repeats)
+                else:
+                    metric = run_battle_cell(size, file_type, algo, predata, count_mode, repeats=repeats)
+                finish_cell(metric, data_metrics, result_callback, keep_data)
+            if status_callback is not None:
+                status_callback(size, file_type)
+        return data_metrics
+
+    # one task per cell, so the wall time follows the slowest cell; every worker generates the data of its own cell,
+    #   which the per-cell seed (or the dataset cache) keeps identical for all algorithms, so no input is pickled to a
+    #   worker and the parent never holds the input of cells that have not started
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [[executor.submit(run_pool_cell, size, file_type, algo, count_mode, cache_datasets, repeats)
+                    for algo in algos]
+                   for size, file_type in groups]
+        for (size, file_type), group_futures in zip(groups, futures):
+            for future in group_futures:
+                finish_cell(future.result(), data_metrics, result_callback, keep_data)
+            if status_callback is not None:
+                status_callback(size, file_type)
+    return data_metrics
+
+
+def run_pool_cell(size, file_type, algo, count_mode='manual', cache_datasets=False, repeats=None):
+    """
+    Generates the data of one cell and runs it; one task of the process pool.
+    :param size: the length of the data (n).
+    :param file_type: the distribution of the data - a key of FILE_GENERATORS.
+    :param algo: the algorithm code - a key of SORT_FUNCTIONS.
+    :param count_mode: 'manual' or 'proxy' - how operations are counted (see run_battle_cell).
+    :param cache_datasets: if True, the data is loaded from the on-disk dataset cache (see dataset_cache.py).
+    :param repeats: the exact number of timed repeats, or None (see run_battle_cell).
+    ;return: a Metric object describing the run.
+    """
+    predata = generate_cell_data(size, file_type, cache_datasets)
+    return run_battle_cell(size, file_type, algo, predata, count_mode, repeats=repeats)
+
+
+def generate_cell_data(size, file_type, cache_datasets=False):
+    """
+    Generates (or loads from the dataset cache) the data of one (size, file_type) group of cells.
+    :param size: the length of the data (n).
+    :param file_type: the distribution of the data - a key of FILE_GENERATORS.
+    :param cache_datasets: if True, the data is loaded from the on-disk dataset cache (see dataset_cache.py).
+    ;return: the data as a list.
+    """
+    if cache_datasets:
+        return load_dataset(file_type, size, FILE_GENERATORS[file_type]).tolist()
+    return FILE_GENERATORS[file_type](size, seed=cell_seed(size, file_type))
+
+
+def finish_cell(metric, data_metrics, result_callback=None, keep_data=True):
+    """
+    Records a finished cell: collects its Metric, hands it to the result callback and, unless the data is kept,
+        releases the metric's arrays (see Metric.release_data).
+    :param metric: the Metric object of the finished cell.
+    :param data_metrics: the list the Metric is appended to.
+    :param result_callback: called as result_callback(metric) before the arrays are released.
+    :param keep_data: if False, the metric keeps only the digests of its arrays.
+    """
+    data_metrics.append(metric)
+    if result_callback is not None:
+        result_callback(metric)
+    if not keep_data:
+        metric.release_data()
@@ -0,0 +1,669 @@
+# benchmark.py
+# Kordel France
+########################################################################################################################
+# This file provides benchmark cells that compare alternative implementations of the sorting algorithms side by side.
+# Each cell sorts identical copies of the same generated data with every variant and prints a small table of results.
+# Run it as a module from the FranceLab4 directory: `python -m Lab4.benchmark`.
+########################################################################################################################
+
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from Lab4.constants import file_sizes
+from Lab4.file_manager import generate_sorted_file, generate_reverse_sorted_file, generate_random_sorted_file, \
+    generate_nearly_sorted_file
+from Lab4.merge_sort_2way import merge_sort_two_way, merge_sort_two_way_buffered, merge_sort_two_way_fast
+from Lab4.merge_sort_natural import merge_sort_natural, merge_sort_natural_fast
+from Lab4.heap_sort import heap_sort, heap_sort_fast, heap_sorted_iterator, top_k, SIFT_STRATEGIES
+from Lab4.merge_sort_kway import merge_sort_k_way, merge_sort_k_way_fast
+from Lab4.merge_sort_3way import merge_sort_three_way, merge_sort_three_way_fast
+from Lab4.SortStats import SortStats
+from Lab4.battle import SORT_FUNCTIONS, FAST_SORT_FUNCTIONS, FILE_GENERATORS, run_battle, run_battle_cell, \
+    run_isolated_cell
+from Lab4.counting import count_operations
+from Lab4.buffers import clone_data, to_typed_array
+from Lab4.parallel_sort import parallel_merge_sort, PARALLEL_KERNELS
+from Lab4.external_sort import external_merge_sort, write_integer_file, print_pass_report
+from Lab4.timing import time_sort, median_precision
+from Lab4.dataset_cache import load_dataset
+from Lab4.results import save_results, export_csv, BackgroundResultsWriter
+from Lab4.Metric import Metric, fit_power_law, POWER_FIT_CACHE
+from Lab4.complexity import fit_models, select_model
+from Lab4.calibration import calibrate
+
+
+def measure_wall_time(sort_function, data_arr):
+    """
+    Measures how long a sort takes with the repeated-trial timing harness (see timing.time_sort).
+    The sorts do not time themselves, so every time compared in these cells is such a median.
+    :param sort_function: a callable that sorts the array passed to it in place.
+    :param data_arr: the data to sort. It is copied before every run and never modified.
+    ;return: the median wall time in seconds.
+    """
+    return time_sort(sort_function, data_arr).median
+
+
+def measure_single_run(sort_function, data_arr):
+    """
+    Sorts a fresh copy of the data once and measures how long the sort takes.
+    Used only to show the spread of single runs next to the harness (see benchmark_timing_harness).
+    :param sort_function: a callable that sorts the array passed to it in place.
+    :param data_arr: the data to sort. It is copied first and never modified.
+    ;return: the elapsed wall time in seconds.
+    """
+    data_copy = clone_data(data_arr)
+    start_time = time.perf_counter()
+    sort_function(data_copy)
+    return time.perf_counter() - start_time
+
+
+def measure_peak_memory(sort_function, data_arr):
+    """
+    Sorts a fresh copy of the data and measures the peak memory allocated while sorting.
+    The copy of the input is made before tracing begins, so only the memory allocated by the sort itself is reported.
+    :param sort_function: a callable that sorts the array passed to it in place.
+    :param data_arr: the data to sort. It is copied first and never modified.
+    ;return: the peak number of bytes allocated during the sort.
+    """
+    data_copy = clone_data(data_arr)
+    tracemalloc.start()
+    sort_function(data_copy)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def benchmark_two_way_buffers(sizes=file_sizes):
+    """
+    Compares the slicing two-way merge sort against the single-buffer (top-down and bottom-up) variants.
+    Wall time and peak memory are measured in separate runs so the tracing overhead does not distort the timings.
+    :param sizes: the array lengths (n) to benchmark.
+    """
+    variants = [('slicing', merge_sort_two_way),
+                ('buffered top-down', lambda arr: merge_sort_two_way_buffered(arr)),
+                ('buffered bottom-up', lambda arr: merge_sort_two_way_buffered(arr, bottom_up=True))]
+
+    print('2-way merge sort: slicing vs single ping-pong buffer')
+    print('n\t\t|variant\t\t\t|time (s)\t|peak memory (KiB)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        data_arr = generate_random_sorted_file(size)
+        for name, sort_function in variants:
+            delta_time = measure_wall_time(sort_function, data_arr)
+            peak = measure_peak_memory(sort_function, data_arr)
+            print(f'{size}\t\t|{name:<20}\t|{delta_time:.6f}\t|{peak / 1024:.1f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_natural_adaptive(sizes=file_sizes):
+    """
+    Compares the fixed-pass natural merge sort against the adaptive (run stack + galloping) mode.
+    Both modes sort copies of the same sorted, nearly sorted and random inputs.
+    :param sizes: the array lengths (n) to benchmark.
+    """
+    generators = [('sorted', generate_sorted_file),
+                  ('nearly', generate_nearly_sorted_file),
+                  ('random', generate_random_sorted_file)]
+    print('natural merge sort: fixed passes vs adaptive run stack with galloping')
+    print('n\t\t|data\t\t|mode\t\t|comparisons\t|exchanges\t|time (s)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        for data_name, generator in generators:
+            data_arr = generator(size)
+            for adaptive in (False, True):
+                _, comps, exs = merge_sort_natural(data_arr[:], adaptive=adaptive)
+                delta_time = measure_wall_time(lambda arr: merge_sort_natural(arr, adaptive=adaptive), data_arr)
+                mode = 'adaptive' if adaptive else 'passes\t'
+                print(f'{size}\t\t|{data_name}\t\t|{mode}\t|{comps}\t\t|{exs}\t\t|{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_natural_descending(sizes=file_sizes):
+    """
+    Shows the natural merge sort on 'reverse_sorted' data before and after descending-run detection.
+    Without detection every element is its own run; with it the whole input is one run that is reversed in place.
+    :param sizes: the array lengths (n) to benchmark.
+    """
+    print('natural merge sort on reverse_sorted data: without vs with descending-run detection')
+    print('n\t\t|mode\t\t|descending runs\t|comparisons\t|exchanges\t|time (s)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        data_arr = generate_reverse_sorted_file(size)
+        for adaptive in (False, True):
+            for detect_descending in (False, True):
+                _, comps, exs = merge_sort_natural(data_arr[:], adaptive, detect_descending)
+                delta_time = measure_wall_time(lambda arr: merge_sort_natural(arr, adaptive, detect_descending),
+                                               data_arr)
+                mode = 'adaptive' if adaptive else 'passes\t'
+                detection = 'detected' if detect_descending else 'ignored\t'
+                print(f'{size}\t\t|{mode}\t|{detection}\t\t|{comps}\t\t|{exs}\t\t|{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_heap_strategies(sizes=file_sizes):
+    """
+    Compares the heap sort sift-down strategies on copies of the same sorted, reverse-sorted and random inputs.
+    Comparisons, exchanges, element moves (a swap is two moves) and wall time are reported for every strategy.
+    :param sizes: the array lengths (n) to benchmark.
+    """
+    generators = [('sorted', generate_sorted_file),
+                  ('reverse', generate_reverse_sorted_file),
+                  ('random', generate_random_sorted_file)]
+
+    print('heap sort: sift-down strategies')
+    print('n\t\t|data\t\t|strategy\t|comparisons\t|exchanges\t|moves\t\t|time (s)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        for data_name, generator in generators:
+            data_arr = generator(size)
+            for strategy in SIFT_STRATEGIES:
+                stats = SortStats()
+                _, comps, exs = heap_sort(data_arr[:], strategy, stats)
+                moves = stats.moves
+                delta_time = measure_wall_time(lambda arr: heap_sort(arr, strategy), data_arr)
+                print(f'{size}\t\t|{data_name}\t\t|{strategy:<10}\t|{comps}\t\t|{exs}\t\t|{moves}\t\t|'
+                      f'{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_partial_heap_sort(size=max(file_sizes), ks=(10, 100, 1000)):
+    """
+    Compares a full heap sort against taking only the k smallest elements, either from the lazy sorted iterator or
+        from the bounded top-k heap.
+    :param size: the array length (n) to select from.
+    :param ks: the numbers of smallest elements to take.
+    """
+    data_arr = generate_random_sorted_file(size)
+
+    print(f'partial heap sort at n = {size}')
+    print('mode\t\t|k\t|comparisons\t|exchanges\t|time (s)')
+    print('_________________________________________________________________________________________')
+    _, comps, exs = heap_sort(clone_data(data_arr))
+    delta_time = measure_wall_time(heap_sort, data_arr)
+    print(f'full sort\t|{size}\t|{comps}\t\t|{exs}\t\t|{delta_time:.6f}')
+    for k in ks:
+        stats = SortStats()
+        list(itertools.islice(heap_sorted_iterator(data_arr, stats=stats), k))
+        comps = stats.comps
+        exs = stats.exs
+        delta_time = measure_wall_time(lambda arr: list(itertools.islice(heap_sorted_iterator(arr), k)), data_arr)
+        print(f'iterator\t|{k}\t|{comps}\t\t|{exs}\t\t|{delta_time:.6f}')
+
+        _, comps, exs = top_k(data_arr, k)
+        delta_time = measure_wall_time(lambda arr: top_k(arr, k), data_arr)
+        print(f'top_k\t\t|{k}\t|{comps}\t\t|{exs}\t\t|{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_k_way_sweep(size=max(file_sizes), ks=range(2, 17)):
+    """
+    Sweeps the fan-in k of the loser-tree merge sort over one random input.
+    Every level of the sort reads and writes the whole array once, so memory traffic falls with the number of levels
+        (about log_k n) while the tree keeps comparisons near n log2 n for every k.
+    :param size: the array length (n) to sort.
+    :param ks: the fan-in values to try.
+    """
+    data_arr = generate_random_sorted_file(size)
+
+    print(f'k-way merge sort: fan-in sweep at n = {size}')
+    print('k\t|levels\t|comparisons\t|exchanges\t|comps / n\t|exs / n\t|time (s)')
+    print('_________________________________________________________________________________________')
+    for k in ks:
+        levels = 0
+        remaining = size
+        while remaining > 1:
+            remaining = -(-remaining // k)
+            levels += 1
+        # endloop
+
+        _, comps, exs = merge_sort_k_way(data_arr[:], k)
+        delta_time = measure_wall_time(lambda arr: merge_sort_k_way(arr, k), data_arr)
+        print(f'{k}\t|{levels}\t|{comps}\t\t|{exs}\t\t|{comps / size:.2f}\t\t|{exs / size:.2f}\t\t|'
+              f'{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def measure_footprint(data_arr):
+    """
+    Estimates the memory held by an input array.
+    For a list this is the pointer array plus every distinct boxed value; for a typed buffer it is the raw storage.
+    :param data_arr: a list, array.array or numpy.ndarray.
+    ;return: the estimated number of bytes.
+    """
+    if isinstance(data_arr, list):
+        return sys.getsizeof(data_arr) + sum(sys.getsizeof(value) for value in {id(v): v for v in data_arr}.values())
+    return sys.getsizeof(data_arr)
+
+
+def benchmark_concurrent_stats(size=max(file_sizes), threads=4):
+    """
+    Runs every battle algorithm on the same input several times at once in a thread pool.
+    Each call collects its counts in its own SortStats object, so the concurrent counts must equal the serial ones.
+    :param size: the array length (n) to sort.
+    :param threads: the number of concurrent calls per algorithm.
+    """
+    data_arr = generate_random_sorted_file(size)
+
+    print(f'per-call counts under {threads} concurrent threads at n = {size}')
+    print('algorithm\t|serial comps\t|serial exs\t|concurrent counts match')
+    print('_________________________________________________________________________________________')
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for algo, sort_function in SORT_FUNCTIONS.items():
+            _, comps, exs = sort_function(clone_data(data_arr))
+            futures = [executor.submit(sort_function, clone_data(data_arr)) for i in range(0, threads)]
+            match = all(future.result()[1:3] == (comps, exs) for future in futures)
+            print(f'{algo}\t\t|{comps}\t\t|{exs}\t\t|{match}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_instrumentation_overhead(sizes=file_sizes):
+    """
+    Compares every instrumented sort against its uninstrumented kernel on copies of the same random input.
+    Each pair runs the same algorithm with the same loop structure, so the difference is the cost of the bookkeeping.
+    :param sizes: the array lengths (n) to benchmark.
+    """
+    pairs = [('natural', merge_sort_natural, merge_sort_natural_fast),
+             ('2-way', merge_sort_two_way_buffered, merge_sort_two_way_fast),
+             ('3-way', merge_sort_three_way, merge_sort_three_way_fast),
+             ('k-way', merge_sort_k_way, merge_sort_k_way_fast),
+             ('heap', lambda arr: heap_sort(arr, 'hole'), heap_sort_fast)]
+
+    print('instrumentation overhead: instrumented sort vs uninstrumented kernel')
+    print('n\t\t|algorithm\t|instrumented (s)\t|kernel (s)\t|overhead')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        data_arr = generate_random_sorted_file(size)
+        for algo_name, instrumented_function, kernel_function in pairs:
+            instrumented_time = measure_wall_time(instrumented_function, data_arr)
+            kernel_time = measure_wall_time(kernel_function, data_arr)
+            overhead = (instrumented_time - kernel_time) / kernel_time * 100
+            print(f'{size}\t\t|{algo_name}\t\t|{instrumented_time:.6f}\t\t|{kernel_time:.6f}\t|{overhead:.1f}%')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_counting_mode(size=max(file_sizes)):
+    """
+    Compares the hand-placed counters of every algorithm with counting mode on the same random input.
+    Counting mode counts every comparison and every element write the same way for all algorithms, for both the
+        instrumented sort and its uninstrumented kernel. Hand-placed exchanges follow each algorithm's own convention
+        (a heap swap is one exchange but two writes), so only the comparison columns are expected to agree.
+    :param size: the array length (n) to sort.
+    """
+    data_arr = generate_random_sorted_file(size)
+
+    print(f'hand-placed counters vs counting mode at n = {size}')
+    print('algorithm\t|comparisons\t|proxy comps\t|kernel comps\t|exchanges\t|proxy writes\t|kernel writes')
+    print('_________________________________________________________________________________________')
+    for algo, kernel_function in FAST_SORT_FUNCTIONS.items():
+        _, comps, exs = SORT_FUNCTIONS[algo](clone_data(data_arr))
+        _, proxy_stats = count_operations(SORT_FUNCTIONS[algo], clone_data(data_arr))
+        _, kernel_stats = count_operations(kernel_function, clone_data(data_arr))
+        print(f'{algo}\t\t|{comps}\t\t|{proxy_stats.comps}\t\t|{kernel_stats.comps}\t\t|{exs}\t\t|'
+              f'{proxy_stats.moves}\t\t|{kernel_stats.moves}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_typed_buffers(size=max(file_sizes)):
+    """
+    Sorts the same random values held in a list, an array.array('q') and a NumPy int64 array with every algorithm.
+    The input footprint, the peak memory allocated by the sort (auxiliary arrays) and the wall time are reported.
+    :param size: the array length (n) to sort.
+    """
+    values = [random.randrange(1 << 40) for i in range(0, size)]
+    containers = [('list', values),
+                  ('array q', to_typed_array(values, 'q')),
+                  ('ndarray', np.array(values, dtype=np.int64))]
+    algorithms = [('natural', merge_sort_natural),
+                  ('2-way', merge_sort_two_way_buffered),
+                  ('3-way', merge_sort_three_way),
+                  ('k-way', merge_sort_k_way),
+                  ('heap', heap_sort)]
+
+    print(f'typed buffers vs boxed lists at n = {size}')
+    print('algorithm\t|container\t|input (KiB)\t|sort peak (KiB)\t|time (s)')
+    print('_________________________________________________________________________________________')
+    for algo_name, sort_function in algorithms:
+        for container_name, data_arr in containers:
+            delta_time = measure_wall_time(sort_function, data_arr)
+            peak = measure_peak_memory(sort_function, data_arr)
+            print(f'{algo_name}\t\t|{container_name}\t\t|{measure_footprint(data_arr) / 1024:.1f}\t\t|'
+                  f'{peak / 1024:.1f}\t\t\t|{delta_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_parallel_sort(size=200000, worker_counts=(1, 2, 4, 8)):
+    """
+    Compares each single-core kernel against the shared-memory parallel merge sort built on it.
+    Speed-up is only possible up to the number of CPUs on the machine; the final k-way merge runs on one core.
+    :param size: the array length (n) to sort.
+    :param worker_counts: the numbers of worker processes to try.
+    """
+    data_arr = to_typed_array([random.randrange(1 << 40) for i in range(0, size)], 'q')
+
+    print(f'parallel merge sort on shared memory at n = {size}')
+    print('kernel\t|workers\t|time (s)\t|speed-up')
+    print('_________________________________________________________________________________________')
+    for kernel, sort_function in PARALLEL_KERNELS.items():
+        single_time = measure_wall_time(sort_function, data_arr)
+        print(f'{kernel}\t|single\t\t|{single_time:.6f}\t|1.00')
+        for workers in worker_counts:
+            delta_time = measure_wall_time(lambda arr: parallel_merge_sort(arr, workers, kernel), data_arr)
+            print(f'{kernel}\t|{workers}\t\t|{delta_time:.6f}\t|{single_time / delta_time:.2f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_external_sort(size=200000, memory_limits=(1 << 16, 1 << 18, 1 << 20), fan_ins=(2, 8, 64)):
+    """
+    Runs the external merge sort on a binary file with several memory ceilings and merge fan-ins.
+    A lower ceiling makes more (shorter) runs in pass 0; a higher fan-in merges them in fewer passes.
+    :param size: the number of integers in the input file (n).
+    :param memory_limits: the memory ceilings in bytes to try.
+    :param fan_ins: the merge fan-ins to try.
+    """
+    work_dir = tempfile.mkdtemp(prefix='external_benchmark_')
+    input_path = os.path.join(work_dir, 'input.bin')
+    output_path = os.path.join(work_dir, 'output.bin')
+    write_integer_file(input_path, [random.randrange(1 << 40) for i in range(0, size)])
+
+    print(f'external merge sort at n = {size}')
+    print('memory (B)\t|fan-in\t|passes\t|bytes read\t|bytes written\t|time (s)')
+    print('_________________________________________________________________________________________')
+    pass_stats = []
+    for memory_limit in memory_limits:
+        for fan_in in fan_ins:
+            _, _, _, delta_time, pass_stats = external_merge_sort(input_path, output_path, memory_limit, fan_in,
+                                                                  tmp_dir=work_dir)
+            bytes_read = sum(stats['bytes_read'] for stats in pass_stats)
+            bytes_written = sum(stats['bytes_written'] for stats in pass_stats)
+            print(f'{memory_limit}\t\t|{fan_in}\t|{len(pass_stats)}\t|{bytes_read}\t|{bytes_written}\t|'
+                  f'{delta_time:.6f}')
+    print('_________________________________________________________________________________________')
+    print('per-pass report of the last run:')
+    print_pass_report(pass_stats)
+    print()
+
+    os.remove(input_path)
+    os.remove(output_path)
+    os.rmdir(work_dir)
+
+
+def benchmark_timing_harness(sizes=file_sizes, shots=5):
+    """
+    Shows how much a single timed sort varies compared with the repeated-trial timing harness.
+    Each kernel is timed several times with single runs and once with time_sort. The spread of the single runs is what
+        one time.time() reading per cell used to report; the harness reports a median with its relative precision.
+    :param sizes: the array lengths (n) to benchmark.
+    :param shots: the number of separate single-run timings per kernel.
+    """
+    print('timing harness: single runs vs repeated-trial median')
+    print('n\t\t|algorithm\t|single min (s)\t|single max (s)\t|median (s)\t|IQR (s)\t|repeats\t|precision')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        data_arr = generate_random_sorted_file(size)
+        for algo, kernel_function in FAST_SORT_FUNCTIONS.items():
+            single_times = [measure_single_run(kernel_function, data_arr) for i in range(0, shots)]
+            timing = time_sort(kernel_function, data_arr)
+            print(f'{size}\t\t|{algo}\t\t|{min(single_times):.6f}\t|{max(single_times):.6f}\t|{timing.median:.6f}\t|'
+                  f'{timing.iqr:.6f}\t|{timing.repeats}\t\t|{median_precision(timing) * 100:.1f}%')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_isolation(size=max(file_sizes), runs=5, cpu=0):
+    """
+    Compares how reproducible the timing of the same cell is when it runs in this process and in isolation mode.
+    Every algorithm's cell is measured several times each way on the same random input; the run-to-run spread is the
+        range of the medians relative to their mean. Isolated runs also report the context switches of their timed
+        runs.
+    :param size: the array length (n) to sort.
+    :param runs: the number of times every cell is measured each way.
+    :param cpu: the CPU core isolated cells are pinned to.
+    """
+    data_arr = generate_random_sorted_file(size)
+
+    print(f'isolation mode: run-to-run spread of the median time at n = {size}')
+    print('algorithm\t|mode\t\t|mean median (s)\t|spread\t|context switches')
+    print('_________________________________________________________________________________________')
+    for algo in FAST_SORT_FUNCTIONS:
+        for mode in ['in-process', 'isolated']:
+            if mode == 'isolated':
+                metrics = [run_isolated_cell(size, 'random', algo, data_arr, cpu=cpu) for i in range(0, runs)]
+            else:
+                metrics = [run_battle_cell(size, 'random', algo, data_arr) for i in range(0, runs)]
+            medians = [metric.time for metric in metrics]
+            mean_median = sum(medians) / len(medians)
+            spread = (max(medians) - min(medians)) / mean_median * 100
+            switches = [metric.context_switches for metric in metrics]
+            print(f'{algo}\t\t|{mode}\t|{mean_median:.6f}\t\t|{spread:.1f}%\t|{switches}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_random_generation(sizes=(10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7)):
+    """
+    Times the generation of random input data with and without duplicates, and checks the no-duplicates guarantee.
+    :param sizes: the array lengths (n) to generate.
+    """
+    print('random data generation')
+    print('n\t\t|duplicates\t|time (s)\t|distinct values')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        for unique in [True, False]:
+            start_time = time.perf_counter()
+            data_arr = generate_random_sorted_file(size, unique=unique, as_numpy=True)
+            delta_time = time.perf_counter() - start_time
+            distinct = len(np.unique(data_arr))
+            print(f'{size}\t|{not unique}\t\t|{delta_time:.6f}\t|{distinct}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_dataset_cache(sizes=(10 ** 5, 10 ** 6, 10 ** 7), file_type='random'):
+    """
+    Compares generating input data with loading it back from the on-disk dataset cache.
+    The cache is kept in a temporary directory that is deleted afterwards.
+    :param sizes: the array lengths (n) to generate.
+    :param file_type: the distribution to generate - a key of battle.FILE_GENERATORS.
+    """
+    generator = FILE_GENERATORS[file_type]
+    cache_dir = tempfile.mkdtemp(prefix='lab4_cache_')
+
+    print(f'dataset cache: generating vs loading {file_type} data')
+    print('n\t\t|generate + store (s)\t|load (s)\t|identical')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        start_time = time.perf_counter()
+        stored_arr = load_dataset(file_type, size, generator, cache_dir=cache_dir)
+        store_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        loaded_arr = load_dataset(file_type, size, generator, cache_dir=cache_dir)
+        load_time = time.perf_counter() - start_time
+        print(f'{size}\t|{store_time:.6f}\t\t|{load_time:.6f}\t|{bool((stored_arr == loaded_arr).all())}')
+    print('_________________________________________________________________________________________\n')
+
+    for name in os.listdir(cache_dir):
+        os.remove(os.path.join(cache_dir, name))
+    os.rmdir(cache_dir)
+
+
+def benchmark_results_output(sizes=(10 ** 4, 10 ** 5, 10 ** 6), algo='m2x'):
+    """
+    Compares the time and disk space of writing one run to the results container, with and without its arrays, and of
+        exporting it to a .csv file.
+    The files are written to a temporary directory that is deleted afterwards.
+    :param sizes: the array lengths (n) to sort.
+    :param algo: the algorithm code of the run - a key of battle.FAST_SORT_FUNCTIONS.
+    """
+    work_dir = tempfile.mkdtemp(prefix='lab4_results_')
+
+    print('results output: container vs .csv export')
+    print('n\t\t|output\t\t\t|time (s)\t|size (KiB)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        metric = run_battle_cell(size, 'random', algo, generate_random_sorted_file(size))
+        for name, include_data in [('container', False), ('container + data', True)]:
+            path = os.path.join(work_dir, f'{name.replace(" + ", "_")}_{size}')
+            start_time = time.perf_counter()
+            save_results([metric], path, include_data)
+            delta_time = time.perf_counter() - start_time
+            disk_bytes = sum(os.path.getsize(f'{path}.{extension}') for extension in ['idx', 'bin']
+                             if os.path.exists(f'{path}.{extension}'))
+            print(f'{size}\t|{name:<16}\t|{delta_time:.6f}\t|{disk_bytes / 1024:.1f}')
+
+        csv_dir = os.path.join(work_dir, f'csv_{size}')
+        os.makedirs(csv_dir)
+        start_time = time.perf_counter()
+        export_csv(path, csv_dir)
+        delta_time = time.perf_counter() - start_time
+        disk_bytes = sum(os.path.getsize(os.path.join(csv_dir, name)) for name in os.listdir(csv_dir))
+        print(f'{size}\t|{"csv export":<16}\t|{delta_time:.6f}\t|{disk_bytes / 1024:.1f}')
+    print('_________________________________________________________________________________________\n')
+
+    for directory, sub_dirs, names in os.walk(work_dir, topdown=False):
+        for name in names:
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+def benchmark_background_writer(sizes=(5 * 10 ** 4, 10 ** 5), file_types=('random', 'sorted'), algos=('m1x', 'heap')):
+    """
+    Compares archiving a battle (with its arrays) after all runs finish against archiving every run from the
+        background writer thread while the next runs are sorting.
+    The files are written to a temporary directory that is deleted afterwards.
+    :param sizes: the array lengths (n) of the battle.
+    :param file_types: the data types of the battle.
+    :param algos: the algorithm codes of the battle.
+    """
+    work_dir = tempfile.mkdtemp(prefix='lab4_writer_')
+
+    print('results output: writing after the battle vs background writer')
+    print('mode\t\t|total time (s)')
+    print('_________________________________________________________________________________________')
+    start_time = time.perf_counter()
+    metrics = run_battle(sizes, file_types, algos)
+    save_results(metrics, os.path.join(work_dir, 'after'), include_data=True)
+    print(f'after battle\t|{time.perf_counter() - start_time:.6f}')
+
+    start_time = time.perf_counter()
+    writer = BackgroundResultsWriter(os.path.join(work_dir, 'background'), include_data=True)
+    run_battle(sizes, file_types, algos, result_callback=writer.submit)
+    writer.close()
+    print(f'background\t|{time.perf_counter() - start_time:.6f}')
+    print('_________________________________________________________________________________________\n')
+
+    for name in os.listdir(work_dir):
+        os.remove(os.path.join(work_dir, name))
+    os.rmdir(work_dir)
+
+
+def benchmark_power_fit(point_counts=(10, 1000, 10000), exponent=1.3):
+    """
+    Times the power regression fit of one series, and of a whole series of metrics, each of which asks for the fit
+        of the series it belongs to (as the graphs do).
+    The series follows y = 3 * x ^ exponent with 1 % noise, so the fitted exponent is printed as a check.
+    :param point_counts: the numbers of points (runs) in the series.
+    :param exponent: the exponent of the generated series.
+    """
+    rng = np.random.default_rng(0)
+    print('power regression: one fit vs one series of metrics')
+    print('points		|one fit (ms)	|all metrics (ms)	|fitted exponent')
+    print('_________________________________________________________________________________________')
+    for points in point_counts:
+        x_vals = [100 * (i + 1) for i in range(points)]
+        y_vals = list(3.0 * np.power(x_vals, exponent) * (1.0 + 0.01 * rng.random(points)))
+        start_time = time.perf_counter()
+        fit = fit_power_law(x_vals, y_vals)
+        fit_time = time.perf_counter() - start_time
+
+        POWER_FIT_CACHE.clear()
+        metrics = [Metric(n, 'random', 'm2x', 0, 0, None, None, '', '', 0.0) for n in x_vals]
+        start_time = time.perf_counter()
+        for metric in metrics:
+            metric.fitPowerRegressionCurve(x_vals, y_vals, 'comps')
+        series_time = time.perf_counter() - start_time
+        print(f'{points}\t\t|{1000 * fit_time:.4f}\t\t|{1000 * series_time:.4f}\t\t|{fit.b:.4f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_model_selection(sizes=file_sizes, target_n=10 ** 5, file_type='random', algos=('m1x', 'm2x', 'heap')):
+    """
+    Checks how well the complexity models extrapolate: every model is fitted to the comparisons of the battle sizes,
+        and its prediction at target_n is compared with the comparisons actually counted there.
+    The selected model (lowest AICc, see complexity.select_model) is marked with *.
+    :param sizes: the array lengths (n) the models are fitted to.
+    :param target_n: the larger array length the models predict.
+    :param file_type: the data type of the runs.
+    :param algos: the algorithm codes to check.
+    """
+    metrics = run_battle(list(sizes) + [target_n], [file_type], algos)
+
+    print(f'complexity models: comparisons predicted at n = {target_n} from n <= {max(sizes)} ({file_type} data)')
+    print('algorithm\t|model\t\t|predicted\t|counted\t|error (%)')
+    print('_________________________________________________________________________________________')
+    for algo in algos:
+        runs = [metric for metric in metrics if metric.algo == algo]
+        x_vals = [metric.n for metric in runs if metric.n != target_n]
+        y_vals = [metric.comps for metric in runs if metric.n != target_n]
+        counted = [metric.comps for metric in runs if metric.n == target_n][0]
+        best = select_model(x_vals, y_vals)[0]
+        for fit in fit_models(x_vals, y_vals):
+            predicted = float(fit.predict(target_n))
+            marker = '*' if fit.model == best.model else ' '
+            print(f'{algo}\t\t|{fit.model:<9}{marker}\t|{predicted:.6g}\t|{counted}\t|'
+                  f'{100.0 * (predicted - counted) / counted:+.2f}')
+    print('_________________________________________________________________________________________\n')
+
+
+def benchmark_time_prediction(sizes=(1000, 10000, 100000), file_type='random'):
+    """
+    Calibrates the cost of a comparison and an exchange on both backends, then predicts the time of every
+        uninstrumented kernel from its counting-mode counts and compares it with the timed kernel on the same backend.
+    :param sizes: the array lengths (n) to predict.
+    :param file_type: the data type of the runs.
+    """
+    calibrations = {backend: calibrate(backend) for backend in ['boxed', 'typed']}
+    print('time prediction from counts: per-machine costs')
+    for backend, calibration in calibrations.items():
+        print(f'{backend}\t{1e9 * calibration.comp_cost:.2f} ns per comparison\t'
+              f'{1e9 * calibration.exchange_cost:.2f} ns per exchange')
+    print('algorithm\t|backend\t|n\t|measured (s)\t|predicted (s)\t|error (%)')
+    print('_________________________________________________________________________________________')
+    for size in sizes:
+        data_arr = FILE_GENERATORS[file_type](size, seed=0)
+        for algo, kernel in FAST_SORT_FUNCTIONS.items():
+            stats = count_operations(kernel, list(data_arr))[1]
+            for backend, calibration in calibrations.items():
+                container = list(data_arr) if backend == 'boxed' else to_typed_array(data_arr)
+                measured = time_sort(kernel, container).median
+                predicted = calibration.predict(stats.comps, stats.moves)
+                print(f'{algo}\t\t|{backend}\t\t|{size}\t|{measured:.6f}\t|{predicted:.6f}\t'
+                      f'|{100.0 * (predicted - measured) / measured:+.2f}')
+    # endloop
+    print('_________________________________________________________________________________________\n')
+
+
+if __name__ == '__main__':
+    benchmark_power_fit()
+    benchmark_model_selection()
+    benchmark_time_prediction()
+    benchmark_random_generation()
+    benchmark_dataset_cache()
+    benchmark_results_output()
+    benchmark_background_writer()
+    benchmark_two_way_buffers()
+    benchmark_natural_adaptive()
+    benchmark_natural_descending()
+    benchmark_heap_strategies()
+    benchmark_partial_heap_sort()
+    benchmark_k_way_sweep()
+    benchmark_concurrent_stats()
+    benchmark_instrumentation_overhead()
+    benchmark_counting_mode()
+    benchmark_timing_harness()
+    benchmark_isolation()
+    benchmark_typed_buffers()
+    benchmark_parallel_sort()
+    benchmark_external_sort()
@@ -0,0 +1,88 @@
+# buffers.py
+# Kordel France
+########################################################################################################################
+# This file provides functions that let every sorting algorithm work on typed buffers as well as on lists.
+# A Python list holds a pointer to a boxed int object per element (about 36 bytes per value); an array.array('q') or a
+#   NumPy int64/float64 array stores the raw 8-byte values. The sorts reach the raw values through a memoryview, so the
+#   input is sorted in place without ever being converted to a list, and their auxiliary arrays are allocated as
+#   memoryviews of the same element type.
+# Proxy arrays (such as the counting arrays in counting.py) take part by providing allocate_like(length) and
+#   copy_range(low, high); their auxiliary arrays are then proxies too.
+########################################################################################################################
+
+import array
+import copy
+
+
+def as_sort_buffer(data_arr):
+    """
+    Returns an indexable object through which a sort can read and write data_arr in place.
+    Lists are returned unchanged. Objects exposing the buffer protocol (array.array, numpy.ndarray, memoryview) are
+        wrapped in a one-dimensional memoryview, whose items are plain Python ints or floats.
+    :param data_arr: the container to be sorted.
+    ;return: a list or memoryview sharing storage with data_arr.
+    """
+    if isinstance(data_arr, list):
+        return data_arr
+    try:
+        buffer_arr = memoryview(data_arr)
+    except TypeError:
+        # any other mutable sequence is indexed directly
+        return data_arr
+    if buffer_arr.ndim != 1:
+        raise ValueError(f'only one-dimensional buffers can be sorted, got {buffer_arr.ndim} dimensions')
+    if buffer_arr.readonly:
+        raise ValueError('cannot sort a read-only buffer in place')
+    return buffer_arr
+
+
+def allocate_buffer(buffer_arr, length):
+    """
+    Allocates an auxiliary array of the given length with the same element type as buffer_arr.
+    :param buffer_arr: a list, memoryview or proxy array returned by as_sort_buffer.
+    :param length: the number of elements to allocate.
+    ;return: a zero-filled list or memoryview, or the proxy's own auxiliary array.
+    """
+    if isinstance(buffer_arr, memoryview):
+        return memoryview(bytearray(length * buffer_arr.itemsize)).cast(buffer_arr.format)
+    if hasattr(buffer_arr, 'allocate_like'):
+        return buffer_arr.allocate_like(length)
+    return [0] * length
+
+
+def copy_buffer(buffer_arr, low=0, high=None):
+    """
+    Copies buffer_arr[low:high] into a new auxiliary array of the same element type.
+    Unlike slicing, this always copies: a slice of a memoryview (or of a NumPy array) is a view of the same memory.
+    :param buffer_arr: a list, memoryview or proxy array returned by as_sort_buffer.
+    :param low: the first index to copy.
+    :param high: one past the last index to copy; defaults to the end of the buffer.
+    ;return: the copied list, memoryview or proxy array.
+    """
+    if isinstance(buffer_arr, memoryview):
+        source_arr = buffer_arr[low:high]
+        copy_arr = allocate_buffer(buffer_arr, len(source_arr))
+        copy_arr[:] = source_arr
+        return copy_arr
+    if hasattr(buffer_arr, 'copy_range'):
+        return buffer_arr.copy_range(low, high)
+    return buffer_arr[low:high]
+
+
+def clone_data(data_arr):
+    """
+    Makes an independent copy of an input array, keeping its container type (list, array.array or numpy.ndarray).
+    :param data_arr: the array to copy.
+    ;return: the copy.
+    """
+    return copy.copy(data_arr)
+
+
+def to_typed_array(data_arr, typecode='q'):
+    """
+    Packs an array of numbers into an array.array of raw machine values.
+    :param data_arr: the values to pack.
+    :param typecode: the array.array type code - 'q' for 64-bit signed integers, 'd' for 64-bit floats.
+    ;return: the packed array.array.
+    """
+    return array.array(typecode, data_arr)
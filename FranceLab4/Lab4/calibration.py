@@ -0,0 +1,234 @@
+# calibration.py
+# Kordel France
+########################################################################################################################
+# This file provides the wall-time model that relates the operation counts of a run to its time.
+# The model is time = comp_cost * comparisons + exchange_cost * exchanges, with one pair of costs per machine and per
+#   backend: 'boxed' (a list of Python int objects) or 'typed' (raw 64-bit values in an array.array('q') or a NumPy
+#   int64 array, which the sorts read through the same memoryview).
+# The costs are calibrated from microbenchmarks of the loops the sorts actually spend their time in - the two-way merge
+#   loop (merge_two_way_fast) and the heap sift loop (heap_sort_fast). Each workload is counted once in counting mode
+#   (counting.py), where an exchange is one element write, and timed with the timing harness (timing.py). The merge
+#   loop makes one comparison per write and the sift loop about one and a half, which is what separates the cost of a
+#   comparison from the cost of a write; the costs are the least-squares solution over both (see solve_costs).
+# A calibration is saved as a small JSON file, so costs measured on one machine can predict the time of counts taken
+#   on another.
+########################################################################################################################
+
+import json
+import os
+import platform
+import numpy as np
+from Lab4.battle import FAST_SORT_FUNCTIONS
+from Lab4.buffers import as_sort_buffer, allocate_buffer, to_typed_array
+from Lab4.counting import count_operations
+from Lab4.heap_sort import heap_sort_fast
+from Lab4.merge_sort_2way import merge_two_way_fast
+from Lab4.timing import time_sort
+
+# converts a list of values to the container of every backend
+BACKENDS = {'boxed': list,
+            'typed': to_typed_array}
+
+
+class Calibration:
+    __slots__ = ('backend', 'comp_cost', 'exchange_cost', 'machine', 'workloads')
+
+    def __init__(self, backend, comp_cost, exchange_cost, machine, workloads=()):
+        """
+        The Calibration class holds the measured cost of one comparison and one exchange on one machine and backend.
+        :param backend: the backend the costs were measured on - a key of BACKENDS.
+        ;param comp_cost: the time of one comparison in seconds.
+        ;param exchange_cost: the time of one exchange (element write) in seconds.
+        ;param machine: a description of the machine the costs were measured on.
+        ;param workloads: the measured microbenchmarks as (name, n, comparisons, exchanges, seconds) tuples.
+        """
+        self.backend = backend
+        self.comp_cost = float(comp_cost)
+        self.exchange_cost = float(exchange_cost)
+        self.machine = machine
+        self.workloads = [tuple(workload) for workload in workloads]
+
+
+    def predict(self, comps, exs):
+        """
+        Predicts the wall time of a run from its counts.
+        :param comps: the number of comparisons.
+        ;param exs: the number of exchanges (element writes).
+        ;return: the predicted time in seconds.
+        """
+        return self.comp_cost * comps + self.exchange_cost * exs
+
+
+def describe_machine():
+    """
+    Describes the machine and interpreter a calibration is measured on.
+    ;return: the description as a string.
+    """
+    return f'{platform.node()} {platform.machine()} {platform.processor()} python {platform.python_version()}'.strip()
+
+
+def merge_workload(data_arr):
+    """
+    Microbenchmark of the merge loop: merges the sorted halves of data_arr into a new array with merge_two_way_fast.
+    :param data_arr: an array whose two halves are each sorted.
+    ;return: the merged array.
+    """
+    buffer_arr = as_sort_buffer(data_arr)
+    merged_arr = allocate_buffer(buffer_arr, len(buffer_arr))
+    merge_two_way_fast(buffer_arr, 0, len(buffer_arr) // 2, len(buffer_arr), merged_arr)
+    return merged_arr
+
+
+def workload_data(name, n, seed=0):
+    """
+    Builds the input of one microbenchmark as a list.
+    :param name: 'merge' for two interleaved sorted halves (so the merge alternates between them and almost never
+        reaches its bulk copy of the rest), or 'sift' for random values to heap sort.
+    :param n: the length of the input.
+    :param seed: the seed of the random values.
+    ;return: the input list.
+    """
+    rng = np.random.default_rng(seed)
+    values = np.sort(rng.integers(0, 1 << 40, size=n))
+    if name == 'merge':
+        return values[0::2].tolist() + values[1::2].tolist()
+    rng.shuffle(values)
+    return values.tolist()
+
+
+# sort function of every microbenchmark
+WORKLOADS = {'merge': merge_workload,
+             'sift': heap_sort_fast}
+
+
+def calibrate(backend='boxed', sizes=(1000, 10000)):
+    """
+    Measures the cost of one comparison and one exchange on this machine by timing the merge and sift microbenchmarks
+        at every size, and solving the least-squares fit of time = comp_cost * comparisons + exchange_cost * exchanges.
+    :param backend: the backend to measure - a key of BACKENDS.
+    :param sizes: the input lengths of the microbenchmarks.
+    ;return: a Calibration object.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'unknown backend {backend!r}; use one of {sorted(BACKENDS)}')
+    workloads = []
+    for name, workload in WORKLOADS.items():
+        for n in sizes:
+            data_arr = workload_data(name, n)
+            stats = count_operations(workload, list(data_arr))[1]
+            timing = time_sort(workload, BACKENDS[backend](data_arr))
+            workloads.append((name, n, stats.comps, stats.moves, timing.median))
+    # endloop
+
+    counts = np.array([[comps, exs] for _, _, comps, exs, _ in workloads], dtype=np.float64)
+    times = np.array([seconds for _, _, _, _, seconds in workloads])
+    comp_cost, exchange_cost = solve_costs(counts, times)
+    return Calibration(backend, comp_cost, exchange_cost, describe_machine(), workloads)
+
+
+def solve_costs(counts, times):
+    """
+    Solves times ~ counts @ (comp_cost, exchange_cost) by least squares on relative residuals, so the large workloads
+        do not decide the costs alone, with neither cost below zero.
+    The loop overhead around every operation (index updates, reads, loop tests) is shared between the two costs. When
+        the workloads cannot tell the costs apart and one comes out negative, all of it is charged to the operation
+        that fits best alone; predictions of the total stay accurate, only the split is arbitrary.
+    :param counts: one (comparisons, exchanges) row per workload.
+    :param times: the measured time of every workload in seconds.
+    ;return: the cost of one comparison and of one exchange in seconds.
+    """
+    scaled_counts = counts / times[:, None]
+    target = np.ones_like(times)
+    costs = np.linalg.lstsq(scaled_counts, target, rcond=None)[0]
+    if (costs >= 0).all():
+        return float(costs[0]), float(costs[1])
+
+    best_costs = None
+    best_residual = None
+    for column in range(0, 2):
+        cost = np.linalg.lstsq(scaled_counts[:, [column]], target, rcond=None)[0][0]
+        residual = float(np.sum((scaled_counts[:, column] * cost - target) ** 2))
+        if best_residual is None or residual < best_residual:
+            best_costs = [0.0, 0.0]
+            best_costs[column] = float(cost)
+            best_residual = residual
+    # endloop
+    return best_costs[0], best_costs[1]
+
+
+def save_calibrations(calibrations, path):
+    """
+    Writes calibrations to a JSON file.
+    :param calibrations: the Calibration objects, one per backend.
+    :param path: the path of the JSON file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    records = [{'backend': calibration.backend,
+                'comp_cost': calibration.comp_cost,
+                'exchange_cost': calibration.exchange_cost,
+                'machine': calibration.machine,
+                'workloads': calibration.workloads} for calibration in calibrations]
+    with open(path, 'w') as json_file:
+        json.dump(records, json_file, indent=2)
+
+
+def load_calibrations(path):
+    """
+    Reads the calibrations written by save_calibrations.
+    :param path: the path of the JSON file.
+    ;return: a dict mapping every backend to its Calibration object.
+    """
+    with open(path) as json_file:
+        records = json.load(json_file)
+    return {record['backend']: Calibration(record['backend'], record['comp_cost'], record['exchange_cost'],
+                                           record['machine'], record['workloads']) for record in records}
+
+
+def prediction_report(metrics, calibration, count_mode, path=None):
+    """
+    Predicts the time of every run from its counts and prints it next to the measured time, one line per run, followed
+        by the median absolute error over all runs.
+    The costs are calibrated per comparison and per element write of the uninstrumented kernels, and the time of a run
+        is the time of its algorithm's kernel (battle.FAST_SORT_FUNCTIONS). Only counts taken with count_mode = 'proxy'
+        count exactly those operations of that kernel; the manual counters are taken on the instrumented sorts and
+        define an exchange in their own way, so they are refused. Runs of algorithms without a kernel (timed and
+        counted on the instrumented sort) are listed but not predicted.
+    :param metrics: the Metric objects of the runs.
+    :param calibration: the Calibration object of the backend the runs were timed on.
+    :param count_mode: the count mode the runs were counted in (see battle.run_battle_cell); must be 'proxy'.
+    :param path: if given, the predictions are also written to this .csv file.
+    ;return: the list of relative prediction errors (predicted - measured) / measured, in the order of metrics; nan
+        for runs that were not predicted.
+    """
+    if count_mode != 'proxy':
+        raise ValueError(f'time can only be predicted from the proxy counts of the timed kernels, but the runs were '
+                         f'counted with count_mode = {count_mode!r}')
+    rows = []
+    errors = []
+    print(f'time predicted from counts ({calibration.backend}: {1e9 * calibration.comp_cost:.2f} ns per comparison, '
+          f'{1e9 * calibration.exchange_cost:.2f} ns per exchange)')
+    print('data type\t\t|n\t|algorithm\t|measured (s)\t|predicted (s)\t|error (%)')
+    print('_________________________________________________________________________________________')
+    for metric in metrics:
+        if metric.algo not in FAST_SORT_FUNCTIONS:
+            errors.append(float('nan'))
+            rows.append(f'{metric.sort},{metric.n},{metric.algo},{metric.time:.9f},,\n')
+            print(f'{metric.sort:<16}\t|{metric.n}\t|{metric.algo}\t|{metric.time:.6f}\t|not predicted (no kernel)')
+            continue
+        predicted = calibration.predict(metric.comps, metric.exs)
+        error = (predicted - metric.time) / metric.time if metric.time > 0 else float('nan')
+        errors.append(error)
+        rows.append(f'{metric.sort},{metric.n},{metric.algo},{metric.time:.9f},{predicted:.9f},{100.0 * error:.2f}\n')
+        print(f'{metric.sort:<16}\t|{metric.n}\t|{metric.algo}\t\t|{metric.time:.6f}\t|{predicted:.6f}\t'
+              f'|{100.0 * error:+.2f}')
+    # endloop
+    print('_________________________________________________________________________________________')
+    print(f'median absolute error: {100.0 * float(np.nanmedian(np.abs(errors))):.2f} %\n')
+
+    if path is not None:
+        with open(path, 'w') as csv_file:
+            csv_file.write('data_type,n,algorithm,measured_time,predicted_time,error_percent\n')
+            csv_file.writelines(rows)
+    return errors
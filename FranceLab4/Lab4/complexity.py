@@ -0,0 +1,291 @@
+# complexity.py
+# Kordel France
+########################################################################################################################
+# This file provides complexity-class model selection for the measured cost curves of the battle.
+# The power regression in Metric.py always fits y = a * n ^ b, which cannot tell n log n apart from n ^ 1.1 and gives
+#   no way to judge which shape the data actually supports. Here every (algorithm, data type) series of comparisons,
+#   exchanges or time is fitted with a set of candidate models:
+#       linear      y = a * n
+#       n log n     y = a * n * log2(n) + b
+#       quadratic   y = a * n ^ 2
+#       power       y = a * n ^ b + c
+#   and the candidates are ranked with an information criterion, which charges every extra parameter against the
+#   improvement in fit, so the 3-parameter power curve only wins when the simpler classes really do not fit.
+# The models are fitted by least squares on relative residuals (y - model) / y: counts and times span several orders of
+#   magnitude across n, and their noise grows with them, so plain residuals would let the largest n decide everything.
+# The selected model predicts the cost at a target n (e.g. a production input size) without running that size.
+########################################################################################################################
+
+import csv
+import numpy as np
+
+# model names, in the order ties are resolved (the simpler model first)
+MODEL_NAMES = ['linear', 'n log n', 'quadratic', 'power']
+
+# number of fitted parameters of every model
+MODEL_PARAMETERS = {'linear': 1, 'n log n': 2, 'quadratic': 1, 'power': 3}
+
+# Metric field of every quantity that can be fitted
+QUANTITY_FIELDS = {'comps': 'comps', 'exs': 'exs', 'time': 'time'}
+
+# exponents tried by the power model before the best one is refined
+POWER_EXPONENTS = np.arange(0.5, 3.01, 0.05)
+
+
+class ModelFit:
+    __slots__ = ('model', 'params', 'rss', 'points', 'aic', 'bic')
+
+    def __init__(self, model, params, rss, points):
+        """
+        The ModelFit class holds one candidate model fitted to one series and its information criteria.
+        :param model: the model name - one of MODEL_NAMES.
+        ;param params: the fitted parameters: (a,) for linear and quadratic, (a, b) for n log n, (a, b, c) for power.
+        ;param rss: the sum of squared relative residuals of the fit.
+        ;param points: the number of points the model was fitted to.
+        """
+        self.model = model
+        self.params = tuple(float(param) for param in params)
+        self.rss = float(rss)
+        self.points = points
+        k = MODEL_PARAMETERS[model]
+        # a perfect fit would give log(0); the floor is far below any real residual of counts or timings
+        log_likelihood = points * np.log(max(self.rss / points, 1e-30))
+        # AIC with the small-sample correction (AICc): the battle fits only a handful of sizes
+        self.aic = log_likelihood + 2 * k + (2 * k * (k + 1)) / (points - k - 1)
+        self.bic = log_likelihood + k * np.log(points)
+
+
+    def predict(self, n):
+        """
+        Evaluates the fitted model.
+        :param n: the input size, or an array of them.
+        ;return: the predicted cost at n.
+        """
+        return evaluate_model(self.model, self.params, np.asarray(n, dtype=np.float64))
+
+
+    def criterion(self, criterion='aic'):
+        """
+        Returns the value of an information criterion for this fit; lower is better.
+        :param criterion: 'aic' (small-sample corrected) or 'bic'. With the handful of sizes the battle runs, BIC
+            charges an extra parameter less than AICc does (log(6) < 2), so AICc is the default.
+        ;return: the criterion value.
+        """
+        if criterion == 'aic':
+            return self.aic
+        if criterion == 'bic':
+            return self.bic
+        raise ValueError(f'unknown criterion {criterion!r}; use "aic" or "bic"')
+
+
+    def equation(self):
+        """
+        Formats the fitted model as an equation.
+        ;return: the equation as a string.
+        """
+        if self.model == 'linear':
+            return f'y = {self.params[0]:.4g} n'
+        if self.model == 'n log n':
+            return f'y = {self.params[0]:.4g} n log2(n) {format_constant(self.params[1])}'
+        if self.model == 'quadratic':
+            return f'y = {self.params[0]:.4g} n^2'
+        return f'y = {self.params[0]:.4g} n^{self.params[1]:.4f} {format_constant(self.params[2])}'
+
+
+def format_constant(value):
+    """
+    Formats the constant term of an equation with its sign (e.g. '+ 2.5' or '- 47.71').
+    :param value: the constant.
+    ;return: the signed constant as a string.
+    """
+    return f'{"-" if value < 0 else "+"} {abs(value):.4g}'
+
+
+def evaluate_model(model, params, n):
+    """
+    Evaluates a model with the given parameters.
+    :param model: the model name - one of MODEL_NAMES.
+    :param params: the parameters of the model (see ModelFit).
+    :param n: the input sizes as a float array.
+    ;return: the model values at n.
+    """
+    if model == 'linear':
+        return params[0] * n
+    if model == 'n log n':
+        return params[0] * n * np.log2(n) + params[1]
+    if model == 'quadratic':
+        return params[0] * n * n
+    return params[0] * np.power(n, params[1]) + params[2]
+
+
+def solve_relative(columns, y):
+    """
+    Solves the linear least-squares problem y ~ columns @ coefficients on relative residuals.
+    :param columns: the design matrix, one row per point.
+    :param y: the observed values (all positive).
+    ;return: the coefficients and the sum of squared relative residuals.
+    """
+    weights = 1.0 / y
+    coefficients = np.linalg.lstsq(columns * weights[:, None], np.ones_like(y), rcond=None)[0]
+    residuals = (y - columns @ coefficients) * weights
+    return coefficients, float(residuals @ residuals)
+
+
+def fit_power(n, y):
+    """
+    Fits y = a * n ^ b + c. For a fixed exponent b the model is linear in a and c, so a and c are solved exactly for
+        every exponent of POWER_EXPONENTS, and the best exponent is then refined by golden-section search around it.
+    :param n: the input sizes as a float array.
+    :param y: the observed values (all positive).
+    ;return: the parameters (a, b, c) and the sum of squared relative residuals.
+    """
+    def rss_at(exponent):
+        return solve_relative(np.column_stack([np.power(n, exponent), np.ones_like(n)]), y)[1]
+
+    errors = [rss_at(exponent) for exponent in POWER_EXPONENTS]
+    best = int(np.argmin(errors))
+    low = POWER_EXPONENTS[max(best - 1, 0)]
+    high = POWER_EXPONENTS[min(best + 1, len(POWER_EXPONENTS) - 1)]
+    ratio = (np.sqrt(5.0) - 1.0) / 2.0
+    for _ in range(40):
+        left = high - ratio * (high - low)
+        right = low + ratio * (high - low)
+        if rss_at(left) < rss_at(right):
+            high = right
+        else:
+            low = left
+    # endloop
+    exponent = (low + high) / 2.0
+    (a, c), rss = solve_relative(np.column_stack([np.power(n, exponent), np.ones_like(n)]), y)
+    return (a, exponent, c), rss
+
+
+def usable_points(x_vals, y_vals):
+    """
+    Drops the points of a series with a non-positive value, where relative residuals are undefined.
+    :param x_vals: the input sizes (n) of the series.
+    :param y_vals: the measured costs.
+    ;return: the remaining input sizes and costs as float arrays.
+    """
+    n = np.asarray(x_vals, dtype=np.float64)
+    y = np.asarray(y_vals, dtype=np.float64)
+    keep = (y > 0) & (n > 0)
+    return n[keep], y[keep]
+
+
+def skipped_models(points, models=MODEL_NAMES):
+    """
+    Lists the models that cannot be fitted to a series of the given number of points: a model needs at least two more
+        points than it has parameters, so its corrected AIC exists.
+    :param points: the number of usable points of the series (see usable_points).
+    :param models: the names of the candidate models.
+    ;return: a (model, points needed) pair for every model that is skipped.
+    """
+    return [(model, MODEL_PARAMETERS[model] + 2) for model in models if points < MODEL_PARAMETERS[model] + 2]
+
+
+def fit_models(x_vals, y_vals, models=MODEL_NAMES):
+    """
+    Fits every candidate model to one series.
+    Points with a non-positive value are left out (see usable_points), and the models listed by skipped_models are not
+        fitted.
+    :param x_vals: the input sizes (n) of the series.
+    :param y_vals: the measured costs (comparisons, exchanges or seconds).
+    :param models: the names of the models to fit.
+    ;return: the list of ModelFit objects, in the order of models.
+    """
+    n, y = usable_points(x_vals, y_vals)
+    skipped = [model for model, _ in skipped_models(len(n), models)]
+
+    fits = []
+    for model in models:
+        if model in skipped:
+            continue
+        if model == 'linear':
+            params, rss = solve_relative(n[:, None], y)
+        elif model == 'n log n':
+            params, rss = solve_relative(np.column_stack([n * np.log2(n), np.ones_like(n)]), y)
+        elif model == 'quadratic':
+            params, rss = solve_relative((n * n)[:, None], y)
+        else:
+            params, rss = fit_power(n, y)
+        fits.append(ModelFit(model, params, rss, len(n)))
+    return fits
+
+
+def select_model(x_vals, y_vals, criterion='aic', models=MODEL_NAMES):
+    """
+    Fits every candidate model to one series and selects the one with the lowest information criterion.
+    :param x_vals: the input sizes (n) of the series.
+    :param y_vals: the measured costs.
+    :param criterion: 'aic' or 'bic' (see ModelFit.criterion).
+    :param models: the names of the models to consider.
+    ;return: the best ModelFit and the list of all fits ranked from best to worst; (None, []) if no model could be
+        fitted (e.g. a series of zero exchanges).
+    """
+    fits = fit_models(x_vals, y_vals, models)
+    ranked = sorted(fits, key=lambda fit: (fit.criterion(criterion), MODEL_NAMES.index(fit.model)))
+    if len(ranked) == 0:
+        return None, []
+    return ranked[0], ranked
+
+
+def complexity_report(metrics, target_n, criterion='aic', quantities=('comps', 'exs', 'time'), path=None):
+    """
+    Selects the complexity model of every (data type, algorithm, quantity) series of the battle, prints one line per
+        series with the selected model, the margin by which it beat the runner-up, and its predicted cost at target_n.
+    A margin above about 10 is strong evidence for the selected model; below about 2 the data barely separates the two.
+    Models the series has too few sizes for are not candidates (see skipped_models); they are listed at the end of the
+        line with the number of sizes they need.
+    :param metrics: the Metric objects of the battle.
+    :param target_n: the input size to predict the cost at.
+    :param criterion: 'aic' or 'bic' (see ModelFit.criterion).
+    :param quantities: the quantities to fit - keys of QUANTITY_FIELDS.
+    :param path: if given, the report is also written to this .csv file.
+    ;return: a dict mapping (data type, algorithm, quantity) to the selected ModelFit (None if nothing could be fitted).
+    """
+    series = {}
+    for metric in metrics:
+        key = (metric.sort, metric.algo)
+        if key not in series:
+            series[key] = []
+        series[key].append(metric)
+
+    rows = []
+    selected = {}
+    print(f'complexity models ({criterion.upper()}) and predicted cost at n = {target_n}')
+    print('data type\t\t|algorithm\t|quantity\t|model\t\t|margin\t\t|predicted cost\t|equation')
+    print('____________________________________________________________________________________________'
+          '____________________________________________________________________________________________')
+    for (file_type, algo), group in series.items():
+        group = sorted(group, key=lambda metric: metric.n)
+        x_vals = [metric.n for metric in group]
+        for quantity in quantities:
+            y_vals = [getattr(metric, QUANTITY_FIELDS[quantity]) for metric in group]
+            points = len(usable_points(x_vals, y_vals)[0])
+            skipped = ', '.join(f'{model} (needs {needed} sizes, has {points})'
+                                for model, needed in skipped_models(points))
+            note = f'\t|skipped: {skipped}' if skipped else ''
+            best, ranked = select_model(x_vals, y_vals, criterion)
+            selected[(file_type, algo, quantity)] = best
+            if best is None:
+                rows.append([file_type, algo, quantity, 'none', '', '', '', skipped])
+                print(f'{file_type:<16}\t|{algo}\t\t|{quantity}\t\t|none{note}')
+                continue
+            margin = ranked[1].criterion(criterion) - best.criterion(criterion) if len(ranked) > 1 else float('inf')
+            prediction = float(best.predict(target_n))
+            rows.append([file_type, algo, quantity, best.model, f'{margin:.2f}', f'{prediction:.6g}', best.equation(),
+                         skipped])
+            print(f'{file_type:<16}\t|{algo}\t\t|{quantity}\t\t|{best.model:<9}\t|{margin:.2f}\t\t|{prediction:.6g}'
+                  f'\t|{best.equation()}{note}')
+    # endloop
+    print('____________________________________________________________________________________________'
+          '____________________________________________________________________________________________\n')
+
+    if path is not None:
+        with open(path, 'w', newline='') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(['data_type', 'algorithm', 'quantity', 'model', f'{criterion}_margin',
+                                 f'predicted_at_{target_n}', 'equation', 'skipped_models'])
+            csv_writer.writerows(rows)
+    return selected
@@ -7,8 +7,53 @@
 
 # sorting file sizes
 file_sizes = [50, 500, 1000, 2000, 5000, 10000]
-# sorting file distribution types
-file_types = ['sorted', 'reverse_sorted', 'random']
+# sorting file distribution types (each is generated by the function registered for it in battle.FILE_GENERATORS)
+file_types = ['sorted', 'reverse_sorted', 'random', 'nearly_sorted', 'sawtooth', 'organ_pipe', 'few_unique', 'zipf',
+              'sorted_random_appends']
+# base seed of the generated data; every (size, file type) cell derives its own seed from it, so runs are reproducible.
+#   None generates different data on every run
+data_seed = 605202
+# on-disk cache of the generated data (dataset_cache.py): whether the battle uses it, the directory it is kept in, and
+#   the most bytes it may hold before the least recently used datasets are deleted
+dataset_caching = True
+dataset_cache_dir = 'dataset_cache'
+dataset_cache_limit = 1024 * 1024 * 1024
+# random data: True generates no duplicate values; the values span [1000, 1000 + n * random_value_spread)
+random_unique = True
+random_value_spread = 4
+# results container (results.py) every run is archived in (without extension), whether it also stores the presorted
+#   and postsorted arrays, and whether every run is additionally exported to its own .csv file
+results_path = 'output_files/results'
+results_include_data = False
+csv_export = False
+# most finished runs waiting in the queue of the background results writer before the battle waits for it
+results_queue_size = 32
 # sorting algorithms
 sort_algos = ['natural merge sort', '2-way merge sort', '3-way merge sort', 'heap sort']
-
+# number of smallest elements selected by 'heap top-k' (not run by default; add it to sort_algos to compare it)
+top_k_size = 100
+# how the battle counts operations: 'manual' uses the counters placed in each algorithm; 'proxy' runs the
+#   uninstrumented kernels in counting mode (counting.py), where every comparison and every element write is counted
+count_mode = 'manual'
+# number of worker processes used to run the sorting runs; 1 runs them one after another in a single process
+worker_count = 1
+# timing harness (timing.py): untimed warm-up runs, fewest / most timed repeats, target relative precision of the
+#   median, and the time budget in seconds after which no further repeats are started
+timing_warmup = 1
+timing_min_repeats = 5
+timing_max_repeats = 50
+timing_precision = 0.02
+timing_budget = 1.0
+# isolation mode: run every sorting run in a fresh subprocess pinned to the CPU core isolation_cpu (None leaves it
+#   unpinned), with the garbage collector off while it is timed; runs are then made one at a time
+isolation_mode = False
+isolation_cpu = 0
+# complexity-class model selection (complexity.py): the input size the selected models predict the cost at, and the
+#   information criterion that selects them ('aic' - small-sample corrected - or 'bic')
+complexity_target_n = 10 ** 7
+complexity_criterion = 'aic'
+# wall-time prediction from counts (calibration.py): whether the driver reports it (also --predict-time), and the file
+#   the per-machine costs are kept in. An existing file is reused (e.g. one calibrated on the target machine); otherwise
+#   this machine is calibrated first, which takes a while, so the prediction is off by default
+time_prediction = False
+calibration_path = 'output_files/calibration.json'
@@ -0,0 +1,129 @@
+# counting.py
+# Kordel France
+########################################################################################################################
+# This file provides the counting mode: an exact, uniform way to count the operations of any sorting algorithm.
+# The hand-placed counters in each algorithm follow that algorithm's own conventions. In counting mode the data is
+#   instead wrapped so that every element comparison (<, <=, >, >=) and every write into an array is counted by the
+#   elements and arrays themselves:
+#   CountedValue  - wraps one element; each comparison with another element adds one to stats.comps.
+#   CountingArray - wraps the array being sorted; each element written adds one to stats.moves. Auxiliary arrays the
+#                   sort allocates through buffers.allocate_buffer / copy_buffer are CountingArrays as well.
+# Any sort can run in counting mode, including the uninstrumented *_fast kernels, which have no counters of their own.
+########################################################################################################################
+
+from Lab4.buffers import as_sort_buffer
+from Lab4.SortStats import SortStats
+
+
+class CountedValue:
+    __slots__ = ('value', 'stats')
+
+    def __init__(self, value, stats):
+        """
+        The CountedValue class wraps one element and counts every comparison made with it.
+        :param value: the wrapped element.
+        ;param stats: the SortStats object whose comps are incremented by each comparison.
+        """
+        self.value = value
+        self.stats = stats
+
+
+    def __lt__(self, other):
+        self.stats.comps += 1
+        return self.value < other.value
+
+
+    def __le__(self, other):
+        self.stats.comps += 1
+        return self.value <= other.value
+
+
+    def __gt__(self, other):
+        self.stats.comps += 1
+        return self.value > other.value
+
+
+    def __ge__(self, other):
+        self.stats.comps += 1
+        return self.value >= other.value
+
+
+class CountingArray:
+    __slots__ = ('data', 'stats')
+
+    def __init__(self, data, stats):
+        """
+        The CountingArray class wraps a list of elements and counts every element written into it.
+        Reading is free; writing one element, or each element of a slice assignment, adds one to stats.moves.
+        :param data: the wrapped list.
+        ;param stats: the SortStats object whose moves are incremented by each write.
+        """
+        self.data = data
+        self.stats = stats
+
+
+    def __len__(self):
+        return len(self.data)
+
+
+    def __iter__(self):
+        return iter(self.data)
+
+
+    def __getitem__(self, index):
+        # a slice is returned as a plain list, i.e. as the source of a later (counted) write
+        return self.data[index]
+
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            if isinstance(value, CountingArray):
+                value = value.data
+            elif not isinstance(value, list):
+                value = list(value)
+            self.stats.moves += len(value)
+        else:
+            self.stats.moves += 1
+        self.data[index] = value
+
+
+    def allocate_like(self, length):
+        """
+        Allocates an empty auxiliary array that counts into the same stats (see buffers.allocate_buffer).
+        :param length: the number of elements to allocate.
+        ;return: the new CountingArray.
+        """
+        return CountingArray([None] * length, self.stats)
+
+
+    def copy_range(self, low=0, high=None):
+        """
+        Copies data[low:high] into a new auxiliary array (see buffers.copy_buffer); every copied element is a write.
+        :param low: the first index to copy.
+        :param high: one past the last index to copy; defaults to the end of the array.
+        ;return: the new CountingArray.
+        """
+        copy_data = self.data[low:high]
+        self.stats.moves += len(copy_data)
+        return CountingArray(copy_data, self.stats)
+
+
+def count_operations(sort_function, data_arr, *args, **kwargs):
+    """
+    Runs a sort in counting mode and writes the sorted values back into data_arr.
+    The elements are wrapped before the sort and unwrapped afterwards, neither of which is counted. The run is not
+        timed: the wrapping overhead of every operation would make it incomparable to an unwrapped sort.
+    :param sort_function: the sort to run; it is called as sort_function(array, *args, **kwargs).
+    :param data_arr: a list, array.array or one-dimensional numpy.ndarray to sort in place.
+    ;return data_arr: the sorted array.
+    ;return stats: a SortStats object with every comparison in comps and every element write in moves.
+    """
+    stats = SortStats()
+    buffer_arr = as_sort_buffer(data_arr)
+    counting_arr = CountingArray([CountedValue(value, stats) for value in buffer_arr], stats)
+
+    sort_function(counting_arr, *args, **kwargs)
+
+    for i in range(0, len(counting_arr.data)):
+        buffer_arr[i] = counting_arr.data[i].value
+    return data_arr, stats
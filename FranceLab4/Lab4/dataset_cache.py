@@ -0,0 +1,128 @@
+# dataset_cache.py
+# Kordel France
+########################################################################################################################
+# This file provides an on-disk cache of the generated input data.
+# A dataset is identified by its (distribution, size, seed, dtype) key and the fingerprint of its generator, which
+#   covers the generator itself (its name, bytecode, constants and defaults), file_manager.GENERATOR_VERSION and the
+#   generation settings of constants.py, so a changed generator or setting never reads back data generated before the
+#   change. Helpers the generator calls are not hashed; a change to one of them still needs a GENERATOR_VERSION bump. The first request generates it
+#   and saves it as a .npy file in the cache directory; every later request, in this run or the next, loads the same
+#   bytes back with memory mapping instead of generating them again.
+# The cache is bounded in bytes. When it grows past its limit, the least recently used files are deleted first; a file
+#   counts as used whenever it is written or loaded, which is recorded in its modification time.
+########################################################################################################################
+
+import os
+import zlib
+import numpy as np
+from Lab4.constants import data_seed, dataset_cache_dir, dataset_cache_limit, random_unique, random_value_spread
+from Lab4.file_manager import cell_seed, GENERATOR_VERSION
+
+
+def generator_fingerprint(generator):
+    """
+    Hashes everything besides the dataset key that decides the generated data: the generator function (its name,
+        bytecode, constants and default arguments), the generator version and the generation settings of constants.py.
+        An edit to the body or the defaults of the generator therefore changes the fingerprint without a version bump.
+    :param generator: the file_manager function that generates the distribution.
+    ;return: the fingerprint as 8 hexadecimal digits.
+    """
+    settings = f'{generator.__module__}.{generator.__qualname__}|v{GENERATOR_VERSION}|unique={random_unique}|' \
+               f'spread={random_value_spread}|defaults={generator.__defaults__!r}|' \
+               f'kwdefaults={generator.__kwdefaults__!r}'
+    return f'{zlib.crc32(code_material(generator.__code__), zlib.crc32(settings.encode())):08x}'
+
+
+def code_material(code):
+    """
+    Collects the bytes of a code object that decide what it does: its bytecode and its constants.
+    Nested code objects (of lambdas, comprehensions or inner functions) are expanded the same way, since their repr
+        holds a memory address that differs between runs.
+    :param code: the code object, e.g. function.__code__.
+    ;return: the bytes to hash.
+    """
+    material = [code.co_code]
+    for constant in code.co_consts:
+        if hasattr(constant, 'co_code'):
+            material.append(code_material(constant))
+        else:
+            material.append(repr(constant).encode())
+    return b'|'.join(material)
+
+
+def dataset_path(file_type, size, seed, dtype, fingerprint, cache_dir=dataset_cache_dir):
+    """
+    Builds the path of the cache file for one dataset key.
+    :param file_type: the distribution of the data - a name listed in constants.file_types.
+    :param size: the length of the data (n).
+    :param seed: the base seed the data is generated from (see file_manager.cell_seed).
+    :param dtype: the NumPy dtype the data is stored as.
+    :param fingerprint: the fingerprint of the generator (see generator_fingerprint).
+    :param cache_dir: the cache directory.
+    ;return: the path of the .npy file.
+    """
+    return os.path.join(cache_dir, f'{file_type}-{size}-{seed}-{np.dtype(dtype).name}-{fingerprint}.npy')
+
+
+def evict_datasets(cache_dir=dataset_cache_dir, limit=dataset_cache_limit, keep=None):
+    """
+    Deletes the least recently used cache files until the cache directory holds at most limit bytes.
+    :param cache_dir: the cache directory.
+    :param limit: the most bytes the cache may hold.
+    :param keep: a path that is never deleted (the dataset just stored), even if it alone exceeds the limit.
+    ;return: the paths of the deleted files.
+    """
+    entries = []
+    total_bytes = 0
+    for name in os.listdir(cache_dir):
+        if not name.endswith('.npy'):
+            continue
+        path = os.path.join(cache_dir, name)
+        status = os.stat(path)
+        entries.append((status.st_mtime_ns, status.st_size, path))
+        total_bytes += status.st_size
+
+    evicted = []
+    for mtime, size, path in sorted(entries):
+        if total_bytes <= limit:
+            break
+        if keep is not None and os.path.abspath(path) == os.path.abspath(keep):
+            continue
+        os.remove(path)
+        total_bytes -= size
+        evicted.append(path)
+    return evicted
+
+
+def load_dataset(file_type, size, generator, seed=data_seed, dtype=np.int64, cache_dir=dataset_cache_dir,
+                 limit=dataset_cache_limit):
+    """
+    Returns the dataset for (file_type, size, seed, dtype), generating and caching it on the first request and
+        whenever the generator has changed since (see generator_fingerprint).
+    Data generated without a seed differs on every call, so it is returned without being cached.
+    :param file_type: the distribution of the data - a name listed in constants.file_types.
+    :param size: the length of the data (n).
+    :param generator: the file_manager function that generates this distribution.
+    :param seed: the base seed the data is generated from (see file_manager.cell_seed); None disables caching.
+    :param dtype: the NumPy dtype the data is stored as.
+    :param cache_dir: the cache directory; it is created if it does not exist.
+    :param limit: the most bytes the cache may hold (see evict_datasets).
+    ;return: a read-only, memory-mapped numpy array (an in-memory numpy array if seed is None).
+    """
+    if seed is None:
+        return generator(size, seed=None, as_numpy=True).astype(dtype, copy=False)
+
+    path = dataset_path(file_type, size, seed, dtype, generator_fingerprint(generator), cache_dir)
+    if os.path.exists(path):
+        os.utime(path)                                                              # mark as most recently used
+        return np.load(path, mmap_mode='r')
+
+    os.makedirs(cache_dir, exist_ok=True)
+    data_arr = generator(size, seed=cell_seed(size, file_type, seed), as_numpy=True).astype(dtype, copy=False)
+    # write to a temporary name first so a concurrent reader never maps a half-written file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as tmp_file:
+        np.save(tmp_file, data_arr)
+    os.replace(tmp_path, path)
+    evict_datasets(cache_dir, limit, keep=path)
+    return np.load(path, mmap_mode='r')
@@ -0,0 +1,297 @@
+# external_sort.py
+# Kordel France
+########################################################################################################################
+# This file provides an external (out-of-core) merge sort for integer files larger than the available memory.
+#   Pass 0 reads the input in chunks that fit in the memory ceiling, sorts every chunk with one of the existing
+#       algorithms and spills it as a sorted run to a temporary file of raw 64-bit integers.
+#   Pass 1, 2, ... memory-map the run file and merge groups of up to fan_in adjacent runs with the loser-tree k-way
+#       merge into a second memory-mapped file; the two files swap roles (tx / rx) every pass until one run is left.
+# The page cache does the buffering of the memory-mapped reads and writes, so only the chunk being sorted in pass 0
+#   lives on the Python heap. The chunk is sized from the measured footprint of the chosen in-memory sort (see
+#   KERNEL_FOOTPRINTS), so the chunk, the sort's auxiliary memory and the fixed overhead stay under the memory ceiling.
+########################################################################################################################
+
+import array
+import mmap
+import os
+import shutil
+import tempfile
+import time
+from Lab4.heap_sort import heap_sort
+from Lab4.merge_sort_natural import merge_sort_natural
+from Lab4.merge_sort_2way import merge_sort_two_way_buffered
+from Lab4.merge_sort_3way import merge_sort_three_way
+from Lab4.merge_sort_kway import merge_k_way
+from Lab4.SortStats import SortStats
+
+# element format of runs and binary files: native 64-bit signed integers
+RECORD_TYPECODE = 'q'
+RECORD_SIZE = array.array(RECORD_TYPECODE).itemsize
+
+# in-memory sort used for the chunks of pass 0
+EXTERNAL_KERNELS = {'m1x': merge_sort_natural,
+                    'm2x': merge_sort_two_way_buffered,
+                    'm3x': merge_sort_three_way,
+                    'heap': heap_sort}
+
+# peak bytes per chunk element while a chunk is sorted: the chunk itself (8) plus the auxiliary memory of the sort,
+#   measured with tracemalloc on sorted, reverse-sorted, random, alternating and few-unique chunks. The natural merge
+#   sort needs a temporary array (8), its run pointer list (8) and an int object per run boundary (up to 16 - at most
+#   one boundary per two elements, as descending runs are detected); the 2-way and 3-way sorts a temporary array (8);
+#   heap sort sorts in place
+KERNEL_FOOTPRINTS = {'m1x': 8 + 32,
+                     'm2x': 8 + 8,
+                     'm3x': 8 + 8,
+                     'heap': 8}
+
+# bytes of the memory ceiling set aside for everything that does not grow with the chunk: the 64 KiB blocks
+#   array.tofile writes a chunk through, file buffers, run boundaries, SortStats objects and the loser tree of a merge
+#   pass
+FIXED_OVERHEAD = 128 * 1024
+
+
+def write_integer_file(path, data_arr, file_format='binary'):
+    """
+    Writes integers to a file, either as raw 64-bit values or as text with one integer per line.
+    :param path: the file to write.
+    :param data_arr: the integers to write.
+    :param file_format: 'binary' or 'text'.
+    """
+    if file_format == 'binary':
+        with open(path, 'wb') as data_file:
+            array.array(RECORD_TYPECODE, data_arr).tofile(data_file)
+    else:
+        with open(path, 'w') as data_file:
+            data_file.writelines(f'{value}\n' for value in data_arr)
+
+
+def read_integer_file(path, file_format='binary'):
+    """
+    Reads a whole integer file written by write_integer_file into memory.
+    :param path: the file to read.
+    :param file_format: 'binary' or 'text'.
+    ;return: an array.array of the integers.
+    """
+    data_arr = array.array(RECORD_TYPECODE)
+    for chunk, _ in read_chunks(path, 1 << 16, file_format):
+        data_arr.extend(chunk)
+    return data_arr
+
+
+def read_chunks(path, chunk_elements, file_format='binary'):
+    """
+    Reads an integer file in chunks of bounded size.
+    Every chunk is allocated at its full size once and filled in place, so reading never holds a second copy of it
+        (array.fromfile reads into a temporary bytes object first; append grows the array by reallocating it). The
+        generator drops its reference to a chunk before it allocates the next one, so a caller that drops its own
+        reference holds only one chunk at a time.
+    :param path: the file to read.
+    :param chunk_elements: the largest number of integers per chunk.
+    :param file_format: 'binary' for raw 64-bit integers or 'text' for one integer per line.
+    ;return: yields (chunk, bytes read) pairs, where chunk is an array.array of at most chunk_elements integers.
+    """
+    if file_format == 'binary':
+        with open(path, 'rb') as data_file:
+            while True:
+                # the previous chunk is dropped before the next one is allocated
+                chunk = None
+                chunk = array.array(RECORD_TYPECODE, [0]) * chunk_elements
+                with memoryview(chunk) as chunk_view, chunk_view.cast('B') as byte_view:
+                    chunk_bytes = data_file.readinto(byte_view)
+                if chunk_bytes == 0:
+                    return
+                # the last chunk is short
+                del chunk[chunk_bytes // RECORD_SIZE:]
+                yield chunk, chunk_bytes
+    else:
+        with open(path, 'rb') as data_file:
+            chunk = array.array(RECORD_TYPECODE, [0]) * chunk_elements
+            count = 0
+            chunk_bytes = 0
+            for line in data_file:
+                chunk_bytes += len(line)
+                line = line.strip()
+                if not line:
+                    continue
+                chunk[count] = int(line)
+                count += 1
+                if count == chunk_elements:
+                    yield chunk, chunk_bytes
+                    chunk = None
+                    chunk = array.array(RECORD_TYPECODE, [0]) * chunk_elements
+                    count = 0
+                    chunk_bytes = 0
+            # endloop
+            if count > 0:
+                del chunk[count:]
+                yield chunk, chunk_bytes
+
+
+def create_runs(input_path, run_path, chunk_elements, algo, input_format, stats):
+    """
+    Pass 0: sorts the input chunk by chunk and appends every sorted chunk to the run file.
+    :param input_path: the unsorted input file.
+    :param run_path: the run file to write.
+    :param chunk_elements: the largest number of integers sorted in memory at once.
+    :param algo: the algorithm code of the in-memory sort - a key of EXTERNAL_KERNELS.
+    :param input_format: 'binary' or 'text'.
+    :param stats: the SortStats object of the running sort.
+    ;return: the run boundaries (as element offsets), bytes read and bytes written.
+    """
+    # every chunk is released before the next one is read, so only one chunk is in memory at a time
+    sort_function = EXTERNAL_KERNELS[algo]
+    bounds = [0]
+    bytes_read = 0
+    bytes_written = 0
+    with open(run_path, 'wb') as run_file:
+        for chunk, chunk_bytes in read_chunks(input_path, chunk_elements, input_format):
+            bytes_read += chunk_bytes
+            chunk_stats = SortStats()
+            sort_function(chunk, stats=chunk_stats)
+            stats.add(chunk_stats)
+            chunk.tofile(run_file)
+            bytes_written += len(chunk) * RECORD_SIZE
+            bounds.append(bounds[-1] + len(chunk))
+            chunk = None
+        # endloop
+    return bounds, bytes_read, bytes_written
+
+
+def merge_pass(tx_path, rx_path, bounds, fan_in, stats):
+    """
+    Merges every group of up to fan_in adjacent runs of tx_path into one run at the same offsets of rx_path.
+    Both files are memory-mapped; the runs are read and written through memoryviews of the mappings.
+    :param tx_path: the run file to merge from - transmitting (tx) file.
+    :param rx_path: the run file to merge to - receiving (rx) file.
+    :param bounds: the run boundaries in tx_path as element offsets.
+    :param fan_in: the largest number of runs merged into one.
+    :param stats: the SortStats object of the running sort.
+    ;return: the run boundaries in rx_path.
+    """
+    n = bounds[-1]
+    new_bounds = [0]
+    with open(tx_path, 'rb') as tx_file, open(rx_path, 'w+b') as rx_file:
+        rx_file.truncate(n * RECORD_SIZE)
+        tx_map = mmap.mmap(tx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        rx_map = mmap.mmap(rx_file.fileno(), 0, access=mmap.ACCESS_WRITE)
+        tx_arr = memoryview(tx_map).cast(RECORD_TYPECODE)
+        rx_arr = memoryview(rx_map).cast(RECORD_TYPECODE)
+        try:
+            for i in range(0, len(bounds) - 1, fan_in):
+                group = bounds[i:i + fan_in + 1]
+                merge_k_way(tx_arr, group, rx_arr, stats)
+                new_bounds.append(group[-1])
+            # endloop
+        finally:
+            # every view must be released before the mappings can be closed
+            tx_arr.release()
+            rx_arr.release()
+            rx_map.flush()
+            rx_map.close()
+            tx_map.close()
+    return new_bounds
+
+
+def write_output(run_path, output_path, chunk_elements, output_format):
+    """
+    Moves the final run to the output path, converting it to text if requested.
+    :param run_path: the file holding the single sorted run.
+    :param output_path: the output file.
+    :param chunk_elements: the largest number of integers converted to text at once.
+    :param output_format: 'binary' or 'text'.
+    ;return: the bytes read and written while producing the output (zero for a plain move).
+    """
+    if output_format == 'binary':
+        shutil.move(run_path, output_path)
+        return 0, 0
+
+    bytes_read = 0
+    bytes_written = 0
+    with open(output_path, 'w') as output_file:
+        for chunk, chunk_bytes in read_chunks(run_path, chunk_elements, 'binary'):
+            bytes_read += chunk_bytes
+            # the lines are written one by one through the file buffer, never joined into one string
+            for value in chunk:
+                line = f'{value}\n'
+                output_file.write(line)
+                bytes_written += len(line)
+            chunk = None
+        # endloop
+    return bytes_read, bytes_written
+
+
+def external_merge_sort(input_path, output_path, memory_limit=64 * 1024 * 1024, fan_in=16, algo='m1x',
+                        input_format='binary', output_format='binary', tmp_dir=None, stats=None):
+    """
+    Driver for sorting an integer file that may be larger than memory.
+    :param input_path: the unsorted input file.
+    :param output_path: the sorted output file.
+    :param memory_limit: the memory ceiling in bytes of the whole sort; the chunks of pass 0 are sized so that a chunk
+        and the auxiliary memory of its sort (KERNEL_FOOTPRINTS) fit in it next to FIXED_OVERHEAD.
+    :param fan_in: the largest number of runs merged into one per merge pass; must be at least 2.
+    :param algo: the in-memory sort for pass 0 - 'm1x', 'm2x', 'm3x' or 'heap'.
+    :param input_format: 'binary' for raw 64-bit integers or 'text' for one integer per line.
+    :param output_format: 'binary' or 'text'.
+    :param tmp_dir: the directory for the temporary run files; defaults to the system temporary directory.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
+    ;return output_path: the sorted output file.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed
+    ;return time: The time in seconds it takes for the algorithm to sort the file.
+    ;return pass_stats: one dictionary per pass with the number of runs it produced and its bytes read and written.
+    """
+    if fan_in < 2:
+        raise ValueError(f'external merge sort needs fan_in >= 2, got fan_in = {fan_in}')
+    if memory_limit <= FIXED_OVERHEAD + KERNEL_FOOTPRINTS[algo]:
+        raise ValueError(f'external merge sort needs memory_limit > {FIXED_OVERHEAD + KERNEL_FOOTPRINTS[algo]} bytes '
+                         f'for algo = {algo!r}, got memory_limit = {memory_limit}')
+
+    start_time = time.perf_counter_ns()
+    if stats is None:
+        stats = SortStats()
+    chunk_elements = (memory_limit - FIXED_OVERHEAD) // KERNEL_FOOTPRINTS[algo]
+    work_dir = tempfile.mkdtemp(prefix='external_sort_', dir=tmp_dir)
+    pass_stats = []
+    try:
+        # pass 0 - sorted runs
+        run_path = os.path.join(work_dir, 'runs_0.bin')
+        bounds, bytes_read, bytes_written = create_runs(input_path, run_path, chunk_elements, algo, input_format,
+                                                        stats)
+        pass_stats.append({'pass': 0, 'runs': len(bounds) - 1,
+                           'bytes_read': bytes_read, 'bytes_written': bytes_written})
+
+        # merge passes until a single run is left
+        pass_number = 1
+        while len(bounds) > 2:
+            next_path = os.path.join(work_dir, f'runs_{pass_number}.bin')
+            bounds = merge_pass(run_path, next_path, bounds, fan_in, stats)
+            run_bytes = bounds[-1] * RECORD_SIZE
+            pass_stats.append({'pass': pass_number, 'runs': len(bounds) - 1,
+                               'bytes_read': run_bytes, 'bytes_written': run_bytes})
+            os.remove(run_path)
+            run_path = next_path
+            pass_number += 1
+        # endloop
+
+        bytes_read, bytes_written = write_output(run_path, output_path, chunk_elements, output_format)
+        if bytes_written > 0:
+            pass_stats.append({'pass': pass_number, 'runs': 1,
+                               'bytes_read': bytes_read, 'bytes_written': bytes_written})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    end_time = time.perf_counter_ns()
+    stats.time += (end_time - start_time) / 1e9
+    return output_path, stats.comps, stats.exs, stats.time, pass_stats
+
+
+def print_pass_report(pass_stats):
+    """
+    Prints the bytes read and written by every pass of an external merge sort.
+    :param pass_stats: the pass statistics returned by external_merge_sort.
+    """
+    print('pass\t|runs\t|bytes read\t|bytes written')
+    print('_________________________________________________________________________________________')
+    for stats in pass_stats:
+        print(f'{stats["pass"]}\t|{stats["runs"]}\t|{stats["bytes_read"]}\t\t|{stats["bytes_written"]}')
+    print('_________________________________________________________________________________________')
@@ -1,69 +1,192 @@
 # file_manager.py
 # Kordel France
 ########################################################################################################################
-# This file provides public-accessible functions to generate a sorted, reverse-sorted, or random data stream.
+# This file provides public-accessible functions to generate a sorted, reverse-sorted, or random data stream, as well
+#   as the input shapes seen in practice: nearly sorted, sawtooth, organ-pipe, few-unique, Zipf-skewed, and sorted
+#   with random values appended.
 # Each function returns an array of it's designated sorting distribution.
+# All data is generated in O(n) with vectorized NumPy operations. Random distributions draw from their own
+#   numpy.random.Generator; cell_seed derives a reproducible, independent seed for every (size, file type) cell, so the
+#   same cell gets the same data in any process and in any order.
 # Let it be emphasized that all data is automatically generated.
 ########################################################################################################################
 
-import random
+import zlib
+import numpy as np
+from Lab4.constants import random_unique, random_value_spread, data_seed
 
-def generate_sorted_file(length) -> [int]:
+# version of the generators below; bump it whenever a change makes any of them produce different data for the same
+#   seed, so datasets cached by an earlier version (see dataset_cache.py) are not reused
+GENERATOR_VERSION = 1
+
+
+def cell_seed(size, file_type, base_seed=data_seed):
+    """
+    Derives the seed of one (size, file type) cell of the battle from the base seed.
+    The cell is hashed into the seed sequence instead of advancing one shared generator, so every cell gets an
+        independent stream that does not depend on which other cells ran before it or in which process it runs.
+    :param size: the length of the data (n).
+    :param file_type: the distribution of the data - a name listed in constants.file_types.
+    :param base_seed: the seed of the whole run; None gives fresh, unreproducible data on every call.
+    ;return: a numpy.random.SeedSequence to pass as the seed argument of a generator below, or None.
+    """
+    if base_seed is None:
+        return None
+    return np.random.SeedSequence([base_seed, int(size), zlib.crc32(file_type.encode())])
+
+
+def as_output(data_arr, as_numpy):
+    """
+    Returns generated data in the requested container.
+    :param data_arr: the generated numpy.ndarray of int64.
+    :param as_numpy: if True, the array is returned as it is; otherwise it is converted to a list of ints.
+    ;return: the generated data.
+    """
+    if as_numpy:
+        return data_arr
+    return data_arr.tolist()
+
+
+def generate_sorted_file(length, seed=None, as_numpy=False) -> [int]:
     """
     Generates an array of integers sorted in ascending order.
     :param length: the length of the array to generate.
+    :param seed: unused; accepted so every generator can be called the same way.
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
     ;return: sorted_arr: the generated array of integers listed in ascending order.
     """
     initVal = 1000
-    sorted_arr = []
-    for i in range(0, length):
-        sorted_arr.append(int(initVal + i))
-    return sorted_arr
+    sorted_arr = np.arange(initVal, initVal + length, dtype=np.int64)
+    return as_output(sorted_arr, as_numpy)
 
 
-def generate_reverse_sorted_file(length) -> [int]:
+def generate_reverse_sorted_file(length, seed=None, as_numpy=False) -> [int]:
     """
     Generates an array of integers sorted in descending (reverse ascending) order.
     :param length: the length of the array to generate.
+    :param seed: unused; accepted so every generator can be called the same way.
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
     ;return: sorted_arr: the generated array of integers listed in descending order.
     """
-    sorted_arr = generate_sorted_file(length)
-    unsorted_arr = []
-    for i in range(0, len(sorted_arr)):
-        unsorted_arr.append(sorted_arr.pop())
-    return unsorted_arr
+    sorted_arr = generate_sorted_file(length, as_numpy=True)
+    return as_output(sorted_arr[::-1].copy(), as_numpy)
 
 
-def generate_random_sorted_file(length) -> [int]:
+def generate_random_sorted_file(length, unique=random_unique, value_spread=random_value_spread, min_val=1000,
+                                seed=None, as_numpy=False) -> [int]:
     """
-    Generates an array list of random integers.
-    Performs a first-order check on uniqueness of each number generated to limit number of duplicates in returned array.
+    Generates an array list of random integers in O(n) with vectorized NumPy generation.
+    The values are drawn from the range [min_val, min_val + length * value_spread).
+    Without duplicates, the range is cut into length buckets of value_spread consecutive values. One value is drawn
+        from each bucket, so no two values can be equal, and the buckets are put in a random order (a sampled
+        permutation). With duplicates, every value is drawn independently from the whole range.
     :param length: the length of the array to generate.
+    :param unique: True for no duplicate values, False to allow duplicates.
+    :param value_spread: the width of the value range per element (at least 1); a larger spread gives sparser values
+        and, with duplicates allowed, fewer of them.
+    :param min_val: the smallest value that can be generated.
+    :param seed: the seed of the random generator (see cell_seed); None seeds it from the operating system.
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
     ;return rand_arr: the generated array of 'randomly' selected integers.
     """
-    minVal = 1000
-    maxVal = 9999
-    rand_arr = []
-    for i in range(1, length + 1):
-        rand_int = random.randint(minVal, maxVal)
-        unique_int = check_randomness(rand_int, rand_arr)
-        rand_arr.append(unique_int)
-        # rand_arr.append(rand_int + int(int(rand_int) // int(i)))
-    return rand_arr
+    value_spread = max(1, int(value_spread))
+    rng = np.random.default_rng(seed)
+    if unique:
+        rand_arr = rng.permutation(length).astype(np.int64, copy=False)
+        rand_arr *= value_spread
+        if value_spread > 1:
+            rand_arr += rng.integers(0, value_spread, size=length, dtype=np.int64)
+        rand_arr += min_val
+    else:
+        rand_arr = rng.integers(min_val, min_val + length * value_spread, size=length, dtype=np.int64)
+    return as_output(rand_arr, as_numpy)
 
 
-def check_randomness(val, data_arr):
+def generate_nearly_sorted_file(length, swap_fraction=0.05, seed=None, as_numpy=False) -> [int]:
     """
-    Performs a check for the random number, val, to ensure it isn't already in the array, data_arr.
-    If it is in the array, it is altered by another randomly generated number.
-    :param val: the value to check for duplicates of.
-    ;return rand_arr: the generated array of 'randomly' selected integers.
+    Generates an ascending array in which a small fraction of the values have been swapped with one another.
+    :param length: the length of the array to generate.
+    :param swap_fraction: the fraction of the values that are moved; they are swapped in random pairs.
+    :param seed: the seed of the random generator (see cell_seed).
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
     """
-    if val in data_arr:
-        rand_int = random.randint(2, len(data_arr))
-        # while val in data_arr:
-        #     val += (val // rand_int)
-        val += (val // rand_int)
-    return val
+    rng = np.random.default_rng(seed)
+    data_arr = generate_sorted_file(length, as_numpy=True)
+    swaps = min(int(np.ceil(length * swap_fraction / 2)), length // 2)
+    positions = rng.choice(length, size=2 * swaps, replace=False)
+    data_arr[positions[:swaps]], data_arr[positions[swaps:]] = data_arr[positions[swaps:]], data_arr[positions[:swaps]]
+    return as_output(data_arr, as_numpy)
 
 
+def generate_sawtooth_file(length, teeth=8, seed=None, as_numpy=False) -> [int]:
+    """
+    Generates a sawtooth: the same ascending ramp repeated, i.e. a number of equal-length sorted runs.
+    :param length: the length of the array to generate.
+    :param teeth: the number of ascending ramps.
+    :param seed: unused; accepted so every generator can be called the same way.
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
+    """
+    period = max(1, -(-length // max(1, teeth)))
+    data_arr = 1000 + np.arange(length, dtype=np.int64) % period
+    return as_output(data_arr, as_numpy)
+
+
+def generate_organ_pipe_file(length, seed=None, as_numpy=False) -> [int]:
+    """
+    Generates an organ pipe: values ascend to the middle of the array and descend back down to its end.
+    :param length: the length of the array to generate.
+    :param seed: unused; accepted so every generator can be called the same way.
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
+    """
+    index_arr = np.arange(length, dtype=np.int64)
+    data_arr = 1000 + np.minimum(index_arr, length - 1 - index_arr)
+    return as_output(data_arr, as_numpy)
+
+
+def generate_few_unique_file(length, unique_values=10, seed=None, as_numpy=False) -> [int]:
+    """
+    Generates random values drawn from only a few distinct keys, so most values are duplicates.
+    :param length: the length of the array to generate.
+    :param unique_values: the number of distinct keys.
+    :param seed: the seed of the random generator (see cell_seed).
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
+    """
+    rng = np.random.default_rng(seed)
+    data_arr = 1000 + 1000 * rng.integers(0, max(1, unique_values), size=length, dtype=np.int64)
+    return as_output(data_arr, as_numpy)
+
+
+def generate_zipf_file(length, exponent=1.5, seed=None, as_numpy=False) -> [int]:
+    """
+    Generates Zipf-skewed values: a few small keys are very frequent and the rest form a long tail of rare keys.
+    The tail is capped at length * random_value_spread so the values stay in the range of the other distributions.
+    :param length: the length of the array to generate.
+    :param exponent: the Zipf exponent (greater than 1); larger exponents concentrate more values on the smallest keys.
+    :param seed: the seed of the random generator (see cell_seed).
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
+    """
+    rng = np.random.default_rng(seed)
+    keys = np.minimum(rng.zipf(exponent, size=length), max(1, length * random_value_spread))
+    data_arr = 999 + keys.astype(np.int64, copy=False)
+    return as_output(data_arr, as_numpy)
+
+
+def generate_sorted_random_appends_file(length, append_fraction=0.1, seed=None, as_numpy=False) -> [int]:
+    """
+    Generates an ascending array followed by a block of random values, like a sorted table with new rows appended.
+    :param length: the length of the array to generate.
+    :param append_fraction: the fraction of the array made of appended random values.
+    :param seed: the seed of the random generator (see cell_seed).
+    :param as_numpy: if True, the array is returned as a numpy.ndarray of int64 instead of a list.
+    ;return: the generated array.
+    """
+    rng = np.random.default_rng(seed)
+    appended = min(length, int(length * append_fraction))
+    data_arr = generate_sorted_file(length, as_numpy=True)
+    data_arr[length - appended:] = rng.integers(1000, 1000 + length, size=appended, dtype=np.int64)
+    return as_output(data_arr, as_numpy)
@@ -2,83 +2,348 @@
 # Kordel France
 ########################################################################################################################
 # This file provides functions to construct a heap from a passed array (list) argument and sort it in ascending order.
+# Several sift-down strategies are provided so their costs can be compared:
+#   'recursive' - the original recursive sift that swaps a node with its larger child at every level.
+#   'iterative' - the same sift written as a loop.
+#   'hole'      - an iterative sift that lifts the larger child into a hole instead of swapping, one write per level.
+#   'bottom_up' - Floyd's bottom-up sift: descend to a leaf along the larger child, then climb back up to the value's
+#                 place, which costs about one comparison per level instead of two.
+# Two partial modes avoid extracting all n elements when only the smallest few are needed:
+#   heap_sorted_iterator - heapifies a copy in O(n) and yields elements in ascending order on demand.
+#   top_k                - streams the input through a bounded max-heap of size k in O(n log k).
 ########################################################################################################################
-import time
+import itertools
+from Lab4.buffers import as_sort_buffer
+from Lab4.SortStats import SortStats
 
-H_COMP = 0
-H_EX = 0
 
-
-def construct_heap(data_arr, length, index):
+def construct_heap(data_arr, length, index, stats):
     """
     Performs the first step in heap sort - building the heap.
     This is a recursive call.
     :param length: the length of the heap array.
     :param index: the current index of the pointer.
+    :param stats: the SortStats object of the running sort; element writes are counted in stats.moves.
     """
-    global H_COMP
-    global H_EX
     # initialize root and left & right children
     root = index
     left_heap = 2 * index + 1
     right_heap = 2 * index + 2
 
     # if left child of root exists and greater than largest element (root)
-    if left_heap < length and data_arr[root] < data_arr[left_heap]:
-        root = left_heap
-        H_COMP += 2
-        H_EX += 1
+    if left_heap < length:
+        stats.comps += 1
+        if data_arr[root] < data_arr[left_heap]:
+            root = left_heap
 
     # if right child of root exists and greater than largest element (root)
-    if right_heap < length and data_arr[root] < data_arr[right_heap]:
-        root = right_heap
-        H_COMP += 2
-        H_EX += 1
+    if right_heap < length:
+        stats.comps += 1
+        if data_arr[root] < data_arr[right_heap]:
+            root = right_heap
 
     # if the above results in a root change, do it
     if root != index:
         data_arr[index], data_arr[root] = data_arr[root], data_arr[index]
+        stats.exs += 1
+        stats.moves += 2
         # continue to build heap so long as the array is not empty
-        construct_heap(data_arr, length, root)                                                  ### RECURSIVE CALL
-        H_EX += 1
+        construct_heap(data_arr, length, root, stats)                                           ### RECURSIVE CALL
+
+
+def sift_down(data_arr, length, index, stats):
+    """
+    Restores the heap property below index by swapping the node with its larger child until it is no smaller than
+        both children. Same result as construct_heap, but as a loop.
+    :param data_arr: the heap array.
+    :param length: the length of the heap array.
+    :param index: the index of the node to sift down.
+    :param stats: the SortStats object of the running sort; element writes are counted in stats.moves.
+    """
+
+    while True:
+        root = index
+        left_heap = 2 * index + 1
+        right_heap = left_heap + 1
+
+        if left_heap < length:
+            stats.comps += 1
+            if data_arr[root] < data_arr[left_heap]:
+                root = left_heap
+        if right_heap < length:
+            stats.comps += 1
+            if data_arr[root] < data_arr[right_heap]:
+                root = right_heap
+
+        if root == index:
+            break
+        data_arr[index], data_arr[root] = data_arr[root], data_arr[index]
+        stats.exs += 1
+        stats.moves += 2
+        index = root
+    # endloop
+
+
+def sift_down_hole(data_arr, length, index, stats):
+    """
+    Restores the heap property below index by moving larger children up into a hole.
+    The sifted value is held aside and written once into its final slot, so every level costs one write, not a swap.
+    :param data_arr: the heap array.
+    :param length: the length of the heap array.
+    :param index: the index of the node to sift down.
+    :param stats: the SortStats object of the running sort; element writes are counted in stats.moves.
+    """
+
+    value = data_arr[index]
+    hole = index
+    child = 2 * hole + 1
+    while child < length:
+        # pick the larger child
+        if child + 1 < length:
+            stats.comps += 1
+            if data_arr[child] < data_arr[child + 1]:
+                child += 1
+        # stop once the value is no smaller than the larger child
+        stats.comps += 1
+        if not (value < data_arr[child]):
+            break
+        data_arr[hole] = data_arr[child]
+        stats.exs += 1
+        stats.moves += 1
+        hole = child
+        child = 2 * hole + 1
+    # endloop
 
+    if hole != index:
+        data_arr[hole] = value
+        stats.exs += 1
+        stats.moves += 1
 
-def heap_sort(data_arr):
+
+def sift_down_bottom_up(data_arr, length, index, stats):
+    """
+    Restores the heap property below index with Floyd's bottom-up sift.
+    The path of larger children is followed all the way to a leaf (one comparison per level), then climbed back up
+        until a node no smaller than the sifted value is found. The value is placed there and every node above it on
+        the path moves up one level through the hole.
+    :param data_arr: the heap array.
+    :param length: the length of the heap array.
+    :param index: the index of the node to sift down.
+    :param stats: the SortStats object of the running sort; element writes are counted in stats.moves.
+    """
+
+    value = data_arr[index]
+
+    # descend to a leaf along the larger child
+    leaf = index
+    child = 2 * leaf + 1
+    while child < length:
+        if child + 1 < length:
+            stats.comps += 1
+            if data_arr[child] < data_arr[child + 1]:
+                child += 1
+        leaf = child
+        child = 2 * leaf + 1
+    # endloop
+
+    # climb back up to the value's final position
+    while leaf > index:
+        stats.comps += 1
+        if not (data_arr[leaf] < value):
+            break
+        leaf = (leaf - 1) // 2
+    # endloop
+
+    if leaf == index:
+        return
+
+    # drop the value in and shift the path above it up by one level
+    while leaf > index:
+        displaced = data_arr[leaf]
+        data_arr[leaf] = value
+        value = displaced
+        stats.exs += 1
+        stats.moves += 1
+        leaf = (leaf - 1) // 2
+    # endloop
+    data_arr[index] = value
+    stats.exs += 1
+    stats.moves += 1
+
+
+# sift-down strategies selectable in heap_sort
+SIFT_STRATEGIES = {'recursive': construct_heap,
+                   'iterative': sift_down,
+                   'hole': sift_down_hole,
+                   'bottom_up': sift_down_bottom_up}
+
+
+def heap_sort(data_arr, strategy='recursive', stats=None):
     """
     Driver for the second step in heap sort - sort the constructed heap.
     :param data_arr: the array to create the sorted heap from.
+    :param strategy: the sift-down strategy - 'recursive', 'iterative', 'hole' or 'bottom_up'.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
     ;return: data_arr: the array as a sorted heap that has been traversed into an array.
-    ;return H_COMP: number of comparisons performed
-    ;return H_EX: number of exchanges performed'
-    ;return time: The time it takes for the algorithm to sort the file.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed'
     """
-    start_time = time.time()
-    length = len(data_arr)
+    if stats is None:
+        stats = SortStats()
+    sift_function = SIFT_STRATEGIES[strategy]
+    buffer_arr = as_sort_buffer(data_arr)
+    length = len(buffer_arr)
     # construct the max heap
     for i in range((length // 2) - 1, -1, -1):
         # add the next value to the heap
-        construct_heap(data_arr, length, i)
+        sift_function(buffer_arr, length, i, stats)
 
     # traverse through heap to build list
     for j in range((length - 1), 0, -1):
         # interchange indices
-        data_arr[j], data_arr[0] = data_arr[0], data_arr[j]
+        buffer_arr[j], buffer_arr[0] = buffer_arr[0], buffer_arr[j]
+        stats.exs += 1
+        stats.moves += 2
         # get the next value from the heap
-        construct_heap(data_arr, j, 0)
+        sift_function(buffer_arr, j, 0, stats)
     # return data_arr
-    end_time = time.time()
-    delta_time = end_time - start_time
-    return data_arr, H_COMP, H_EX, "{:.6f}".format(delta_time)
+    return data_arr, stats.comps, stats.exs
+
+
+class MinHeapEntry:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """
+        The MinHeapEntry class wraps a value with its order reversed, so the max-heap sifts of SIFT_STRATEGIES maintain
+            a min-heap of the wrapped values. Only < is defined, which is the only comparison the sifts make.
+        :param value: the wrapped element.
+        """
+        self.value = value
+
+
+    def __lt__(self, other):
+        return other.value < self.value
+
 
+def heap_sorted_iterator(data_arr, strategy='recursive', stats=None):
+    """
+    Generator that yields the elements of data_arr in ascending order, one extraction at a time.
+    A copy of the data is heapified in O(n) up front; every element taken from the generator then costs one O(log n)
+        extraction, so consuming only the first m elements costs O(n + m log n). data_arr itself is not modified.
+    The copy holds the values wrapped in MinHeapEntry objects, so the selected sift-down strategy builds a min-heap
+        with the same comparison and exchange counts it makes in heap_sort.
+    Comparisons and exchanges accumulate in stats as elements are consumed, so pass a SortStats object to read them.
+    :param data_arr: the array to iterate over in sorted order.
+    :param strategy: the sift-down strategy - 'recursive', 'iterative', 'hole' or 'bottom_up'.
+    :param stats: the SortStats object that collects the counts of this iteration; a new one is created if omitted.
+    ;return: yields the elements in ascending order.
+    """
+    if stats is None:
+        stats = SortStats()
+    sift_function = SIFT_STRATEGIES[strategy]
+    heap_arr = [MinHeapEntry(value) for value in as_sort_buffer(data_arr)]
+    length = len(heap_arr)
+    # construct the min heap
+    for i in range((length // 2) - 1, -1, -1):
+        sift_function(heap_arr, length, i, stats)
+
+    # extract the smallest remaining value on demand
+    for j in range((length - 1), -1, -1):
+        yield heap_arr[0].value
+        if j == 0:
+            break
+        heap_arr[j], heap_arr[0] = heap_arr[0], heap_arr[j]
+        stats.exs += 1
+        stats.moves += 2
+        sift_function(heap_arr, j, 0, stats)
 
-def reset_counts_heap_sort():
+
+def top_k(data_arr, k, strategy='recursive', stats=None):
     """
-    Resets the comparisons and exchanges counters so they are initialized for a new sort.
+    Driver for finding the k smallest elements of data_arr in ascending order.
+    The first k elements are heapified into a max-heap; every later element is compared with the heap's root (the
+        largest of the k kept so far) and replaces it if smaller. The kept heap is then heap sorted, for O(n log k) work
+        and O(k) memory overall. data_arr may be any iterable, including a generator, and is not modified.
+    :param data_arr: the elements to select from.
+    :param k: the number of smallest elements to keep.
+    :param strategy: the sift-down strategy - 'recursive', 'iterative', 'hole' or 'bottom_up'.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
+    ;return: heap_arr: a list of the k smallest elements in ascending order.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed'
     """
-    # reset comparison and exchange counts for next run
-    global H_COMP
-    global H_EX
-    H_COMP = 0
-    H_EX = 0
+    if stats is None:
+        stats = SortStats()
+    sift_function = SIFT_STRATEGIES[strategy]
+    data_iterator = iter(data_arr)
+    heap_arr = list(itertools.islice(data_iterator, max(k, 0)))
+    length = len(heap_arr)
+    # construct the bounded max heap from the first k values
+    for i in range((length // 2) - 1, -1, -1):
+        sift_function(heap_arr, length, i, stats)
 
+    # stream the remaining values through the heap
+    if length > 0:
+        for value in data_iterator:
+            stats.comps += 1
+            if value < heap_arr[0]:
+                heap_arr[0] = value
+                stats.exs += 1
+                stats.moves += 1
+                sift_function(heap_arr, length, 0, stats)
+        # endloop
 
+    # sort the kept values
+    for j in range((length - 1), 0, -1):
+        heap_arr[j], heap_arr[0] = heap_arr[0], heap_arr[j]
+        stats.exs += 1
+        stats.moves += 2
+        sift_function(heap_arr, j, 0, stats)
+    return heap_arr, stats.comps, stats.exs
+
+
+def sift_down_fast(data_arr, length, index):
+    """
+    Uninstrumented hole-based sift-down: the counterpart of sift_down_hole without counters.
+    :param data_arr: the heap array.
+    :param length: the length of the heap array.
+    :param index: the index of the node to sift down.
+    """
+    value = data_arr[index]
+    hole = index
+    child = 2 * hole + 1
+    while child < length:
+        # pick the larger child
+        right_child = child + 1
+        if (right_child < length) and (data_arr[child] < data_arr[right_child]):
+            child = right_child
+        # stop once the value is no smaller than the larger child
+        child_val = data_arr[child]
+        if not (value < child_val):
+            break
+        data_arr[hole] = child_val
+        hole = child
+        child = 2 * hole + 1
+    # endloop
+    data_arr[hole] = value
+
+
+def heap_sort_fast(data_arr):
+    """
+    Uninstrumented kernel of heap sort for sorting when the counts are not needed.
+    Same heap construction and extraction as heap_sort with strategy='hole', with no counters or timing in the loops.
+    :param data_arr: the array to sort in place.
+    ;return: data_arr: the sorted array.
+    """
+    buffer_arr = as_sort_buffer(data_arr)
+    length = len(buffer_arr)
+    # construct the max heap
+    for i in range((length // 2) - 1, -1, -1):
+        sift_down_fast(buffer_arr, length, i)
+
+    # move the largest value to the end and restore the heap over the rest
+    for j in range((length - 1), 0, -1):
+        buffer_arr[j], buffer_arr[0] = buffer_arr[0], buffer_arr[j]
+        sift_down_fast(buffer_arr, j, 0)
+    return data_arr
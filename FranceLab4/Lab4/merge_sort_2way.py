@@ -4,78 +4,294 @@
 # This file provides functions to sort an array of integers in ascending order using a two-way merge sort.
 ########################################################################################################################
 
-import time
+from Lab4.buffers import as_sort_buffer, allocate_buffer, copy_buffer
+from Lab4.SortStats import SortStats
 
-M2X_COMP = 0
-M2X_EX = 0
 
-def merge_sort_two_way(data_arr):
+def merge_sort_two_way(data_arr, stats=None):
     """
     Driver for implementing merge sort from two sub-arrays.
     :param data_arr: the array to split and merge sort from.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
     ;return data_arr: the sorted array.
-    ;return M2X_COMP: number of comparisons performed
-    ;return M2X_EX: number of exchanges performed
-    ;return time: The time it takes for the algorithm to sort the file.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed
     """
-    start_time = time.time()
-    global M2X_COMP
-    global M2X_EX
+    if stats is None:
+        stats = SortStats()
 
-    if len(data_arr) > 1:
+    merge_sort_two_way_slicing_helper(as_sort_buffer(data_arr), stats)
+
+    return data_arr, stats.comps, stats.exs
+
+
+def merge_sort_two_way_slicing_helper(buffer_arr, stats):
+    """
+    Function for sorting buffer_arr by copying off both halves, sorting them recursively and merging them back.
+    :param buffer_arr: the array to split and merge sort from.
+    :param stats: the SortStats object of the running sort.
+    """
+    if len(buffer_arr) > 1:
         # finding the mid of the array
-        mid = len(data_arr) // 2
+        mid = len(buffer_arr) // 2
         # dividing the array elements
-        left_half = data_arr[:mid]
+        left_half = copy_buffer(buffer_arr, 0, mid)
 
         # into 2 halves
-        right_half = data_arr[mid:]
+        right_half = copy_buffer(buffer_arr, mid)
 
         # sorting the first half
-        merge_sort_two_way(left_half)                                                       ### RECURSIVE CALL
+        merge_sort_two_way_slicing_helper(left_half, stats)                                 ### RECURSIVE CALL
 
         # sorting the second half
-        merge_sort_two_way(right_half)                                                      ### RECURSIVE CALL
+        merge_sort_two_way_slicing_helper(right_half, stats)                                ### RECURSIVE CALL
 
         i = j = k = 0
 
         # copy data to temp arrays L[] and R[]
         while i < len(left_half) and j < len(right_half):
-            if left_half[i] < right_half[j]:
-                data_arr[k] = left_half[i]
+            if left_half[i] <= right_half[j]:
+                buffer_arr[k] = left_half[i]
                 i += 1
-                M2X_COMP += 1
-                M2X_EX += 1
+                stats.comps += 1
+                stats.exs += 1
             else:
-                data_arr[k] = right_half[j]
+                buffer_arr[k] = right_half[j]
                 j += 1
-                M2X_COMP += 1
-                M2X_EX += 1
+                stats.comps += 1
+                stats.exs += 1
             k += 1
 
         # checking if any element was left
         while i < len(left_half):
-            data_arr[k] = left_half[i]
+            buffer_arr[k] = left_half[i]
             i += 1
             k += 1
+            stats.exs += 1
 
         # checking if any element was right
         while j < len(right_half):
-            data_arr[k] = right_half[j]
+            buffer_arr[k] = right_half[j]
             j += 1
             k += 1
-    end_time = time.time()
-    delta_time = end_time - start_time
-    return data_arr, M2X_COMP, M2X_EX, "{:.6f}".format(delta_time)
+            stats.exs += 1
+
+
+def merge_two_way(tx_arr, low, mid, high, rx_arr, stats):
+    """
+    Function for merging two adjacent sorted ranges of tx_arr into the same positions of rx_arr.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param mid: the mid pointer (divides first and second subarrays).
+    :param high: the high pointer (end of second subarray).
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param stats: the SortStats object of the running sort.
+    """
+    merge_two_ranges(tx_arr, low, mid, mid, high, rx_arr, low, stats)
+
+
+def merge_two_ranges(tx_arr, i, i_end, j, j_end, rx_arr, l, stats):
+    """
+    Function for merging the sorted ranges tx_arr[i:i_end] and tx_arr[j:j_end] (either may be empty) into rx_arr from
+        position l onward. Equal values are taken from the first range first, so the merge is stable.
+    Also finishes the three-way merge once one of its three ranges runs out.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param i: the start of the first range.
+    :param i_end: the end of the first range.
+    :param j: the start of the second range.
+    :param j_end: the end of the second range.
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param l: the first position of rx_arr to write.
+    :param stats: the SortStats object of the running sort.
+    """
+    # choose smaller of the smallest in the two ranges
+    while (i < i_end) and (j < j_end):
+        if tx_arr[i] <= tx_arr[j]:
+            rx_arr[l] = tx_arr[i]
+            i += 1
+            stats.comps += 1
+            stats.exs += 1
+        else:
+            rx_arr[l] = tx_arr[j]
+            j += 1
+            stats.comps += 1
+            stats.exs += 1
+        # endif
+        l += 1
+    # endloop
+
+    # copy remaining values from first range
+    while i < i_end:
+        rx_arr[l] = tx_arr[i]
+        i += 1
+        l += 1
+        stats.exs += 1
+
+    # copy remaining values from second range
+    while j < j_end:
+        rx_arr[l] = tx_arr[j]
+        j += 1
+        l += 1
+        stats.exs += 1
+
+
+def merge_sort_two_way_recursive_helper(tx_arr, low, high, rx_arr, stats):
+    """
+    Function for finding the middle index needed for the buffered two-way merge sort.
+    Both arrays must hold the same values over [low, high); the sorted range is left in tx_arr. The arrays swap
+        roles (source / destination) at every level so no sub-arrays are sliced off.
+    :param tx_arr: the array to merge to - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param high: the high pointer (end of second subarray).
+    :param rx_arr: the array to split and merge sort from - receiving (rx) array.
+    :param stats: the SortStats object of the running sort.
+    """
+    if (high - low) < 2:
+        return
+
+    mid = low + (high - low) // 2
+
+    # sort both halves into the other buffer, then merge them back
+    merge_sort_two_way_recursive_helper(rx_arr, low, mid, tx_arr, stats)                            ### RECURSIVE CALL
+    merge_sort_two_way_recursive_helper(rx_arr, mid, high, tx_arr, stats)                           ### RECURSIVE CALL
+    merge_two_way(rx_arr, low, mid, high, tx_arr, stats)
+
+
+def merge_sort_two_way_bottom_up_helper(tx_arr, rx_arr, n, stats):
+    """
+    Function for iteratively merging runs of width 1, 2, 4, ... until a single run remains.
+    The arrays swap roles (source / destination) after every pass, so no recursion is used at all.
+    :param tx_arr: the array to split and merge sort from - transmitting (tx) array.
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param n: the number of elements to sort.
+    :param stats: the SortStats object of the running sort.
+    ;return tx_arr: whichever of the two arrays holds the sorted values after the final pass.
+    """
+    width = 1
+    while width < n:
+        for low in range(0, n, 2 * width):
+            mid = min(low + width, n)
+            high = min(low + 2 * width, n)
+            merge_two_way(tx_arr, low, mid, high, rx_arr, stats)
+        # endloop
+
+        swap_arr = tx_arr
+        tx_arr = rx_arr
+        rx_arr = swap_arr
+        width *= 2
+    # endloop
+    return tx_arr
+
+
+def merge_sort_two_way_buffered(data_arr, bottom_up=False, stats=None):
+    """
+    Driver for implementing merge sort from two sub-arrays with a single auxiliary buffer.
+    Unlike merge_sort_two_way, no halves are sliced off at each level; one buffer is allocated per call and the
+        source / destination roles alternate between levels, as the three-way merge sort does with its tx/rx arrays.
+    :param data_arr: the array to sort in place.
+    :param bottom_up: merge iteratively from runs of width 1 upward instead of recursing top-down.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
+    ;return data_arr: the sorted array.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed
+    """
+    if stats is None:
+        stats = SortStats()
+    buffer_arr = as_sort_buffer(data_arr)
+    n = len(buffer_arr)
+
+    if bottom_up:
+        temp_arr = allocate_buffer(buffer_arr, n)
+        sorted_arr = merge_sort_two_way_bottom_up_helper(buffer_arr, temp_arr, n, stats)
+        # copy run if final run is not in data array
+        if sorted_arr is not buffer_arr:
+            for i in range(0, n):
+                buffer_arr[i] = sorted_arr[i]
+    else:
+        temp_arr = copy_buffer(buffer_arr)
+        merge_sort_two_way_recursive_helper(buffer_arr, 0, n, temp_arr, stats)
+
+    return data_arr, stats.comps, stats.exs
+
+
+def merge_sort_two_way_fast(data_arr):
+    """
+    Uninstrumented kernel of the buffered two-way merge sort for sorting when the counts are not needed.
+    Same top-down ping-pong recursion as merge_sort_two_way_buffered, with no counters or timing in the loops.
+    :param data_arr: the array to sort in place.
+    ;return data_arr: the sorted array.
+    """
+    buffer_arr = as_sort_buffer(data_arr)
+    temp_arr = copy_buffer(buffer_arr)
+    merge_sort_two_way_fast_helper(buffer_arr, 0, len(buffer_arr), temp_arr)
+    return data_arr
 
 
-def reset_counts_merge_sort_two_way():
+def merge_sort_two_way_fast_helper(tx_arr, low, high, rx_arr):
     """
-    Resets the comparisons and exchanges counters so they are initialized for a new sort.
+    Uninstrumented counterpart of merge_sort_two_way_recursive_helper.
+    :param tx_arr: the array to merge to - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param high: the high pointer (end of second subarray).
+    :param rx_arr: the array to split and merge sort from - receiving (rx) array.
     """
-    # reset comparison and exchange counts for next run
-    global M2X_COMP
-    global M2X_EX
-    M2X_COMP = 0
-    M2X_EX = 0
+    if (high - low) < 2:
+        return
+
+    mid = low + (high - low) // 2
+    merge_sort_two_way_fast_helper(rx_arr, low, mid, tx_arr)                                        ### RECURSIVE CALL
+    merge_sort_two_way_fast_helper(rx_arr, mid, high, tx_arr)                                       ### RECURSIVE CALL
+    merge_two_way_fast(rx_arr, low, mid, high, tx_arr)
+
+
+def merge_two_way_fast(tx_arr, low, mid, high, rx_arr):
+    """
+    Uninstrumented merge of the adjacent sorted ranges tx_arr[low:mid] and tx_arr[mid:high] into the same positions of
+        rx_arr. Equal values are taken from the first range first, so the merge is stable.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param mid: the mid pointer (divides first and second subarrays).
+    :param high: the high pointer (end of second subarray).
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    """
+    merge_two_ranges_fast(tx_arr, low, mid, mid, high, rx_arr, low)
+
+
+def merge_two_ranges_fast(tx_arr, i, i_end, j, j_end, rx_arr, l):
+    """
+    Uninstrumented counterpart of merge_two_ranges: only the head that advanced is read again, and the rest is copied
+        with one slice assignment.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param i: the start of the first range.
+    :param i_end: the end of the first range.
+    :param j: the start of the second range.
+    :param j_end: the end of the second range.
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param l: the first position of rx_arr to write.
+    """
+    if (i < i_end) and (j < j_end):
+        first_val = tx_arr[i]
+        second_val = tx_arr[j]
+        while True:
+            if second_val < first_val:
+                rx_arr[l] = second_val
+                l += 1
+                j += 1
+                if j == j_end:
+                    break
+                second_val = tx_arr[j]
+            else:
+                rx_arr[l] = first_val
+                l += 1
+                i += 1
+                if i == i_end:
+                    break
+                first_val = tx_arr[i]
+            # endif
+        # endloop
+    # endif
 
+    # copy the rest; at most one of the two ranges has values left
+    rx_arr[l:l + (i_end - i)] = tx_arr[i:i_end]
+    l += i_end - i
+    rx_arr[l:l + (j_end - j)] = tx_arr[j:j_end]
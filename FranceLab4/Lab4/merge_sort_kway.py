@@ -0,0 +1,250 @@
+# merge_sort_kway.py
+# Kordel France
+########################################################################################################################
+# This file provides functions to sort an array of integers in ascending order using a k-way merge sort.
+# The array is split into k parts at every level and the sorted parts are merged through a tournament (loser) tree, so
+#   each element written to the output costs about log2(k) comparisons regardless of k.
+########################################################################################################################
+# NOTE: Source 4 was leveraged for the layout of the loser tree: internal nodes 1..k-1 hold the loser of the match
+#   played at that node, leaves k..2k-1 stand for the k runs, and the overall winner is replayed up from its leaf.
+
+from Lab4.buffers import as_sort_buffer, copy_buffer
+from Lab4.SortStats import SortStats
+
+
+def loser_tree_beats(tx_arr, heads, ends, a, b, stats):
+    """
+    Plays one match of the tournament between runs a and b.
+    An exhausted run loses to any run that still has elements. Ties go to the run with the lower index so the merge
+        is stable.
+    :param tx_arr: the array holding the runs - transmitting (tx) array.
+    :param heads: the read pointer of every run.
+    :param ends: the end pointer of every run.
+    :param a: the index of the first run.
+    :param b: the index of the second run.
+    :param stats: the SortStats object of the running sort.
+    ;return: True if run a wins the match.
+    """
+    if heads[b] >= ends[b]:
+        return True
+    if heads[a] >= ends[a]:
+        return False
+    stats.comps += 1
+    if a < b:
+        return not (tx_arr[heads[b]] < tx_arr[heads[a]])
+    return tx_arr[heads[a]] < tx_arr[heads[b]]
+
+
+def merge_k_way(tx_arr, bounds, rx_arr, stats):
+    """
+    Function for merging k adjacent sorted ranges of tx_arr into the same positions of rx_arr with a loser tree.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param bounds: the k + 1 pointers that delimit the k ranges; range i is [bounds[i], bounds[i + 1]).
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param stats: the SortStats object of the running sort.
+    """
+    k = len(bounds) - 1
+    heads = bounds[:-1]
+    ends = bounds[1:]
+
+    # build the tree bottom-up: winners[] is scratch space, tree[] keeps the loser of every match
+    tree = [0] * k
+    winners = [0] * (2 * k)
+    for i in range(0, k):
+        winners[k + i] = i
+    for node in range(k - 1, 0, -1):
+        a = winners[2 * node]
+        b = winners[2 * node + 1]
+        if loser_tree_beats(tx_arr, heads, ends, a, b, stats):
+            winners[node] = a
+            tree[node] = b
+        else:
+            winners[node] = b
+            tree[node] = a
+    # endloop
+    winner = winners[1] if k > 1 else 0
+
+    pointer_pos = bounds[0]
+    while heads[winner] < ends[winner]:
+        # output the overall winner
+        rx_arr[pointer_pos] = tx_arr[heads[winner]]
+        pointer_pos += 1
+        heads[winner] += 1
+        stats.exs += 1
+
+        # replay the matches on the path from the winner's leaf to the root (loser_tree_beats, inlined)
+        winner_live = heads[winner] < ends[winner]
+        node = (winner + k) // 2
+        while node > 0:
+            opponent = tree[node]
+            if heads[opponent] < ends[opponent]:
+                if not winner_live:
+                    tree[node] = winner
+                    winner = opponent
+                    winner_live = True
+                else:
+                    stats.comps += 1
+                    if winner < opponent:
+                        opponent_wins = tx_arr[heads[opponent]] < tx_arr[heads[winner]]
+                    else:
+                        opponent_wins = not (tx_arr[heads[winner]] < tx_arr[heads[opponent]])
+                    if opponent_wins:
+                        tree[node] = winner
+                        winner = opponent
+                # endif
+            # endif
+            node //= 2
+        # endloop
+    # endloop
+
+
+def merge_sort_k_way_recursive_helper(tx_arr, low, high, rx_arr, k, stats):
+    """
+    Function for finding the k - 1 middle indices needed for the k-way merge sort.
+    Both arrays must hold the same values over [low, high); the sorted range is left in tx_arr.
+    :param tx_arr: the array to merge to - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param high: the high pointer (end of the last subarray).
+    :param rx_arr: the array to split and merge sort from - receiving (rx) array.
+    :param k: the number of subarrays to split into.
+    :param stats: the SortStats object of the running sort.
+    """
+    if (high - low) < 2:
+        return
+
+    # split into k (or fewer, for short ranges) parts of near-equal length
+    parts = min(k, high - low)
+    bounds = [low + ((high - low) * i) // parts for i in range(0, parts + 1)]
+
+    # sort the k arrays recursively, calling separate recursive stack for each one
+    for i in range(0, parts):
+        merge_sort_k_way_recursive_helper(rx_arr, bounds[i], bounds[i + 1], tx_arr, k, stats)   ### RECURSIVE CALL
+
+    # arrays are sorted - now consolidate them in one final merge
+    merge_k_way(rx_arr, bounds, tx_arr, stats)
+
+
+def merge_sort_k_way(data_arr, k=4, stats=None):
+    """
+    Driver for implementing merge sort from k sub-arrays.
+    :param data_arr: the array to split and merge sort from.
+    :param k: the number of sub-arrays merged at every level; must be at least 2.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
+    ;return data_arr: the sorted array.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed
+    """
+    if k < 2:
+        raise ValueError(f'k-way merge sort needs k >= 2, got k = {k}')
+
+    if stats is None:
+        stats = SortStats()
+    buffer_arr = as_sort_buffer(data_arr)
+    n = len(buffer_arr)
+
+    temp_arr = copy_buffer(buffer_arr)
+    merge_sort_k_way_recursive_helper(buffer_arr, 0, n, temp_arr, k, stats)
+
+    return data_arr, stats.comps, stats.exs
+
+
+def merge_k_way_fast(tx_arr, bounds, rx_arr):
+    """
+    Uninstrumented counterpart of merge_k_way: the same loser tree, with no counters in the replay loop.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param bounds: the k + 1 pointers that delimit the k ranges; range i is [bounds[i], bounds[i + 1]).
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    """
+    k = len(bounds) - 1
+    heads = bounds[:-1]
+    ends = bounds[1:]
+
+    # build the tree bottom-up: winners[] is scratch space, tree[] keeps the loser of every match
+    tree = [0] * k
+    winners = [0] * (2 * k)
+    for i in range(0, k):
+        winners[k + i] = i
+    for node in range(k - 1, 0, -1):
+        a = winners[2 * node]
+        b = winners[2 * node + 1]
+        if heads[b] >= ends[b]:
+            a_wins = True
+        elif heads[a] >= ends[a]:
+            a_wins = False
+        elif a < b:
+            a_wins = not (tx_arr[heads[b]] < tx_arr[heads[a]])
+        else:
+            a_wins = tx_arr[heads[a]] < tx_arr[heads[b]]
+        if a_wins:
+            winners[node] = a
+            tree[node] = b
+        else:
+            winners[node] = b
+            tree[node] = a
+    # endloop
+    winner = winners[1] if k > 1 else 0
+
+    pointer_pos = bounds[0]
+    while heads[winner] < ends[winner]:
+        # output the overall winner
+        rx_arr[pointer_pos] = tx_arr[heads[winner]]
+        pointer_pos += 1
+        heads[winner] += 1
+
+        # replay the matches on the path from the winner's leaf to the root
+        winner_live = heads[winner] < ends[winner]
+        node = (winner + k) // 2
+        while node > 0:
+            opponent = tree[node]
+            if heads[opponent] < ends[opponent]:
+                if not winner_live:
+                    tree[node] = winner
+                    winner = opponent
+                    winner_live = True
+                elif winner < opponent:
+                    if tx_arr[heads[opponent]] < tx_arr[heads[winner]]:
+                        tree[node] = winner
+                        winner = opponent
+                elif not (tx_arr[heads[winner]] < tx_arr[heads[opponent]]):
+                    tree[node] = winner
+                    winner = opponent
+                # endif
+            # endif
+            node //= 2
+        # endloop
+    # endloop
+
+
+def merge_sort_k_way_fast_helper(tx_arr, low, high, rx_arr, k):
+    """
+    Uninstrumented counterpart of merge_sort_k_way_recursive_helper.
+    :param tx_arr: the array to merge to - transmitting (tx) array.
+    :param low: the low pointer for the first subarray.
+    :param high: the high pointer (end of the last subarray).
+    :param rx_arr: the array to split and merge sort from - receiving (rx) array.
+    :param k: the number of subarrays to split into.
+    """
+    if (high - low) < 2:
+        return
+
+    parts = min(k, high - low)
+    bounds = [low + ((high - low) * i) // parts for i in range(0, parts + 1)]
+    for i in range(0, parts):
+        merge_sort_k_way_fast_helper(rx_arr, bounds[i], bounds[i + 1], tx_arr, k)           ### RECURSIVE CALL
+    merge_k_way_fast(rx_arr, bounds, tx_arr)
+
+
+def merge_sort_k_way_fast(data_arr, k=4):
+    """
+    Uninstrumented kernel of the k-way merge sort for sorting when the counts are not needed.
+    :param data_arr: the array to split and merge sort from.
+    :param k: the number of sub-arrays merged at every level; must be at least 2.
+    ;return data_arr: the sorted array.
+    """
+    if k < 2:
+        raise ValueError(f'k-way merge sort needs k >= 2, got k = {k}')
+
+    buffer_arr = as_sort_buffer(data_arr)
+    temp_arr = copy_buffer(buffer_arr)
+    merge_sort_k_way_fast_helper(buffer_arr, 0, len(buffer_arr), temp_arr, k)
+    return data_arr
@@ -6,10 +6,13 @@
 # NOTE: Source 3 was leveraged to figure out whether or not the number of comparisons should be incremented while
 #  identifying the number of runs.
 
-import time
+from Lab4.buffers import as_sort_buffer, allocate_buffer
+from Lab4.SortStats import SortStats
 
-M1X_COMP = 0
-M1X_EX = 0
+# runs shorter than this are extended by binary insertion in adaptive mode
+MIN_MERGE = 64
+# number of consecutive wins by one run before a merge switches to galloping
+MIN_GALLOP = 7
 
 '''
 The signature of the merge() method differs from the example above as follows:
@@ -19,44 +22,61 @@ Instead of returning a new array, the target array is also passed to the method
 '''
 
 
-def merge_sort_natural(data_arr):
+def merge_sort_natural(data_arr, adaptive=False, detect_descending=True, stats=None):
     """
     Driver for implementing the natural merge sort algorithm.
     :param data_arr: the array to split and merge sort from.
+    :param adaptive: merge runs from a balanced run stack with galloping (TimSort-style) instead of in fixed passes.
+    :param detect_descending: treat strictly descending runs as runs by reversing them in place during the first pass.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
     ;return data_arr: the sorted array.
-    ;return M1X_COMP: number of comparisons performed
-    ;return M1X_EX: number of exchanges performed
-    ;return time: The time it takes for the algorithm to sort the file.
+    ;return comps: number of comparisons performed
+    ;return exs: number of exchanges performed
     """
-    start_time = time.time()
-    global M1X_COMP
-    global M1X_EX
+    if stats is None:
+        stats = SortStats()
+
+    buffer_arr = as_sort_buffer(data_arr)
+    length = len(buffer_arr)
+    temp_arr = allocate_buffer(buffer_arr, length)
+
+    if adaptive:
+        merge_sort_natural_adaptive_helper(buffer_arr, temp_arr, length, stats, detect_descending)
+        return data_arr, stats.comps, stats.exs
+    # endif
 
-    begin_length = len(data_arr)
-    length = len(data_arr)
-    temp_arr = [0] * length
     pntr_array = [0] * (length + 1)
 
     # 1 - identify runs
     runs = 0
     pntr_array[0] = 0
-    for i in range(1, length + 1):
-        if (i == length) or (data_arr[i] < data_arr[i - 1]):
+    if detect_descending:
+        low = 0
+        while low < length:
+            low += count_run(buffer_arr, low, length, stats, detect_descending)
             runs += 1
-            pntr_array[runs] = i
-            M1X_COMP += 1
-        # endif
-    # endloop
+            pntr_array[runs] = low
+        # endloop
+    else:
+        for i in range(1, length + 1):
+            if i < length:
+                stats.comps += 1                                    # every neighbouring pair is compared once
+            if (i == length) or (buffer_arr[i] < buffer_arr[i - 1]):
+                runs += 1
+                pntr_array[runs] = i
+            # endif
+        # endloop
+    # endif
 
     # 2 - merge runs until only 1 run is left
-    tx_arr = data_arr
+    tx_arr = buffer_arr
     rx_arr = temp_arr
 
     while (runs > 1):
         new_runs = 0
         # merge 2 runs together
         for i in range(0, runs - 1, 2):
-            merge_natural(tx_arr, rx_arr, pntr_array[i], pntr_array[i + 1], pntr_array[i + 2])      ### RECURSIVE CALL
+            merge_natural(tx_arr, rx_arr, pntr_array[i], pntr_array[i + 1], pntr_array[i + 2], stats)
             pntr_array[new_runs] = pntr_array[i]
             new_runs += 1
         # endif
@@ -65,7 +85,8 @@ def merge_sort_natural(data_arr):
         if (runs % 2 == 1):
             last_start = pntr_array[runs - 1]
             for j in range(last_start, length):
-                rx_arr.append(tx_arr[i])
+                rx_arr[j] = tx_arr[j]
+                stats.exs += 1
             pntr_array[new_runs] = last_start
             new_runs += 1
         # endif
@@ -79,27 +100,26 @@ def merge_sort_natural(data_arr):
     # endloop
 
     # copy run if final run is not in data array
-    for i in range(0, length):
-        data_arr[i] = tx_arr[i]
-    # endloop
+    if tx_arr is not buffer_arr:
+        for i in range(0, length):
+            buffer_arr[i] = tx_arr[i]
+        # endloop
+    # endif
 
-    end_time = time.time()
-    delta_time = end_time - start_time
-    return data_arr, M1X_COMP, M1X_EX, "{:.6f}".format(delta_time)
+    return data_arr, stats.comps, stats.exs
 
 
-def merge_natural(tx_arr, rx_arr, left_idx, right_idx, end_pos):
+def merge_natural(tx_arr, rx_arr, left_idx, right_idx, end_pos, stats):
     """
-    Function for finding both middle indices needed for the three-way merge sort.
-    :param tx_arr: the array to split and merge sort from - transmitting (tx) array.
+    Function for merging two adjacent natural runs, tx_arr[left_idx:right_idx] and tx_arr[right_idx:end_pos], into the
+        same positions of rx_arr. Equal values are taken from the left run first, so the merge is stable.
+    :param tx_arr: the array holding both runs - transmitting (tx) array.
     :param rx_arr: the array to merge to - receiving (rx) array.
-    :param left_idx: the low pointer for traversal.
-    :param right_idx: the high pointer for traversal.
-    :param end_pos: the end pointer for traversal.
+    :param left_idx: the start of the left run.
+    :param right_idx: the start of the right run (the end of the left run).
+    :param end_pos: the end of the right run (exclusive).
+    :param stats: the SortStats object of the running sort.
     """
-    global M1X_COMP
-    global M1X_EX
-
     left_pos = left_idx
     right_pos = right_idx
     pointer_pos = left_idx
@@ -112,43 +132,529 @@ def merge_natural(tx_arr, rx_arr, left_idx, right_idx, end_pos):
             rx_arr[pointer_pos] = left_val
             pointer_pos += 1
             left_pos += 1
-            M1X_COMP += 1
-            M1X_EX += 1
+            stats.comps += 1
+            stats.exs += 1
         else:
             rx_arr[pointer_pos] = right_val
             pointer_pos += 1
             right_pos += 1
-            M1X_COMP += 1
-            M1X_EX += 1
+            stats.comps += 1
+            stats.exs += 1
         # endif
     # endloop
 
-    # copy the rest
+    # copy the rest; no comparisons are needed once one run is exhausted
     while (left_pos < right_idx):
         rx_arr[pointer_pos] = tx_arr[left_pos]
         pointer_pos += 1
         left_pos += 1
-        M1X_COMP += 1
-        M1X_EX += 1
+        stats.exs += 1
     # endloop
 
     while (right_pos < end_pos):
         rx_arr[pointer_pos] = tx_arr[right_pos]
         pointer_pos += 1
         right_pos += 1
-        M1X_COMP += 1
-        M1X_EX += 1
+        stats.exs += 1
+    # endloop
+
+
+def merge_sort_natural_adaptive_helper(data_arr, temp_arr, length, stats, detect_descending=True):
+    """
+    Function for sorting with a TimSort-style run stack.
+    Runs are identified left to right; runs shorter than the minimum run length are extended by binary insertion.
+    Each run is pushed onto a stack whose lengths are kept balanced so that every merge pairs runs of similar size.
+    :param data_arr: the array to sort in place.
+    :param temp_arr: an auxiliary array at least as long as data_arr.
+    :param length: the number of elements to sort.
+    :param stats: the SortStats object of the running sort.
+    :param detect_descending: reverse strictly descending runs in place instead of splitting them up.
+    """
+    min_run = compute_min_run(length)
+    run_stack = []
+    min_gallop = MIN_GALLOP
+
+    low = 0
+    while low < length:
+        run_len = count_run(data_arr, low, length, stats, detect_descending)
+        # extend short runs to min_run elements
+        if run_len < min_run:
+            forced_len = min(min_run, length - low)
+            binary_insertion_sort(data_arr, low, low + forced_len, low + run_len, stats)
+            run_len = forced_len
+        # endif
+        run_stack.append((low, run_len))
+        min_gallop = merge_collapse(data_arr, temp_arr, run_stack, min_gallop, stats)
+        low += run_len
+    # endloop
+
+    merge_force_collapse(data_arr, temp_arr, run_stack, min_gallop, stats)
+
+
+def compute_min_run(length):
+    """
+    Computes the minimum run length for the adaptive natural merge sort.
+    The result lies in [MIN_MERGE / 2, MIN_MERGE] so that length / min_run is a power of two or slightly below one.
+    :param length: the number of elements to sort.
+    ;return: the minimum run length.
+    """
+    remainder = 0
+    while length >= MIN_MERGE:
+        remainder |= length & 1
+        length >>= 1
+    # endloop
+    return length + remainder
+
+
+def count_run(data_arr, low, high, stats, detect_descending=True):
+    """
+    Counts the length of the run that begins at low.
+    A strictly descending run is reversed in place so that every run is ascending when this returns. Descending runs
+        must be strict so that reversing them never reorders equal elements.
+    :param data_arr: the array to scan.
+    :param low: the start of the run.
+    :param high: the end of the range to scan.
+    :param stats: the SortStats object of the running sort.
+    :param detect_descending: whether to look for a strictly descending run as well as an ascending one.
+    ;return: the number of elements in the run.
+    """
+
+    run_end = low + 1
+    if run_end == high:
+        return 1
+
+    stats.comps += 1
+    if data_arr[run_end] < data_arr[low]:
+        # strictly descending run
+        if detect_descending:
+            run_end += 1
+            while run_end < high:
+                stats.comps += 1
+                if not (data_arr[run_end] < data_arr[run_end - 1]):
+                    break
+                run_end += 1
+            # endloop
+            reverse_run(data_arr, low, run_end, stats)
+        # endif
+    else:
+        # ascending run
+        run_end += 1
+        while run_end < high:
+            stats.comps += 1
+            if data_arr[run_end] < data_arr[run_end - 1]:
+                break
+            run_end += 1
+        # endloop
+    # endif
+    return run_end - low
+
+
+def reverse_run(data_arr, low, high, stats):
+    """
+    Reverses data_arr[low:high] in place by swapping elements from both ends towards the middle.
+    :param data_arr: the array holding the run.
+    :param low: the start of the run.
+    :param high: the end of the run.
+    :param stats: the SortStats object of the running sort.
+    """
+
+    high -= 1
+    while low < high:
+        data_arr[low], data_arr[high] = data_arr[high], data_arr[low]
+        low += 1
+        high -= 1
+        stats.exs += 1
     # endloop
 
 
+def binary_insertion_sort(data_arr, low, high, start, stats):
+    """
+    Sorts data_arr[low:high] in place given that data_arr[low:start] is already sorted.
+    The insertion point of each element is found by binary search; equal elements keep their order.
+    :param data_arr: the array to sort in place.
+    :param low: the start of the range.
+    :param high: the end of the range.
+    :param start: the first element that is not yet part of the sorted prefix.
+    :param stats: the SortStats object of the running sort.
+    """
+
+    for i in range(start, high):
+        pivot = data_arr[i]
+        left = low
+        right = i
+        while left < right:
+            mid = (left + right) // 2
+            stats.comps += 1
+            if pivot < data_arr[mid]:
+                right = mid
+            else:
+                left = mid + 1
+        # endloop
+
+        # shift the larger elements one slot right and drop the pivot in
+        if left != i:
+            for j in range(i, left, -1):
+                data_arr[j] = data_arr[j - 1]
+                stats.exs += 1
+            data_arr[left] = pivot
+            stats.exs += 1
+        # endif
+    # endloop
+
+
+def merge_collapse(data_arr, temp_arr, run_stack, min_gallop, stats):
+    """
+    Merges runs on the stack until the balance invariants hold for the top three runs X, Y, Z (Z on top):
+        len(X) > len(Y) + len(Z) and len(Y) > len(Z).
+    :param data_arr: the array being sorted.
+    :param temp_arr: an auxiliary array at least as long as data_arr.
+    :param run_stack: the stack of pending runs as (base, length) tuples.
+    :param min_gallop: the current galloping threshold.
+    :param stats: the SortStats object of the running sort.
+    ;return: the updated galloping threshold.
+    """
+    while len(run_stack) > 1:
+        n = len(run_stack) - 2
+        if (n > 0 and run_stack[n - 1][1] <= run_stack[n][1] + run_stack[n + 1][1]) or \
+                (n > 1 and run_stack[n - 2][1] <= run_stack[n - 1][1] + run_stack[n][1]):
+            if run_stack[n - 1][1] < run_stack[n + 1][1]:
+                n -= 1
+        elif run_stack[n][1] > run_stack[n + 1][1]:
+            break
+        # endif
+        min_gallop = merge_at(data_arr, temp_arr, run_stack, n, min_gallop, stats)
+    # endloop
+    return min_gallop
+
+
+def merge_force_collapse(data_arr, temp_arr, run_stack, min_gallop, stats):
+    """
+    Merges all remaining runs on the stack until a single sorted run is left.
+    :param data_arr: the array being sorted.
+    :param temp_arr: an auxiliary array at least as long as data_arr.
+    :param run_stack: the stack of pending runs as (base, length) tuples.
+    :param min_gallop: the current galloping threshold.
+    :param stats: the SortStats object of the running sort.
+    """
+    while len(run_stack) > 1:
+        n = len(run_stack) - 2
+        if n > 0 and run_stack[n - 1][1] < run_stack[n + 1][1]:
+            n -= 1
+        min_gallop = merge_at(data_arr, temp_arr, run_stack, n, min_gallop, stats)
+    # endloop
+
 
-def reset_counts_merge_sort_natural():
+def merge_at(data_arr, temp_arr, run_stack, i, min_gallop, stats):
     """
-    Resets the comparisons and exchanges counters so they are initialized for a new sort.
+    Merges the adjacent runs at stack positions i and i + 1.
+    Elements of the first run that are already no greater than the start of the second run, and elements of the
+        second run that are already no smaller than the end of the first run, are left where they are.
+    :param data_arr: the array being sorted.
+    :param temp_arr: an auxiliary array at least as long as data_arr.
+    :param run_stack: the stack of pending runs as (base, length) tuples.
+    :param i: the stack position of the first run.
+    :param min_gallop: the current galloping threshold.
+    :param stats: the SortStats object of the running sort.
+    ;return: the updated galloping threshold.
     """
-    # reset comparison and exchange counts for next run
-    global M1X_COMP
-    global M1X_EX
-    M1X_COMP = 0
-    M1X_EX = 0
 
+    base1, len1 = run_stack[i]
+    base2, len2 = run_stack[i + 1]
+    run_stack[i] = (base1, len1 + len2)
+    del run_stack[i + 1]
+
+    # skip the prefix of run 1 that is already in place
+    k = gallop_right(data_arr[base2], data_arr, base1, len1, stats)
+    base1 += k
+    len1 -= k
+    if len1 == 0:
+        return min_gallop
+
+    # skip the suffix of run 2 that is already in place
+    len2 = gallop_left(data_arr[base1 + len1 - 1], data_arr, base2, len2, stats)
+    if len2 == 0:
+        return min_gallop
+
+    # move run 1 aside, then merge it with run 2 back into the data array
+    for j in range(base1, base2):
+        temp_arr[j] = data_arr[j]
+        stats.exs += 1
+    # endloop
+    return merge_natural_galloping(temp_arr, data_arr, base1, base2, base2 + len2, min_gallop, stats)
+
+
+def gallop_right(key, data_arr, base, length, stats):
+    """
+    Exponential search for the number of leading elements of data_arr[base:base + length] that are <= key.
+    :param key: the value to locate.
+    :param data_arr: the array holding the sorted range.
+    :param base: the start of the sorted range.
+    :param length: the length of the sorted range.
+    :param stats: the SortStats object of the running sort.
+    ;return: the number of elements in the range that are less than or equal to key.
+    """
+
+    if length == 0:
+        return 0
+    stats.comps += 1
+    if key < data_arr[base]:
+        return 0
+
+    # gallop until data_arr[base + last_ofs] <= key < data_arr[base + ofs]
+    last_ofs = 0
+    ofs = 1
+    while ofs < length:
+        stats.comps += 1
+        if key < data_arr[base + ofs]:
+            break
+        last_ofs = ofs
+        ofs = (ofs << 1) + 1
+    # endloop
+    if ofs > length:
+        ofs = length
+
+    # binary search inside the last gallop step
+    last_ofs += 1
+    while last_ofs < ofs:
+        mid = (last_ofs + ofs) // 2
+        stats.comps += 1
+        if key < data_arr[base + mid]:
+            ofs = mid
+        else:
+            last_ofs = mid + 1
+    # endloop
+    return ofs
+
+
+def gallop_left(key, data_arr, base, length, stats):
+    """
+    Exponential search for the number of leading elements of data_arr[base:base + length] that are < key.
+    :param key: the value to locate.
+    :param data_arr: the array holding the sorted range.
+    :param base: the start of the sorted range.
+    :param length: the length of the sorted range.
+    :param stats: the SortStats object of the running sort.
+    ;return: the number of elements in the range that are strictly less than key.
+    """
+
+    if length == 0:
+        return 0
+    stats.comps += 1
+    if not (data_arr[base] < key):
+        return 0
+
+    # gallop until data_arr[base + last_ofs] < key <= data_arr[base + ofs]
+    last_ofs = 0
+    ofs = 1
+    while ofs < length:
+        stats.comps += 1
+        if not (data_arr[base + ofs] < key):
+            break
+        last_ofs = ofs
+        ofs = (ofs << 1) + 1
+    # endloop
+    if ofs > length:
+        ofs = length
+
+    # binary search inside the last gallop step
+    last_ofs += 1
+    while last_ofs < ofs:
+        mid = (last_ofs + ofs) // 2
+        stats.comps += 1
+        if data_arr[base + mid] < key:
+            last_ofs = mid + 1
+        else:
+            ofs = mid
+    # endloop
+    return ofs
+
+
+def merge_natural_galloping(tx_arr, rx_arr, left_idx, right_idx, end_pos, min_gallop, stats):
+    """
+    Function for merging two adjacent runs, switching to galloping when one run keeps winning.
+    The left run is read from tx_arr[left_idx:right_idx] and the right run from rx_arr[right_idx:end_pos]; the merged
+        result is written to rx_arr[left_idx:end_pos]. The write pointer never passes the right run's read pointer, so
+        whatever remains of the right run once the left run is exhausted is already in place.
+    :param tx_arr: the array holding the left run - transmitting (tx) array.
+    :param rx_arr: the array holding the right run and receiving the merge - receiving (rx) array.
+    :param left_idx: the low pointer for traversal.
+    :param right_idx: the high pointer for traversal.
+    :param end_pos: the end pointer for traversal.
+    :param min_gallop: the number of consecutive wins that triggers galloping.
+    :param stats: the SortStats object of the running sort.
+    ;return: the updated galloping threshold.
+    """
+    left_pos = left_idx
+    right_pos = right_idx
+    pointer_pos = left_idx
+
+    while (left_pos < right_idx) and (right_pos < end_pos):
+        # merge one element at a time until one run wins min_gallop times in a row
+        left_wins = 0
+        right_wins = 0
+        while (left_pos < right_idx) and (right_pos < end_pos):
+            stats.comps += 1
+            stats.exs += 1
+            if rx_arr[right_pos] < tx_arr[left_pos]:
+                rx_arr[pointer_pos] = rx_arr[right_pos]
+                right_pos += 1
+                right_wins += 1
+                left_wins = 0
+            else:
+                rx_arr[pointer_pos] = tx_arr[left_pos]
+                left_pos += 1
+                left_wins += 1
+                right_wins = 0
+            # endif
+            pointer_pos += 1
+            if (left_wins >= min_gallop) or (right_wins >= min_gallop):
+                break
+        # endloop
+
+        # gallop: copy whole blocks from whichever run is winning
+        while (left_pos < right_idx) and (right_pos < end_pos):
+            left_count = gallop_right(rx_arr[right_pos], tx_arr, left_pos, right_idx - left_pos, stats)
+            for j in range(left_pos, left_pos + left_count):
+                rx_arr[pointer_pos] = tx_arr[j]
+                pointer_pos += 1
+                stats.exs += 1
+            # endloop
+            left_pos += left_count
+            if left_pos == right_idx:
+                break
+
+            right_count = gallop_left(tx_arr[left_pos], rx_arr, right_pos, end_pos - right_pos, stats)
+            for j in range(right_pos, right_pos + right_count):
+                rx_arr[pointer_pos] = rx_arr[j]
+                pointer_pos += 1
+                stats.exs += 1
+            # endloop
+            right_pos += right_count
+
+            # leave galloping (and make it harder to re-enter) once it stops paying off
+            if (left_count < MIN_GALLOP) and (right_count < MIN_GALLOP):
+                min_gallop += 1
+                break
+            min_gallop = max(1, min_gallop - 1)
+        # endloop
+    # endloop
+
+    # copy the rest of the left run; the rest of the right run is already in place
+    while (left_pos < right_idx):
+        rx_arr[pointer_pos] = tx_arr[left_pos]
+        pointer_pos += 1
+        left_pos += 1
+        stats.exs += 1
+    # endloop
+    return min_gallop
+
+
+def merge_sort_natural_fast(data_arr):
+    """
+    Uninstrumented kernel of the natural merge sort for sorting when the counts are not needed.
+    Same runs (strictly descending runs are reversed) and the same fixed merge passes as merge_sort_natural with
+        adaptive=False, but with no counters and no timing in the loops, and leftover runs copied as slices.
+    :param data_arr: the array to split and merge sort from.
+    ;return data_arr: the sorted array.
+    """
+    buffer_arr = as_sort_buffer(data_arr)
+    length = len(buffer_arr)
+    temp_arr = allocate_buffer(buffer_arr, length)
+
+    # 1 - identify runs
+    pntr_array = [0]
+    low = 0
+    while low < length:
+        high = low + 1
+        if high < length:
+            if buffer_arr[high] < buffer_arr[low]:
+                # strictly descending run - reverse it in place
+                high += 1
+                while (high < length) and (buffer_arr[high] < buffer_arr[high - 1]):
+                    high += 1
+                i = low
+                j = high - 1
+                while i < j:
+                    buffer_arr[i], buffer_arr[j] = buffer_arr[j], buffer_arr[i]
+                    i += 1
+                    j -= 1
+                # endloop
+            else:
+                high += 1
+                while (high < length) and not (buffer_arr[high] < buffer_arr[high - 1]):
+                    high += 1
+            # endif
+        # endif
+        pntr_array.append(high)
+        low = high
+    # endloop
+
+    # 2 - merge runs until only 1 run is left
+    tx_arr = buffer_arr
+    rx_arr = temp_arr
+    while len(pntr_array) > 2:
+        runs = len(pntr_array) - 1
+        new_pntr_array = [0]
+        for i in range(0, runs - 1, 2):
+            merge_natural_fast(tx_arr, rx_arr, pntr_array[i], pntr_array[i + 1], pntr_array[i + 2])
+            new_pntr_array.append(pntr_array[i + 2])
+        # endloop
+
+        # if there was an odd number of runs, copy the last one
+        if runs % 2 == 1:
+            rx_arr[pntr_array[runs - 1]:length] = tx_arr[pntr_array[runs - 1]:length]
+            new_pntr_array.append(length)
+        # endif
+
+        pntr_array = new_pntr_array
+        swap_arr = tx_arr
+        tx_arr = rx_arr
+        rx_arr = swap_arr
+    # endloop
+
+    # copy run if final run is not in data array
+    if tx_arr is not buffer_arr:
+        buffer_arr[:] = tx_arr
+    return data_arr
+
+
+def merge_natural_fast(tx_arr, rx_arr, left_idx, right_idx, end_pos):
+    """
+    Uninstrumented merge of the adjacent runs tx_arr[left_idx:right_idx] and tx_arr[right_idx:end_pos] into the same
+        positions of rx_arr. Equal values are taken from the left run first, so the merge is stable.
+    :param tx_arr: the array to merge from - transmitting (tx) array.
+    :param rx_arr: the array to merge to - receiving (rx) array.
+    :param left_idx: the low pointer for traversal.
+    :param right_idx: the high pointer for traversal.
+    :param end_pos: the end pointer for traversal.
+    """
+    left_pos = left_idx
+    right_pos = right_idx
+    pointer_pos = left_idx
+
+    if (left_pos < right_idx) and (right_pos < end_pos):
+        left_val = tx_arr[left_pos]
+        right_val = tx_arr[right_pos]
+        while True:
+            if right_val < left_val:
+                rx_arr[pointer_pos] = right_val
+                pointer_pos += 1
+                right_pos += 1
+                if right_pos == end_pos:
+                    break
+                right_val = tx_arr[right_pos]
+            else:
+                rx_arr[pointer_pos] = left_val
+                pointer_pos += 1
+                left_pos += 1
+                if left_pos == right_idx:
+                    break
+                left_val = tx_arr[left_pos]
+            # endif
+        # endloop
+    # endif
+
+    # copy the rest; at most one of the two runs has values left
+    rx_arr[pointer_pos:pointer_pos + (right_idx - left_pos)] = tx_arr[left_pos:right_idx]
+    pointer_pos += right_idx - left_pos
+    rx_arr[pointer_pos:end_pos] = tx_arr[right_pos:end_pos]
@@ -0,0 +1,115 @@
+# parallel_sort.py
+# Kordel France
+########################################################################################################################
+# This file provides a multi-core merge sort built on the existing single-core sorting algorithms.
+# The input is copied once into a multiprocessing.shared_memory block and split into P chunks. Each worker process
+#   attaches to the block by name and sorts its chunk in place with natural merge sort, 2-way merge sort or heap sort,
+#   so the data itself is never pickled. The parent then merges the P sorted chunks with the loser-tree k-way merge.
+########################################################################################################################
+
+import array
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from Lab4.heap_sort import heap_sort
+from Lab4.merge_sort_natural import merge_sort_natural
+from Lab4.merge_sort_2way import merge_sort_two_way_buffered
+from Lab4.merge_sort_kway import merge_k_way
+from Lab4.buffers import as_sort_buffer
+from Lab4.SortStats import SortStats
+
+# single-core kernel for every algorithm code a chunk can be sorted with
+PARALLEL_KERNELS = {'m1x': merge_sort_natural,
+                    'm2x': merge_sort_two_way_buffered,
+                    'heap': heap_sort}
+
+
+def sort_shared_chunk(shm_name, typecode, low, high, kernel):
+    """
+    Worker function: attaches to the shared memory block and sorts elements [low, high) in place.
+    :param shm_name: the name of the shared memory block.
+    :param typecode: the struct format of the elements in the block.
+    :param low: the first element of the chunk.
+    :param high: one past the last element of the chunk.
+    :param kernel: the algorithm code of the single-core sort to use - a key of PARALLEL_KERNELS.
+    ;return: the SortStats object of the chunk sort.
+    """
+    sort_function = PARALLEL_KERNELS[kernel]
+    stats = SortStats()
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shared_arr = shm.buf.cast(typecode)
+    chunk_arr = shared_arr[low:high]
+    try:
+        sort_function(chunk_arr, stats=stats)
+    finally:
+        # every view must be released before the block can be closed
+        chunk_arr.release()
+        shared_arr.release()
+        shm.close()
+    return stats
+
+
+def infer_typecode(buffer_arr):
+    """
+    Chooses the element format for the shared memory block.
+    :param buffer_arr: a list or memoryview returned by as_sort_buffer.
+    ;return: the memoryview's own format, 'q' for a list of ints, or 'd' for a list holding any floats.
+    """
+    if isinstance(buffer_arr, memoryview):
+        return buffer_arr.format
+    for value in buffer_arr:
+        if not isinstance(value, int):
+            return 'd'
+    return 'q'
+
+
+def parallel_merge_sort(data_arr, workers=None, kernel='m1x', stats=None):
+    """
+    Driver for sorting on several cores.
+    :param data_arr: a list of ints or floats, an array.array or a one-dimensional numpy.ndarray to sort in place.
+    :param workers: the number of worker processes (and chunks); defaults to the number of CPUs.
+    :param kernel: the single-core sort used on every chunk - 'm1x', 'm2x' or 'heap'.
+    :param stats: the SortStats object that collects the counts of this call; a new one is created if omitted.
+    ;return data_arr: the sorted array.
+    ;return comps: number of comparisons performed by the chunk sorts and the final merge
+    ;return exs: number of exchanges performed by the chunk sorts and the final merge
+    """
+    if stats is None:
+        stats = SortStats()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    buffer_arr = as_sort_buffer(data_arr)
+    n = len(buffer_arr)
+    typecode = infer_typecode(buffer_arr)
+    itemsize = buffer_arr.itemsize if isinstance(buffer_arr, memoryview) else array.array(typecode).itemsize
+
+    # chunk boundaries; never more chunks than elements
+    parts = max(1, min(workers, n))
+    bounds = [(n * i) // parts for i in range(0, parts + 1)]
+
+    shm = shared_memory.SharedMemory(create=True, size=max(itemsize, n * itemsize))
+    shared_arr = shm.buf.cast(typecode)
+    sorted_arr = shared_arr[:n]
+    try:
+        # copy the input into shared memory once
+        if isinstance(buffer_arr, memoryview):
+            sorted_arr[:] = buffer_arr
+        else:
+            sorted_arr[:] = array.array(typecode, buffer_arr)
+
+        # sort the chunks in parallel
+        with ProcessPoolExecutor(max_workers=parts) as executor:
+            futures = [executor.submit(sort_shared_chunk, shm.name, typecode, bounds[i], bounds[i + 1], kernel)
+                       for i in range(0, parts)]
+            for future in futures:
+                stats.add(future.result())
+
+        # merge the sorted chunks straight back into the caller's array
+        merge_k_way(sorted_arr, bounds, buffer_arr, stats)
+    finally:
+        sorted_arr.release()
+        shared_arr.release()
+        shm.close()
+        shm.unlink()
+
+    return data_arr, stats.comps, stats.exs
@@ -0,0 +1,290 @@
+# results.py
+# Kordel France
+########################################################################################################################
+# This file provides the results container: a compact, append-only record of every sorting run.
+# The container is a pair of files:
+#   {path}.idx - the index; one JSON line per run with its metadata (n, data type, algorithm, counts and timings) and,
+#                if the data was stored, the offset, length and dtype of its arrays in the data file.
+#   {path}.bin - the data file; the presorted and postsorted arrays as raw values in their own dtype (int64 for the
+#                generated data, float64 for float input), only written when the arrays are included.
+# Without the arrays the container grows with the number of runs, not with n. The per-run .csv files of earlier
+#   versions are now an opt-in export generated from the container (export_csv).
+# BackgroundResultsWriter appends runs from a background thread while the next runs are still sorting.
+########################################################################################################################
+
+import json
+import os
+import queue
+import threading
+import numpy as np
+from Lab4.constants import results_queue_size
+from Lab4.Metric import Metric as m, digest_data
+
+# kinds of dtype whose arrays can be stored as raw values: booleans, signed and unsigned integers, and floats
+STORABLE_KINDS = 'biuf'
+
+# Metric fields kept in the index, in order
+INDEX_FIELDS = ['n', 'sort', 'algo', 'comps', 'exs', 'time', 'time_min', 'time_iqr', 'time_repeats',
+                'context_switches', 'predata_digest', 'postdata_digest']
+
+
+class ResultsWriter:
+    def __init__(self, path, include_data=False):
+        """
+        The ResultsWriter class appends finished runs to a results container.
+        Existing runs in the container are kept; new runs are added after them.
+        :param path: the path of the container without extension; {path}.idx and {path}.bin are written.
+        ;param include_data: if True, the presorted and postsorted arrays of every run are stored as well.
+        """
+        self.path = path
+        self.include_data = include_data
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.index_file = open(f'{path}.idx', 'a')
+        self.data_file = open(f'{path}.bin', 'ab') if include_data else None
+
+
+    def append(self, metric):
+        """
+        Appends one run to the container.
+        :param metric: the Metric object of the run.
+        """
+        self.append_all([metric])
+
+
+    def append_all(self, metrics, arrays=None):
+        """
+        Appends several runs to the container with one write to each file.
+        :param metrics: the Metric objects of the runs.
+        :param arrays: the (predata, postdata) pair of every run; defaults to the arrays attached to the metrics. Runs
+            without arrays are stored without them. A run whose Metric has no digest of an array yet is indexed with
+            the digest of the array given here.
+        """
+        if arrays is None:
+            arrays = [(metric.predata, metric.postdata) for metric in metrics]
+        index_lines = []
+        data_blocks = []
+        if self.data_file is not None:
+            offset = self.data_file.tell()
+        for metric, run_arrays in zip(metrics, arrays):
+            record = {}
+            for field in INDEX_FIELDS:
+                record[field] = to_json_value(getattr(metric, field))
+            for field, data_arr in zip(['predata_digest', 'postdata_digest'], run_arrays):
+                if record[field] is None and data_arr is not None:
+                    record[field] = digest_data(data_arr)
+            if self.data_file is not None:
+                for field, data_arr in zip(['predata', 'postdata'], run_arrays):
+                    if data_arr is None:
+                        continue
+                    values = stored_values(data_arr)
+                    block = values.tobytes()
+                    record[field] = [offset, len(values), values.dtype.str]
+                    data_blocks.append(block)
+                    offset += len(block)
+            index_lines.append(json.dumps(record) + '\n')
+
+        # the data is written before the index lines that point into it
+        if self.data_file is not None:
+            self.data_file.write(b''.join(data_blocks))
+            self.data_file.flush()
+        self.index_file.write(''.join(index_lines))
+        self.index_file.flush()
+
+
+    def close(self):
+        """
+        Closes the files of the container.
+        """
+        self.index_file.close()
+        if self.data_file is not None:
+            self.data_file.close()
+
+
+class BackgroundResultsWriter:
+    def __init__(self, path, include_data=False, queue_size=results_queue_size):
+        """
+        The BackgroundResultsWriter class appends runs to a results container from a background thread, so writing
+            overlaps with sorting.
+        Runs are passed through a bounded queue: once queue_size runs are waiting, submit blocks until the thread has
+            caught up, so unwritten runs never pile up in memory. The thread writes every run already waiting in one
+            batch (see ResultsWriter.append_all). The arrays of a run are taken from its Metric when it is submitted,
+            so the driver may release them from the Metric (Metric.release_data) right away; their digests are then
+            indexed whether or not the release has happened by the time the run is written.
+        A write error stops further writing and is raised in the driver by the next submit or by close.
+        :param path: the path of the container without extension.
+        ;param include_data: if True, the presorted and postsorted arrays of every run are stored as well.
+        ;param queue_size: the most runs waiting to be written.
+        """
+        self.writer = ResultsWriter(path, include_data)
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.error = None
+        self.thread = threading.Thread(target=self.write_loop, name='results-writer', daemon=True)
+        self.thread.start()
+
+
+    def write_loop(self):
+        """
+        Body of the background thread: writes batches of queued runs until close is called.
+        """
+        closing = False
+        while not closing:
+            batch = [self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is queued by close as the last item
+            closing = batch[-1] is None
+            batch = [item for item in batch if item is not None]
+            # after an error the queue is still drained, so a blocked submit can return and raise it
+            if self.error is None and len(batch) > 0:
+                try:
+                    self.writer.append_all([item[0] for item in batch], [item[1] for item in batch])
+                except Exception as error:
+                    self.error = error
+        # endloop
+        try:
+            self.writer.close()
+        except Exception as error:
+            if self.error is None:
+                self.error = error
+
+
+    def raise_error(self):
+        """
+        Raises the error of a failed write in the calling (driver) thread, if there was one.
+        """
+        if self.error is not None:
+            raise IOError(f'writing results to {self.writer.path} failed: {self.error}') from self.error
+
+
+    def submit(self, metric):
+        """
+        Queues one finished run to be written; blocks while the queue is full.
+        :param metric: the Metric object of the run.
+        """
+        self.raise_error()
+        self.queue.put((metric, (metric.predata, metric.postdata)))
+
+
+    def close(self):
+        """
+        Waits until every queued run is written, then closes the container.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        self.raise_error()
+
+
+def clear_results(path):
+    """
+    Deletes the files of a results container, if they exist.
+    :param path: the path of the container without extension.
+    """
+    for extension in ['idx', 'bin']:
+        if os.path.exists(f'{path}.{extension}'):
+            os.remove(f'{path}.{extension}')
+
+
+def stored_values(data_arr):
+    """
+    Converts an array to the contiguous NumPy array whose raw bytes are stored in the data file.
+    The values keep their own dtype, as digest_data hashes them, so a stored array still matches its digest.
+    :param data_arr: a list, array.array or numpy.ndarray of numbers.
+    ;return: the array as a contiguous numpy.ndarray.
+    """
+    values = np.ascontiguousarray(data_arr)
+    if values.dtype.kind not in STORABLE_KINDS:
+        raise ValueError(f'cannot store an array of dtype {values.dtype} in a results container; only arrays of '
+                         'numbers can be stored')
+    return values
+
+
+def to_json_value(value):
+    """
+    Converts a NumPy scalar to the matching Python number so it can be written to the index.
+    :param value: the value of a Metric field.
+    ;return: the value as a Python object.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def save_results(metrics, path, include_data=False):
+    """
+    Writes a new results container holding the given runs, replacing any container already at path.
+    :param metrics: the Metric objects of the runs.
+    :param path: the path of the container without extension.
+    :param include_data: if True, the presorted and postsorted arrays of every run are stored as well.
+    """
+    clear_results(path)
+    writer = ResultsWriter(path, include_data)
+    writer.append_all(metrics)
+    writer.close()
+
+
+def read_results(path):
+    """
+    Reads every run in a results container.
+    Stored arrays are returned as read-only, memory-mapped views of the data file, so reading the container does not
+        load them.
+    :param path: the path of the container without extension.
+    ;return: the list of Metric objects in the order they were written; predata and postdata are None for runs
+        stored without their arrays.
+    """
+    # the data file is mapped once as raw bytes; every stored array is a view of its bytes in the dtype of its record
+    data_arr = None
+    if os.path.exists(f'{path}.bin') and os.path.getsize(f'{path}.bin') > 0:
+        data_arr = np.memmap(f'{path}.bin', dtype=np.uint8, mode='r')
+
+    metrics = []
+    with open(f'{path}.idx') as index_file:
+        for line in index_file:
+            record = json.loads(line)
+            arrays = {}
+            for field in ['predata', 'postdata']:
+                arrays[field] = None
+                if record.get(field) is not None and data_arr is not None:
+                    offset, length, dtype = record[field]
+                    dtype = np.dtype(dtype)
+                    arrays[field] = data_arr[offset:offset + length * dtype.itemsize].view(dtype)
+            metrics.append(m(record['n'], record['sort'], record['algo'], record['comps'], record['exs'],
+                             arrays['predata'], arrays['postdata'], '', '', record['time'], record['time_min'],
+                             record['time_iqr'], record['time_repeats'], record['context_switches'],
+                             record.get('predata_digest'), record.get('postdata_digest')))
+    return metrics
+
+
+def export_csv(path, output_dir='output_files'):
+    """
+    Exports every run in a results container as its own .csv file (see graph_data.write_data_to_file).
+    The regression equations are fitted from the container itself: over all runs with the same data type and
+        algorithm, as in the graphs.
+    :param path: the path of the container without extension.
+    :param output_dir: the directory the .csv files are written to.
+    ;return: the number of files written.
+    """
+    # imported here so reading and writing containers does not need matplotlib
+    from Lab4.graph_data import write_data_to_file
+
+    metrics = read_results(path)
+    groups = {}
+    for metric in metrics:
+        key = (metric.sort, metric.algo)
+        if key not in groups:
+            groups[key] = []
+        groups[key].append(metric)
+
+    for group in groups.values():
+        x_vals = [metric.n for metric in group]
+        comp_vals = [metric.comps for metric in group]
+        ex_vals = [metric.exs for metric in group]
+        for metric in group:
+            metric.fitPowerRegressionCurve(x_vals, comp_vals, 'comps')
+            metric.fitPowerRegressionCurve(x_vals, ex_vals, 'exs')
+            write_data_to_file(metric, output_dir)
+    return len(metrics)
@@ -0,0 +1,52 @@
+# test_counting.py
+# Kordel France
+########################################################################################################################
+# This file provides pytest checks of the hand-written comparison counters: every instrumented sort must count exactly
+#   the comparisons that counting mode (counting.py) observes when the same sort runs on wrapped values.
+########################################################################################################################
+
+import random
+from functools import partial
+import pytest
+from Lab4.counting import count_operations
+from Lab4.heap_sort import heap_sort
+from Lab4.merge_sort_natural import merge_sort_natural
+from Lab4.merge_sort_2way import merge_sort_two_way, merge_sort_two_way_buffered
+from Lab4.merge_sort_3way import merge_sort_three_way
+from Lab4.merge_sort_4way import merge_sort_four_way
+from Lab4.merge_sort_kway import merge_sort_k_way
+
+# instrumented sort of every counted configuration
+COUNTED_SORTS = {'natural': merge_sort_natural,
+                 'natural ascending runs only': partial(merge_sort_natural, detect_descending=False),
+                 'natural adaptive': partial(merge_sort_natural, adaptive=True),
+                 'natural adaptive ascending runs only': partial(merge_sort_natural, adaptive=True,
+                                                                 detect_descending=False),
+                 '2-way': merge_sort_two_way,
+                 '2-way buffered': merge_sort_two_way_buffered,
+                 '2-way bottom-up': partial(merge_sort_two_way_buffered, bottom_up=True),
+                 '3-way': merge_sort_three_way,
+                 '4-way': merge_sort_four_way,
+                 '3-way loser tree': partial(merge_sort_k_way, k=3),
+                 '8-way loser tree': partial(merge_sort_k_way, k=8),
+                 'heap': heap_sort}
+
+rng = random.Random(1)
+DATASETS = {'empty': [],
+            'single': [5],
+            'random': [rng.randint(0, 500) for _ in range(777)],
+            'sorted': list(range(300)),
+            'reverse_sorted': list(range(300, 0, -1)),
+            'few_unique': [i % 7 for i in range(400)]}
+
+
+@pytest.mark.parametrize('data_name', list(DATASETS))
+@pytest.mark.parametrize('sort_name', list(COUNTED_SORTS))
+def test_hand_count_matches_proxy_count(sort_name, data_name):
+    sort_function = COUNTED_SORTS[sort_name]
+    data = DATASETS[data_name]
+    sorted_arr, comps, _ = sort_function(list(data))
+    proxy_arr, stats = count_operations(sort_function, list(data))
+    assert list(sorted_arr) == sorted(data)
+    assert list(proxy_arr) == sorted(data)
+    assert comps == stats.comps
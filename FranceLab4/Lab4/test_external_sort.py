@@ -0,0 +1,50 @@
+# test_external_sort.py
+# Kordel France
+########################################################################################################################
+# This file provides pytest checks of the external merge sort: the output is sorted in both file formats and with every
+#   in-memory sort, and the traced memory of the whole sort stays under its memory_limit.
+########################################################################################################################
+
+import os
+import random
+import tracemalloc
+import pytest
+from Lab4.external_sort import external_merge_sort, write_integer_file, read_integer_file, EXTERNAL_KERNELS, \
+    FIXED_OVERHEAD
+
+# small enough that the input is split into many runs and merged over more than one pass
+MEMORY_LIMIT = FIXED_OVERHEAD + 64 * 1024
+FILE_SIZE = 20000
+
+
+@pytest.fixture(scope='module')
+def input_values():
+    rng = random.Random(7)
+    return [rng.randint(-10 ** 12, 10 ** 12) for _ in range(FILE_SIZE)]
+
+
+@pytest.mark.parametrize('file_format', ['binary', 'text'])
+@pytest.mark.parametrize('algo', sorted(EXTERNAL_KERNELS))
+def test_output_sorted_under_memory_limit(tmp_path, input_values, algo, file_format):
+    input_path = os.path.join(tmp_path, 'input')
+    output_path = os.path.join(tmp_path, 'output')
+    write_integer_file(input_path, input_values, file_format)
+
+    tracemalloc.start()
+    try:
+        result = external_merge_sort(input_path, output_path, memory_limit=MEMORY_LIMIT, fan_in=2, algo=algo,
+                                     input_format=file_format, output_format=file_format, tmp_dir=str(tmp_path))
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert list(read_integer_file(output_path, file_format)) == sorted(input_values)
+    assert len(result[4]) > 2                                       # run creation and at least two merge passes
+    assert peak <= MEMORY_LIMIT
+
+
+def test_memory_limit_too_small(tmp_path):
+    input_path = os.path.join(tmp_path, 'input')
+    write_integer_file(input_path, [3, 1, 2])
+    with pytest.raises(ValueError):
+        external_merge_sort(input_path, os.path.join(tmp_path, 'output'), memory_limit=FIXED_OVERHEAD)
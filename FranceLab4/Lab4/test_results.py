@@ -0,0 +1,81 @@
+# test_results.py
+# Kordel France
+########################################################################################################################
+# This file provides pytest checks of the results container: runs written with save_results or the background writer
+#   read back with the same fields, digests and (if stored) arrays.
+########################################################################################################################
+
+import os
+import numpy as np
+import pytest
+from Lab4.Metric import Metric, digest_data
+from Lab4.results import save_results, read_results, BackgroundResultsWriter, clear_results
+
+
+def make_metrics():
+    metrics = []
+    for i, (file_type, algo) in enumerate([('random', 'm1x'), ('sorted', 'm2x'), ('random', 'heap_top_k')]):
+        n = 10 * (i + 1)
+        predata = np.arange(n, 0, -1, dtype=np.int64) * 3 - 7
+        metrics.append(Metric(n, file_type, algo, 100 + i, 50 + i, predata, np.sort(predata), '', '', 0.001 * (i + 1),
+                              time_min=0.0009 * (i + 1), time_iqr=0.0001, time_repeats=5 + i, context_switches=i))
+    return metrics
+
+
+def assert_same_run(read_metric, metric, with_data):
+    for field in ['n', 'sort', 'algo', 'comps', 'exs', 'time', 'time_min', 'time_iqr', 'time_repeats',
+                  'context_switches']:
+        assert getattr(read_metric, field) == getattr(metric, field)
+    if with_data:
+        assert np.array_equal(read_metric.predata, metric.predata)
+        assert np.array_equal(read_metric.postdata, metric.postdata)
+    else:
+        assert read_metric.predata is None and read_metric.postdata is None
+
+
+@pytest.mark.parametrize('include_data', [False, True])
+def test_save_and_read_round_trip(tmp_path, include_data):
+    path = os.path.join(tmp_path, 'results')
+    metrics = make_metrics()
+    save_results(metrics, path, include_data=include_data)
+    read_metrics = read_results(path)
+    assert len(read_metrics) == len(metrics)
+    for read_metric, metric in zip(read_metrics, metrics):
+        assert_same_run(read_metric, metric, include_data)
+    assert os.path.exists(f'{path}.bin') == include_data
+
+
+def test_background_writer_keeps_order_and_digests(tmp_path):
+    path = os.path.join(tmp_path, 'results')
+    metrics = make_metrics()
+    digests = [(digest_data(metric.predata), digest_data(metric.postdata)) for metric in metrics]
+    clear_results(path)
+    writer = BackgroundResultsWriter(path, include_data=False)
+    for metric in metrics:
+        writer.submit(metric)
+        metric.release_data()                                       # as the battle does with keep_data=False
+    writer.close()
+
+    read_metrics = read_results(path)
+    assert [metric.n for metric in read_metrics] == [metric.n for metric in metrics]
+    assert [(metric.predata_digest, metric.postdata_digest) for metric in read_metrics] == digests
+
+
+def test_float_arrays_keep_dtype_and_digest(tmp_path):
+    path = os.path.join(tmp_path, 'results')
+    predata = np.linspace(-2.5, 7.25, 11)
+    metrics = [Metric(len(predata), 'random', 'm1x', 1, 2, predata, np.sort(predata), '', '', 0.001),
+               make_metrics()[0]]
+    save_results(metrics, path, include_data=True)
+    read_metrics = read_results(path)
+    for read_metric, metric in zip(read_metrics, metrics):
+        assert_same_run(read_metric, metric, True)
+        assert read_metric.predata.dtype == metric.predata.dtype
+        assert digest_data(read_metric.predata) == read_metric.predata_digest == digest_data(metric.predata)
+        assert digest_data(read_metric.postdata) == read_metric.postdata_digest == digest_data(metric.postdata)
+
+
+def test_non_numeric_arrays_rejected(tmp_path):
+    metric = Metric(2, 'random', 'm1x', 1, 2, ['b', 'a'], ['a', 'b'], '', '', 0.001)
+    with pytest.raises(ValueError):
+        save_results([metric], os.path.join(tmp_path, 'results'), include_data=True)
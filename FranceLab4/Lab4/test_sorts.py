@@ -0,0 +1,121 @@
+# test_sorts.py
+# Kordel France
+########################################################################################################################
+# This file provides pytest checks of the sorting functions: the instrumented sorts and their uninstrumented kernels
+#   sort a list, an array.array('q') and int64 / float64 NumPy arrays in place and return the same container; the merge
+#   sorts are stable; and the partial heap modes return the smallest values in order.
+########################################################################################################################
+
+import array
+import random
+from functools import partial
+import numpy as np
+import pytest
+from Lab4.heap_sort import heap_sort, heap_sort_fast, heap_sorted_iterator, top_k, SIFT_STRATEGIES
+from Lab4.merge_sort_natural import merge_sort_natural, merge_sort_natural_fast
+from Lab4.merge_sort_2way import merge_sort_two_way, merge_sort_two_way_buffered, merge_sort_two_way_fast
+from Lab4.merge_sort_3way import merge_sort_three_way, merge_sort_three_way_fast
+from Lab4.merge_sort_4way import merge_sort_four_way, merge_sort_four_way_fast
+from Lab4.merge_sort_kway import merge_sort_k_way, merge_sort_k_way_fast
+from Lab4.parallel_sort import parallel_merge_sort
+
+
+class Keyed:
+    """
+    A value that compares by its key only, so equal keys with different tags expose the order a sort leaves ties in.
+    """
+    __slots__ = ('key', 'tag')
+
+    def __init__(self, key, tag):
+        self.key = key
+        self.tag = tag
+
+    def __lt__(self, other):
+        return self.key < other.key
+
+    def __le__(self, other):
+        return self.key <= other.key
+
+
+# every merge sort that must keep equal values in their input order
+STABLE_SORTS = {'natural': merge_sort_natural,
+                'natural adaptive': partial(merge_sort_natural, adaptive=True),
+                'natural fast': merge_sort_natural_fast,
+                '2-way': merge_sort_two_way,
+                '2-way buffered': merge_sort_two_way_buffered,
+                '2-way bottom-up': partial(merge_sort_two_way_buffered, bottom_up=True),
+                '2-way fast': merge_sort_two_way_fast,
+                '3-way': merge_sort_three_way,
+                '3-way fast': merge_sort_three_way_fast,
+                'k-way': merge_sort_k_way,
+                'k-way fast': merge_sort_k_way_fast}
+
+
+@pytest.mark.parametrize('sort_name', list(STABLE_SORTS))
+def test_merge_sorts_are_stable(sort_name):
+    rng = random.Random(3)
+    data = [Keyed(rng.randint(0, 20), tag) for tag in range(500)]
+    result = STABLE_SORTS[sort_name](data)
+    sorted_arr = result[0] if isinstance(result, tuple) else result
+    assert [(value.key, value.tag) for value in sorted_arr] == sorted((value.key, value.tag) for value in data)
+
+
+@pytest.mark.parametrize('strategy', list(SIFT_STRATEGIES))
+def test_heap_partial_modes(strategy):
+    rng = random.Random(4)
+    data = [rng.randint(-1000, 1000) for _ in range(300)]
+    before = list(data)
+    assert list(heap_sorted_iterator(data, strategy)) == sorted(data)
+    assert top_k(data, 25, strategy)[0] == sorted(data)[:25]
+    assert data == before
+
+
+# every sort that sorts its argument in place, with the algorithm options worth covering
+IN_PLACE_SORTS = {'natural': merge_sort_natural,
+                  'natural adaptive (galloping)': partial(merge_sort_natural, adaptive=True),
+                  'natural ascending runs only': partial(merge_sort_natural, detect_descending=False),
+                  'natural fast': merge_sort_natural_fast,
+                  '2-way': merge_sort_two_way,
+                  '2-way buffered': merge_sort_two_way_buffered,
+                  '2-way bottom-up': partial(merge_sort_two_way_buffered, bottom_up=True),
+                  '2-way fast': merge_sort_two_way_fast,
+                  '3-way': merge_sort_three_way,
+                  '3-way fast': merge_sort_three_way_fast,
+                  '4-way': merge_sort_four_way,
+                  '4-way fast': merge_sort_four_way_fast,
+                  'k-way loser tree': partial(merge_sort_k_way, k=5),
+                  'k-way loser tree fast': partial(merge_sort_k_way_fast, k=5),
+                  'heap': heap_sort,
+                  'heap bottom-up': partial(heap_sort, strategy='bottom_up'),
+                  'heap fast': heap_sort_fast,
+                  'parallel': partial(parallel_merge_sort, workers=2),
+                  'parallel heap kernel': partial(parallel_merge_sort, workers=3, kernel='heap')}
+
+# builds every supported container from a list of ints
+CONTAINERS = {'list': list,
+              'array q': lambda values: array.array('q', values),
+              'int64 ndarray': lambda values: np.array(values, dtype=np.int64),
+              'float64 ndarray': lambda values: np.array(values, dtype=np.float64) / 4.0}
+
+
+@pytest.mark.parametrize('container', list(CONTAINERS))
+@pytest.mark.parametrize('sort_name', list(IN_PLACE_SORTS))
+def test_sorts_every_container_in_place(sort_name, container):
+    rng = random.Random(5)
+    values = [rng.randint(-10 ** 6, 10 ** 6) for _ in range(1000)] + list(range(200)) + list(range(300, 0, -1))
+    data_arr = CONTAINERS[container](values)
+    expected = sorted(list(data_arr))
+    result = IN_PLACE_SORTS[sort_name](data_arr)
+    returned_arr = result[0] if isinstance(result, tuple) else result
+    assert returned_arr is data_arr
+    assert list(data_arr) == expected
+
+
+@pytest.mark.parametrize('container', list(CONTAINERS))
+def test_short_inputs(container):
+    for values in [[], [7], [2, 1], [1, 1, 1]]:
+        for sort_function in IN_PLACE_SORTS.values():
+            data_arr = CONTAINERS[container](values)
+            expected = sorted(list(data_arr))
+            sort_function(data_arr)
+            assert list(data_arr) == expected
@@ -0,0 +1,146 @@
+# timing.py
+# Kordel France
+########################################################################################################################
+# This file provides the timing harness used to measure how long a sort takes.
+# A single time.time() reading of one sort is mostly noise for small n, so each measurement here:
+#   1) runs a configurable number of untimed warm-up sorts,
+#   2) times repeated sorts of fresh copies of the data with time.perf_counter_ns,
+#   3) stops once the median is known to the target precision (or the repeat / time budget runs out),
+#   4) reports the median, minimum and interquartile range (IQR) of the repeats as numbers in seconds.
+# The precision of the median is estimated from the width of its approximate 95% confidence interval,
+#   median +/- 1.57 * IQR / sqrt(repeats), relative to the median.
+# For isolated measurements the garbage collector can be switched off during the timed runs, the process can be pinned
+#   to one CPU core, and the context switches taken during the timed runs are recorded (Unix only).
+########################################################################################################################
+
+import gc
+import os
+import statistics
+import time
+from Lab4.buffers import clone_data
+try:
+    import resource
+except ImportError:                                                                 # not available on Windows
+    resource = None
+from Lab4.constants import timing_warmup, timing_min_repeats, timing_max_repeats, timing_precision, timing_budget
+
+
+class Timing:
+    __slots__ = ('median', 'minimum', 'iqr', 'repeats', 'context_switches')
+
+    def __init__(self, median, minimum, iqr, repeats, context_switches=None):
+        """
+        The Timing class holds the statistics of repeated timings of one sort, all in seconds.
+        :param median: the median time of the repeats.
+        ;param minimum: the fastest repeat.
+        ;param iqr: the interquartile range of the repeats.
+        ;param repeats: the number of timed repeats.
+        ;param context_switches: the context switches taken during the timed repeats, or None if not available.
+        """
+        self.median = median
+        self.minimum = minimum
+        self.iqr = iqr
+        self.repeats = repeats
+        self.context_switches = context_switches
+
+
+def summarize_samples(samples_ns, context_switches=None):
+    """
+    Computes the median, minimum and interquartile range of timing samples.
+    :param samples_ns: the timed repeats in nanoseconds.
+    :param context_switches: the context switches taken during the timed repeats, if known.
+    ;return: a Timing object in seconds.
+    """
+    if len(samples_ns) > 1:
+        q1, median, q3 = statistics.quantiles(samples_ns, n=4, method='inclusive')
+    else:
+        q1 = median = q3 = samples_ns[0]
+    return Timing(median / 1e9, min(samples_ns) / 1e9, (q3 - q1) / 1e9, len(samples_ns), context_switches)
+
+
+def count_context_switches():
+    """
+    Reads the number of context switches (voluntary and involuntary) this process has taken so far.
+    ;return: the number of context switches, or None where the resource module is not available.
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+
+def pin_to_cpu(cpu):
+    """
+    Pins this process to one CPU core so the scheduler cannot migrate it between cores while it is timed.
+    :param cpu: the index of the core to run on; None leaves the affinity unchanged.
+    ;return: True if the process was pinned, False if cpu is None or pinning is not supported (outside Linux).
+    """
+    if cpu is None or not hasattr(os, 'sched_setaffinity'):
+        return False
+    os.sched_setaffinity(0, {cpu})
+    return True
+
+
+def median_precision(timing):
+    """
+    Estimates the relative precision of a median: the half-width of its approximate 95% confidence interval divided
+        by the median itself.
+    :param timing: a Timing object.
+    ;return: the relative precision (0.02 means the median is known to about +/- 2%).
+    """
+    if timing.median <= 0:
+        return 0.0
+    return 1.57 * timing.iqr / (timing.repeats ** 0.5) / timing.median
+
+
+def time_sort(sort_function, data_arr, warmup=timing_warmup, min_repeats=timing_min_repeats,
+              max_repeats=timing_max_repeats, precision=timing_precision, budget=timing_budget, disable_gc=False):
+    """
+    Times a sort repeatedly on fresh copies of the same data until the median reaches the target precision.
+    The copy of the data is made before the clock starts, so only the sort itself is timed.
+    :param sort_function: a callable that sorts the array passed to it in place.
+    :param data_arr: the data to sort. It is copied before every run and never modified.
+    :param warmup: the number of untimed runs made first.
+    :param min_repeats: the fewest timed runs.
+    :param max_repeats: the most timed runs.
+    :param precision: the target relative precision of the median (see median_precision).
+    :param budget: the time in seconds after which no further repeats are started once min_repeats are done.
+    :param disable_gc: if True, garbage is collected once before timing and the collector is off during every timed
+        run, so a collection never lands inside a measurement.
+    ;return: a Timing object; its context_switches counts only the timed runs.
+    """
+    for i in range(0, warmup):
+        sort_function(clone_data(data_arr))
+
+    gc_was_enabled = gc.isenabled()
+    if disable_gc:
+        gc.collect()
+
+    samples_ns = []
+    context_switches = 0 if resource is not None else None
+    deadline = time.perf_counter_ns() + int(budget * 1e9)
+    while len(samples_ns) < max(1, max_repeats):
+        data_copy = clone_data(data_arr)
+        switches_before = count_context_switches()
+        if disable_gc:
+            gc.disable()
+        try:
+            start_time = time.perf_counter_ns()
+            sort_function(data_copy)
+            end_time = time.perf_counter_ns()
+        finally:
+            # a sort that raises must not leave the collector off for the rest of the process
+            if disable_gc and gc_was_enabled:
+                gc.enable()
+        samples_ns.append(end_time - start_time)
+        if context_switches is not None:
+            context_switches += count_context_switches() - switches_before
+
+        if len(samples_ns) >= min_repeats:
+            if median_precision(summarize_samples(samples_ns)) <= precision:
+                break
+            if time.perf_counter_ns() >= deadline:
+                break
+        # endif
+    # endloop
+    return summarize_samples(samples_ns, context_switches)